@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the converters, comparison matrix and validator.
+
+Synthesizes projects (genesis.json, data/projects/<p>.json and schedule CSVs)
+in a temporary workspace and times each pipeline stage on its own:
+
+    parse_csv                   stream typed rows out of a schedule CSV
+    validate_csv_data           row + final-cumulative validation
+    convert_to_json             full CSV -> schedule JSON conversion
+    generate_comparison_matrix  matrix over N projects (JSON, and columnar .npz
+                                when numpy is installed)
+    validate_all                Validator.validate_all for every project
+    check_derived               compute_derived drift table over every project file
+
+Two sweeps are run, so scales stay independent:
+    buckets   one project with B buckets, monthly or daily periods (converters)
+    projects  N projects with PROJECT_SWEEP_BUCKETS buckets each (matrix, validator)
+
+Each stage reports the best and median wall time over --repeat runs, and peak
+traced memory from one extra run under tracemalloc. Results are written as
+JSON keyed by stage and scenario, so two runs can be compared:
+
+Usage:
+    python scripts/benchmark.py                          # realistic profile
+    python scripts/benchmark.py --profile quick
+    python scripts/benchmark.py --profile extreme        # 10,000 projects, 5,000 buckets
+    python scripts/benchmark.py --projects 10 1000 --buckets 50 --granularity daily
+    python scripts/benchmark.py --compare .benchmarks/<old>.json [--threshold 0.2]
+
+Results go to .benchmarks/<git short hash>.json unless --output is given.
+--compare exits 1 when any stage's best time regressed by more than
+--threshold (a fraction, default 0.2) against the baseline file.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import csv_to_emission_json
+import csv_to_vesting_json
+from compute_derived import drift_table
+from generate_comparison_matrix import generate_comparison_matrix
+from repository import clear_cache, get_repository
+from validate_submission import Validator
+
+try:
+    from columnar import write_columnar
+except ImportError:  # numpy not installed: JSON matrix benchmark only
+    write_columnar = None
+
+
+PROFILES = {
+    'quick': {'projects': [10], 'buckets': [50], 'granularity': ['monthly']},
+    'realistic': {'projects': [10, 100], 'buckets': [50, 500], 'granularity': ['monthly', 'daily']},
+    'extreme': {'projects': [10, 100, 1000, 10000], 'buckets': [50, 500, 5000], 'granularity': ['monthly', 'daily']},
+}
+
+PROJECT_SWEEP_BUCKETS = 20
+TIERS = ['tier_1_profit_seeking', 'tier_2_entity_controlled', 'tier_3_community', 'tier_4_liquidity']
+DAYS_PER_MONTH = 30
+GENESIS_DATE = date(2024, 1, 1)
+MAX_SUPPLY = 10_000_000_000
+SEED = 20240101
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def synth_buckets(n_buckets: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Bucket terms in the genesis.json shape, spread round-robin over the tiers."""
+    buckets = []
+    for i in range(n_buckets):
+        buckets.append({
+            'tier': TIERS[i % len(TIERS)],
+            'name': f'Bucket {i:05d}',
+            'absolute_tokens': rng.randrange(1_000_000, 50_000_000) // n_buckets * 10 or 10,
+            'tge_unlock_pct': rng.choice([0, 0, 5, 10, 25, 100]),
+            'cliff_months': rng.choice([0, 0, 6, 12]),
+            'vesting_months': rng.choice([0, 12, 24, 36, 48]),
+        })
+    return buckets
+
+
+def synth_genesis(project: str, buckets: List[Dict[str, Any]], emission: bool) -> Dict[str, Any]:
+    tiers = {}
+    for bucket in buckets:
+        tier = tiers.setdefault(bucket['tier'], {'total_pct': 0.0, 'buckets': []})
+        pct = bucket['absolute_tokens'] / MAX_SUPPLY * 100
+        tier['total_pct'] += pct
+        entry = {k: v for k, v in bucket.items() if k != 'tier'}
+        entry['pct'] = pct
+        if emission:
+            entry['allocation_mechanism'] = 'block_reward_emission'
+        tier['buckets'].append(entry)
+
+    total_pct = sum(t['total_pct'] for t in tiers.values())
+    return {
+        'project': project,
+        'has_premine': True,
+        'genesis_date': GENESIS_DATE.isoformat(),
+        'total_genesis_allocation_pct': total_pct,
+        'available_for_mining_genesis_pct': 100 - total_pct,
+        'allocation_tiers': tiers,
+    }
+
+
+def synth_project(project: str) -> Dict[str, Any]:
+    current_supply = MAX_SUPPLY // 4
+    block_reward, block_time = 50, 60
+    daily_emission = 86400 / block_time * block_reward
+    return {
+        'project': project,
+        'ticker': project[:4].upper(),
+        'consensus': 'PoW',
+        'launch_date': GENESIS_DATE.isoformat(),
+        'last_updated': date.today().isoformat(),
+        'has_premine': True,
+        'supply': {
+            'max_supply': MAX_SUPPLY,
+            'current_supply': current_supply,
+            'pct_mined': round(current_supply / MAX_SUPPLY * 100, 2),
+            'emission_remaining': MAX_SUPPLY - current_supply,
+        },
+        'emission': {
+            'current_block_reward': block_reward,
+            'block_time_seconds': block_time,
+            'daily_emission': daily_emission,
+            'annual_inflation_pct': round(daily_emission * 365 / current_supply * 100, 2),
+        },
+        'data_sources': {
+            'official_docs': [f'https://{project}.example.org/'],
+            'block_explorer': [f'https://explorer.{project}.example.org/'],
+        },
+    }
+
+
+def _period_date(period: int, granularity: str) -> str:
+    if granularity == 'daily':
+        return (GENESIS_DATE + timedelta(days=period)).isoformat()
+    year, month = divmod(GENESIS_DATE.month - 1 + period, 12)
+    return date(GENESIS_DATE.year + year, month + 1, 1).isoformat()
+
+
+def write_schedule_csv(path: Path, buckets: List[Dict[str, Any]], granularity: str, emission: bool) -> int:
+    """Dense schedule CSV (every bucket, every period) that passes the converters' validation."""
+    scale = DAYS_PER_MONTH if granularity == 'daily' else 1
+    horizon = max((b['cliff_months'] + b['vesting_months']) * scale for b in buckets)
+    prefix = 'emission' if emission else 'unlock'
+
+    rows = 0
+    with open(path, 'w') as f:
+        f.write(f'month,date,tier,bucket_name,{prefix}_tokens,{prefix}_pct_of_bucket,'
+                f'cumulative_tokens,cumulative_pct_of_bucket,notes\n')
+        cumulative = [0] * len(buckets)
+        for period in range(horizon + 1):
+            period_date = _period_date(period, granularity)
+            for i, b in enumerate(buckets):
+                tokens = b['absolute_tokens']
+                tge = tokens * b['tge_unlock_pct'] // 100
+                cliff, vesting = b['cliff_months'] * scale, b['vesting_months'] * scale
+                if period == 0:
+                    target = tge if vesting or cliff else tokens
+                elif vesting == 0:
+                    target = tokens if period >= cliff else tge
+                else:
+                    vested = min(max(period - cliff, 0), vesting)
+                    target = tge + (tokens - tge) * vested // vesting
+                unlock = target - cumulative[i]
+                cumulative[i] = target
+                f.write(f"{period},{period_date},{b['tier']},{b['name']},{unlock},"
+                        f"{round(unlock / tokens * 100, 2)},{target},{round(target / tokens * 100, 2)},\n")
+                rows += 1
+    return rows
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable[[], Any], repeat: int, track_memory: bool) -> Dict[str, Any]:
+    # Every run starts cold: without clearing the repository memo, repeats
+    # would time dictionary lookups instead of parsing
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        clear_cache()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    result = {'seconds_min': min(times), 'seconds_median': statistics.median(times), 'runs': repeat}
+    if track_memory:
+        gc.collect()
+        clear_cache()
+        tracemalloc.start()
+        fn()
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def bench_buckets(workspace: Path, n_buckets: int, granularity: str, repeat: int, memory: bool) -> List[Dict[str, Any]]:
+    """Converter stages for one project with n_buckets buckets."""
+    rng = random.Random(SEED + n_buckets)
+    buckets = synth_buckets(n_buckets, rng)
+    results = []
+
+    for kind, converter in (('vesting', csv_to_vesting_json), ('emission', csv_to_emission_json)):
+        emission = kind == 'emission'
+        csv_path = workspace / f'bench-{kind}-{n_buckets}-{granularity}.csv'
+        rows = write_schedule_csv(csv_path, buckets, granularity, emission)
+        genesis = synth_genesis('bench', buckets, emission)
+        scenario = {'sweep': 'buckets', 'kind': kind, 'buckets': n_buckets, 'granularity': granularity, 'rows': rows}
+
+        stages = {
+            'parse_csv': lambda: list(converter.parse_csv(csv_path)),
+            'validate_csv_data': lambda: converter.validate_csv_data(converter.parse_csv(csv_path), genesis),
+            'convert_to_json': lambda: converter.convert_to_json(csv_path, genesis),
+        }
+        for stage, fn in stages.items():
+            results.append(_record(stage, scenario, measure(fn, repeat, memory)))
+        csv_path.unlink()
+
+    return results
+
+
+def bench_projects(workspace: Path, n_projects: int, repeat: int, memory: bool) -> List[Dict[str, Any]]:
+    """Matrix generation and validation over n_projects synthetic projects."""
+    root = workspace / f'projects-{n_projects}'
+    allocations_dir = root / 'allocations'
+    projects_dir = root / 'data' / 'projects'
+    projects_dir.mkdir(parents=True)
+    rng = random.Random(SEED + n_projects)
+
+    for i in range(n_projects):
+        name = f'synth{i:05d}'
+        project_dir = allocations_dir / name
+        project_dir.mkdir(parents=True)
+        buckets = synth_buckets(PROJECT_SWEEP_BUCKETS, rng)
+        genesis = synth_genesis(name, buckets, emission=False)
+        _write_json(project_dir / 'genesis.json', genesis)
+        _write_json(projects_dir / f'{name}.json', synth_project(name))
+
+        csv_path = project_dir / 'vesting-schedule.csv'
+        write_schedule_csv(csv_path, buckets, 'monthly', emission=False)
+        schedule = csv_to_vesting_json.convert_to_json(csv_path, genesis)
+        _write_json(project_dir / 'vesting-schedule.json', schedule)
+        csv_path.unlink()
+
+    scenario = {'sweep': 'projects', 'projects': n_projects, 'buckets': PROJECT_SWEEP_BUCKETS, 'granularity': 'monthly'}
+    names = sorted(p.stem for p in projects_dir.glob('*.json'))
+    results = []
+    repository = get_repository(root)
+
+    def validate_all():
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            for name in names:
+                Validator(name, repository=repository).validate_all()
+
+    results.append(_record('generate_comparison_matrix', dict(scenario, storage='json'),
+                           measure(lambda: generate_comparison_matrix(allocations_dir), repeat, memory)))
+
+    if write_columnar is not None:
+        for project_dir in allocations_dir.iterdir():
+            with open(project_dir / 'vesting-schedule.json') as f:
+                write_columnar(json.load(f), project_dir / 'vesting-schedule.npz')
+        results.append(_record('generate_comparison_matrix', dict(scenario, storage='columnar'),
+                               measure(lambda: generate_comparison_matrix(allocations_dir), repeat, memory)))
+
+    results.append(_record('validate_all', scenario, measure(validate_all, repeat, memory)))
+
+    def check_derived():
+        projects = []
+        for name in names:
+            with open(projects_dir / f'{name}.json') as f:
+                projects.append(json.load(f))
+        return drift_table(projects, names)
+
+    results.append(_record('check_derived', scenario, measure(check_derived, repeat, memory)))
+
+    return results
+
+
+def _record(stage: str, scenario: Dict[str, Any], measurement: Dict[str, Any]) -> Dict[str, Any]:
+    parts = [f'{k}={v}' for k, v in scenario.items() if k not in ('sweep', 'rows')]
+    return {'key': f"{stage}[{','.join(parts)}]", 'stage': stage, 'scenario': scenario, **measurement}
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def _git_commit(repo_root: Path) -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _format_bytes(n):
+    if n is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024:
+            return f'{n:.0f} {unit}'
+        n /= 1024
+    return f'{n:.1f} TB'
+
+
+def print_results(results: List[Dict[str, Any]]):
+    width = max(len(r['key']) for r in results)
+    print(f"\n  {'Stage':<{width}} {'Best':>10} {'Median':>10} {'Peak mem':>10}")
+    print(f"  {'-' * width} {'-' * 10} {'-' * 10} {'-' * 10}")
+    for r in results:
+        print(f"  {r['key']:<{width}} {r['seconds_min'] * 1000:>8.1f}ms {r['seconds_median'] * 1000:>8.1f}ms "
+              f"{_format_bytes(r.get('peak_bytes')):>10}")
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> bool:
+    """Print per-stage ratios against a baseline file; True if nothing regressed."""
+    with open(baseline_path) as f:
+        baseline = {r['key']: r for r in json.load(f)['results']}
+
+    width = max(len(r['key']) for r in results)
+    print(f"\nCompared with {baseline_path}:")
+    print(f"  {'Stage':<{width}} {'Before':>10} {'After':>10} {'Change':>8}")
+    print(f"  {'-' * width} {'-' * 10} {'-' * 10} {'-' * 8}")
+    ok = True
+    for r in results:
+        old = baseline.get(r['key'])
+        if old is None:
+            continue
+        ratio = r['seconds_min'] / old['seconds_min'] if old['seconds_min'] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  ✗ regression'
+            ok = False
+        print(f"  {r['key']:<{width}} {old['seconds_min'] * 1000:>8.1f}ms {r['seconds_min'] * 1000:>8.1f}ms "
+              f"{(ratio - 1) * 100:>+7.1f}%{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark converters, matrix generation and validation.')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='realistic')
+    parser.add_argument('--projects', type=int, nargs='+', help='Project counts for the projects sweep')
+    parser.add_argument('--buckets', type=int, nargs='+', help='Bucket counts for the buckets sweep')
+    parser.add_argument('--granularity', choices=['monthly', 'daily'], nargs='+')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage (default: 3)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak-memory run')
+    parser.add_argument('--output', type=Path, help='Results file (default: .benchmarks/<commit>.json)')
+    parser.add_argument('--compare', type=Path, help='Baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown before --compare fails (default: 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    project_counts = args.projects or profile['projects']
+    bucket_counts = args.buckets or profile['buckets']
+    granularities = args.granularity or profile['granularity']
+    memory = not args.no_memory
+    repo_root = Path(__file__).parent.parent
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='pow-bench-') as tmp:
+        workspace = Path(tmp)
+        for granularity in granularities:
+            for n_buckets in bucket_counts:
+                print(f"✓ Buckets sweep: {n_buckets} buckets, {granularity}")
+                results.extend(bench_buckets(workspace, n_buckets, granularity, args.repeat, memory))
+        for n_projects in project_counts:
+            print(f"✓ Projects sweep: {n_projects} projects")
+            results.extend(bench_projects(workspace, n_projects, args.repeat, memory))
+
+    commit = _git_commit(repo_root)
+    output = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'profile': args.profile,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    output_path = args.output or repo_root / '.benchmarks' / f'{commit}.json'
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(output, f, indent=2)
+        f.write('\n')
+
+    print_results(results)
+    print(f"\n✓ Results: {output_path}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Incremental build of every generated artifact.
+
+Usage:
+    python scripts/build_all.py              # rebuild whatever is out of date
+    python scripts/build_all.py --dry-run    # list out-of-date targets, write nothing
+    python scripts/build_all.py --force      # ignore the cache and rebuild everything
+    python scripts/build_all.py --force --metrics-json metrics.json
+                                             # per-stage timings for the whole run
+                                             # (--profile adds cProfile, see instrumentation.py)
+
+Targets, in build order:
+    schedule  allocations/<p>/*.csv + genesis.json -> vesting-schedule.json / emission-schedule.json
+    columnar  allocations/<p>/*-schedule.json -> *-schedule.npz (skipped without numpy)
+    derived   data/projects/<p>.json -> the same file with compute_derived fields
+              applied (mining_economics.py --write is separate and explicit)
+    matrix    allocations/<p>/{genesis,vesting-schedule,emission-schedule}.json -> that
+              project's entry in allocations/comparison-matrix.json
+
+Every project file the derived step processed is also captured into the
+snapshot store (scripts/snapshots.py), so each refresh leaves a history row.
+
+Each target records the SHA-256 of its inputs in .build-cache.json (gitignored).
+The inputs include the scripts that build the target: its step's modules in
+scripts/ and everything they import from there, plus this file. A target is
+rebuilt only when an input hash changed (data or code), an input was added or
+removed, or an output is missing. Matrix entries are patched into the existing
+comparison-matrix.json instead of regenerating every project. pipeline.py is
+the non-incremental counterpart: one in-memory pass over everything.
+"""
+
+import ast
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Any
+
+import csv_to_emission_json
+import csv_to_vesting_json
+import serialization
+from compute_derived import compute, apply_to
+from generate_comparison_matrix import generate_comparison_matrix, patch_comparison_matrix
+from instrumentation import run_main, stage
+from schedule_csv import feed, month_ordered
+from snapshots import STORE_FILE, SnapshotStore, capture
+
+try:
+    from columnar import SCHEDULE_FILES, columnar_path, write_columnar
+except ImportError:  # numpy not installed: no columnar copies
+    write_columnar = None
+
+
+CACHE_VERSION = 2
+CACHE_FILE = '.build-cache.json'
+MATRIX_FILE = 'allocations/comparison-matrix.json'
+MATRIX_INPUTS = ['genesis.json', 'vesting-schedule.json', 'emission-schedule.json']
+SCRIPTS_DIR = Path(__file__).parent
+
+# Entry modules of each step; script_inputs() adds what they import. Every
+# step also depends on this file (build_schedule, build_derived, ...), but
+# not on everything this file imports.
+STEP_MODULES = {
+    'schedule': ['csv_to_vesting_json', 'csv_to_emission_json'],
+    'columnar': ['columnar'],
+    'derived': ['compute_derived'],
+    'matrix': ['generate_comparison_matrix'],
+}
+
+
+def script_inputs(modules: List[str], root: Path) -> List[str]:
+    """Repo-relative paths of modules and every scripts/ module they import, transitively."""
+    seen = set()
+    pending = list(modules)
+    while pending:
+        name = pending.pop()
+        path = SCRIPTS_DIR / f'{name}.py'
+        if name in seen or not path.exists():
+            continue
+        seen.add(name)
+        for node in ast.walk(ast.parse(path.read_text(), str(path))):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module.split('.')[0])
+    return sorted(_rel(SCRIPTS_DIR / f'{name}.py', root) for name in seen | {'build_all'})
+
+
+class ContentHashes:
+    """SHA-256 of repo files, computed at most once per file per run."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._hashes: Dict[str, str] = {}
+
+    def get(self, rel_path: str) -> str:
+        if rel_path not in self._hashes:
+            path = self.root / rel_path
+            if not path.exists():
+                return None
+            self._hashes[rel_path] = hashlib.sha256(path.read_bytes()).hexdigest()
+        return self._hashes[rel_path]
+
+    def forget(self, rel_path: str):
+        """Drop a cached hash after the file has been rewritten."""
+        self._hashes.pop(rel_path, None)
+
+    def snapshot(self, rel_paths: List[str]) -> Dict[str, str]:
+        return {p: self.get(p) for p in rel_paths if self.get(p) is not None}
+
+
+class BuildCache:
+    """Persistent target -> {inputs: {path: hash}, outputs: [path]} map."""
+
+    def __init__(self, path: Path, force: bool = False):
+        self.path = path
+        self.targets: Dict[str, Dict[str, Any]] = {}
+        if path.exists() and not force:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self.targets = data.get('targets', {})
+
+    def is_dirty(self, target: str, inputs: Dict[str, str], outputs: List[str], root: Path) -> bool:
+        entry = self.targets.get(target)
+        if entry is None or entry.get('inputs') != inputs:
+            return True
+        return any(not (root / p).exists() for p in outputs)
+
+    def record(self, target: str, inputs: Dict[str, str], outputs: List[str]):
+        self.targets[target] = {'inputs': inputs, 'outputs': outputs}
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'targets': self.targets}, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+def _rel(path: Path, root: Path) -> str:
+    return path.relative_to(root).as_posix()
+
+
+def schedule_output_name(csv_path: Path) -> str:
+    """Canonical JSON name for a schedule CSV (quai-vesting-schedule.csv -> vesting-schedule.json)."""
+    return 'emission-schedule.json' if 'emission' in csv_path.stem else 'vesting-schedule.json'
+
+
+def build_schedule(csv_path: Path) -> List[str]:
+    """Convert one schedule CSV. Returns validation errors (empty on success)."""
+    converter = csv_to_emission_json if 'emission' in csv_path.stem else csv_to_vesting_json
+    genesis_path = csv_path.parent / 'genesis.json'
+    genesis_data = converter.load_genesis_json(genesis_path)
+
+    builder = feed(converter.ScheduleBuilder(genesis_data), converter.parse_csv(csv_path))
+    with stage('parse') as timer:
+        timer.bytes += csv_path.stat().st_size
+    if not builder.row_count:
+        return [f"{csv_path}: CSV file is empty or invalid"]
+    with stage('validate'):
+        errors = builder.finish_validation()
+    if errors:
+        return [f"{csv_path}: {e}" for e in errors]
+
+    # Second pass: months are read, aggregated and serialized as they are written
+    with stage('parse'):
+        rows = month_ordered(lambda: converter.parse_csv(csv_path), builder.in_month_order)
+    with stage('write') as timer:
+        timer.bytes += serialization.write(csv_path.parent / schedule_output_name(csv_path),
+                                           builder.document(rows), stage=stage)
+    return []
+
+
+def build_derived(project_path: Path) -> bool:
+    """Apply compute_derived to one project file. Returns True if the file changed."""
+    with stage('parse') as timer:
+        original = project_path.read_text()
+        data = serialization.loads(original)
+        timer.rows += 1
+        timer.bytes += len(original)
+    with stage('aggregate'):
+        apply_to(data, compute(data))
+    with stage('serialize'):
+        updated = serialization.dumps(data) + '\n'
+    if updated == original:
+        return False
+    with stage('write') as timer:
+        project_path.write_text(updated)
+        timer.bytes += len(updated)
+    return True
+
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+    force = '--force' in sys.argv
+
+    repo_root = Path(__file__).parent.parent
+    allocations_dir = repo_root / 'allocations'
+    projects_dir = repo_root / 'data' / 'projects'
+
+    hashes = ContentHashes(repo_root)
+    cache = BuildCache(repo_root / CACHE_FILE, force=force)
+    code = {step: script_inputs(modules, repo_root) for step, modules in STEP_MODULES.items()}
+    errors = []
+    rebuilt = 0
+
+    project_dirs = sorted(d for d in allocations_dir.iterdir() if d.is_dir())
+
+    # 1. Schedule CSVs -> JSON
+    for project_dir in project_dirs:
+        for csv_path in sorted(project_dir.glob('*.csv')):
+            output = _rel(csv_path.parent / schedule_output_name(csv_path), repo_root)
+            inputs = hashes.snapshot([_rel(csv_path, repo_root), _rel(project_dir / 'genesis.json', repo_root)]
+                                     + code['schedule'])
+            target = f"schedule:{_rel(csv_path, repo_root)}"
+            if not cache.is_dirty(target, inputs, [output], repo_root):
+                continue
+            print(f"  schedule  {_rel(csv_path, repo_root)} -> {output}")
+            if dry_run:
+                continue
+            target_errors = build_schedule(csv_path)
+            if target_errors:
+                errors.extend(target_errors)
+                continue
+            hashes.forget(output)
+            cache.record(target, inputs, [output])
+            rebuilt += 1
+
+    # 2. Columnar copies of every schedule JSON
+    if write_columnar is not None:
+        for project_dir in project_dirs:
+            for name in SCHEDULE_FILES:
+                json_path = project_dir / name
+                if not json_path.exists():
+                    continue
+                rel = _rel(json_path, repo_root)
+                output = _rel(columnar_path(json_path), repo_root)
+                inputs = hashes.snapshot([rel] + code['columnar'])
+                target = f"columnar:{rel}"
+                # load_columnar() ignores a .npz older than its JSON, even with identical content
+                stale = (repo_root / output).exists() and \
+                    json_path.stat().st_mtime > (repo_root / output).stat().st_mtime
+                if not stale and not cache.is_dirty(target, inputs, [output], repo_root):
+                    continue
+                print(f"  columnar  {rel} -> {output}")
+                if dry_run:
+                    continue
+                with stage('columnar') as timer:
+                    write_columnar(serialization.load(json_path), repo_root / output)
+                    timer.rows += 1
+                cache.record(target, inputs, [output])
+                rebuilt += 1
+
+    # 3. Derived fields in data/projects/<p>.json
+    refreshed = []
+    for project_path in sorted(projects_dir.glob('*.json')):
+        # Skip sidecar files such as <p>.sources.json
+        if '.' in project_path.stem:
+            continue
+        rel = _rel(project_path, repo_root)
+        target = f"derived:{rel}"
+        if not cache.is_dirty(target, hashes.snapshot([rel] + code['derived']), [rel], repo_root):
+            continue
+        print(f"  derived   {rel}")
+        if dry_run:
+            continue
+        if build_derived(project_path):
+            hashes.forget(rel)
+        # The file is both input and output; record its post-write hash
+        cache.record(target, hashes.snapshot([rel] + code['derived']), [rel])
+        refreshed.append(project_path)
+        rebuilt += 1
+
+    if refreshed:
+        with stage('snapshot') as timer:
+            store = SnapshotStore(repo_root / STORE_FILE)
+            try:
+                added = capture(store, refreshed)
+            finally:
+                store.close()
+            timer.rows += added
+        print(f"  snapshot  {STORE_FILE} ({added} new row(s))")
+
+    # 4. Comparison matrix rows
+    dirty_rows = []
+    live_rows = set()
+    for project_dir in project_dirs:
+        name = project_dir.name
+        live_rows.add(f"matrix:{name}")
+        inputs = hashes.snapshot([_rel(project_dir / f, repo_root) for f in MATRIX_INPUTS] + code['matrix'])
+        if cache.is_dirty(f"matrix:{name}", inputs, [MATRIX_FILE], repo_root):
+            dirty_rows.append((name, inputs))
+
+    # Projects whose allocation directory disappeared must leave the matrix
+    removed = [t for t in cache.targets if t.startswith('matrix:') and t not in live_rows]
+
+    if dirty_rows or removed:
+        names = [name for name, _ in dirty_rows] + [t.split(':', 1)[1] for t in removed]
+        print(f"  matrix    {MATRIX_FILE} ({', '.join(names)})")
+        if not dry_run:
+            matrix_path = repo_root / MATRIX_FILE
+            with stage('aggregate') as timer:
+                if matrix_path.exists() and not force:
+                    comparison_data = patch_comparison_matrix(serialization.load(matrix_path), allocations_dir, names)
+                else:
+                    comparison_data = generate_comparison_matrix(allocations_dir)
+                timer.rows += len(names)
+            with stage('write') as timer:
+                timer.bytes += serialization.write(matrix_path, comparison_data)
+            for name, inputs in dirty_rows:
+                cache.record(f"matrix:{name}", inputs, [MATRIX_FILE])
+            for target in removed:
+                del cache.targets[target]
+            rebuilt += len(names)
+
+    if dry_run:
+        print("✓ Dry run, nothing written")
+        return
+
+    cache.save()
+
+    if errors:
+        print(f"\n✗ {len(errors)} error(s):\n")
+        for error in errors:
+            print(f"  • {error}")
+        sys.exit(1)
+
+    if rebuilt:
+        print(f"✓ Rebuilt {rebuilt} target(s)")
+    else:
+        print("✓ Everything up to date")
+
+
+if __name__ == '__main__':
+    run_main(main, Path(__file__).stem)
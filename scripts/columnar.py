@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Columnar storage for vesting-schedule.json / emission-schedule.json.
+
+The JSON schedules repeat every key name, tier and bucket name for every
+bucket in every month. The columnar form stores the same data column by
+column in an uncompressed .npz next to the JSON. There are four row tables:
+
+    month    one row per month (month, date, bucket/tier row counts)
+    total    one row per month
+    bucket   one row per bucket per month
+    tier     one row per tier aggregate per month (@name is the tier key)
+
+Each column is encoded as the narrowest exact form:
+
+    int      smallest signed integer dtype that holds every value
+    fixed    floats that are all exact at d decimals (the converters round
+             percentages to 2), stored as integers scaled by 10**d
+    float    float64, with the positions of JSON ints kept in the layout
+    str      dictionary-encoded: integer codes plus the distinct values
+
+Columns of one table that share a dtype are stacked into a single 2-D block
+("bucket.int32", "tier.int64", ...) so the archive has a handful of members.
+The layout (which block and row each column lives in, dictionaries, key
+orders) and every top-level field except monthly_schedule are kept as UTF-8
+JSON in the "meta" member.
+
+Because the archive is stored uncompressed, load_columns() memory-maps each
+block straight out of the zip instead of reading it. Decoding back to JSON is
+exact: `json.dump(to_json(), indent=2)` reproduces the source file byte for
+byte, so JSON stays the export / interchange format.
+
+A .npz is used only while it is at least as new as its JSON; regenerate with
+this script or scripts/build_all.py after editing a schedule.
+
+Usage:
+    python columnar.py <schedule.json> [...]      # write <schedule>.npz next to each
+    python columnar.py --all                      # every allocations/*/*-schedule.json
+    python columnar.py --check [<schedule.json> ...]   # verify exact JSON round-trip
+    python columnar.py --to-json <schedule.npz> [--output PATH]
+"""
+
+import io
+import json
+import mmap
+import re
+import struct
+import sys
+import zipfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+SCHEDULE_FILES = ['vesting-schedule.json', 'emission-schedule.json']
+
+# Keys of a monthly_schedule entry that hold nested tables rather than scalars
+NESTED_KEYS = ('buckets', 'tier_aggregates', 'total')
+
+# Largest number of decimals tried for the fixed-point encoding
+MAX_FIXED_DECIMALS = 6
+
+INT_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def _int_dtype(values: List[int]):
+    low, high = (min(values), max(values)) if values else (0, 0)
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    raise ValueError(f"Integer values out of int64 range: {low}..{high}")
+
+
+def _fixed_decimals(values: List[float]):
+    """Smallest d such that every value is exactly round(v * 10**d) / 10**d, or None."""
+    for decimals in range(MAX_FIXED_DECIMALS + 1):
+        scale = 10 ** decimals
+        try:
+            if all(round(v * scale) / scale == v for v in values):
+                return decimals
+        except (OverflowError, ValueError):  # inf / nan
+            return None
+    return None
+
+
+def _encode_column(key: str, values: List[Any]):
+    """Return (layout spec, integer-or-float values to store, dtype) for one column."""
+    if values and all(isinstance(v, str) for v in values):
+        codes: Dict[str, int] = {}
+        stored = [codes.setdefault(v, len(codes)) for v in values]
+        return {'key': key, 'kind': 'str', 'values': list(codes)}, stored, _int_dtype(stored)
+
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        raise ValueError(f"Column '{key}' mixes strings, nulls or nested values; not columnar-encodable")
+
+    if all(isinstance(v, int) for v in values):
+        return {'key': key, 'kind': 'int'}, values, _int_dtype(values)
+
+    spec = {'key': key}
+    int_rows = [i for i, v in enumerate(values) if isinstance(v, int)]
+    if int_rows:
+        spec['int_rows'] = int_rows
+
+    decimals = _fixed_decimals(values)
+    if decimals is not None:
+        stored = [round(v * 10 ** decimals) for v in values]
+        if max(map(abs, stored), default=0) < 2 ** 53:
+            spec.update(kind='fixed', decimals=decimals)
+            return spec, stored, _int_dtype(stored)
+
+    spec['kind'] = 'float'
+    return spec, values, np.float64
+
+
+def _encode_table(table: str, rows: Dict[str, List[Any]], out: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Encode a table's columns and stack them into per-dtype blocks."""
+    blocks = defaultdict(list)
+    columns = []
+    for key, values in rows.items():
+        spec, stored, dtype = _encode_column(key, values)
+        block = f'{table}.{np.dtype(dtype).name}'
+        spec['block'], spec['row'] = block, len(blocks[block])
+        blocks[block].append(np.asarray(stored, dtype=dtype))
+        columns.append(spec)
+
+    for block, arrays in blocks.items():
+        out[block] = np.vstack(arrays)
+    return {'rows': len(next(iter(rows.values()), [])), 'columns': columns}
+
+
+def _decode_column(spec: Dict[str, Any], blocks: Dict[str, np.ndarray]) -> List[Any]:
+    """Inverse of _encode_column: back to a list of plain Python values."""
+    stored = blocks[spec['block']][spec['row']].tolist()
+    kind = spec['kind']
+
+    if kind == 'str':
+        dictionary = spec['values']
+        return [dictionary[code] for code in stored]
+    if kind == 'int':
+        return stored
+
+    if kind == 'fixed':
+        scale = 10 ** spec['decimals']
+        values = [v / scale for v in stored]
+    else:
+        values = stored
+    for i in spec.get('int_rows', []):
+        values[i] = int(values[i])
+    return values
+
+
+def _key_order(rows: List[Dict[str, Any]], table: str) -> List[str]:
+    keys = list(rows[0]) if rows else []
+    for row in rows:
+        if list(row) != keys:
+            raise ValueError(f"Inconsistent keys in {table} rows: {keys} vs {list(row)}")
+    return keys
+
+
+def encode_schedule(schedule_data: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Convert a schedule JSON document to a dict of named arrays."""
+    monthly_schedule = schedule_data.get('monthly_schedule', [])
+
+    month_keys = _key_order(monthly_schedule, 'monthly_schedule')
+    bucket_rows = [b for entry in monthly_schedule for b in entry['buckets']]
+    tier_items = [(tier, agg) for entry in monthly_schedule for tier, agg in entry['tier_aggregates'].items()]
+    total_rows = [entry['total'] for entry in monthly_schedule]
+    bucket_keys = _key_order(bucket_rows, 'bucket')
+    tier_keys = _key_order([agg for _, agg in tier_items], 'tier_aggregates')
+    total_keys = _key_order(total_rows, 'total')
+
+    month_table = {k: [entry[k] for entry in monthly_schedule] for k in month_keys if k not in NESTED_KEYS}
+    month_table['@buckets'] = [len(entry['buckets']) for entry in monthly_schedule]
+    month_table['@tiers'] = [len(entry['tier_aggregates']) for entry in monthly_schedule]
+    tier_table = {k: [agg[k] for _, agg in tier_items] for k in tier_keys}
+    tier_table['@name'] = [tier for tier, _ in tier_items]
+
+    columns: Dict[str, np.ndarray] = {}
+    layout = {
+        'month': _encode_table('month', month_table, columns),
+        'total': _encode_table('total', {k: [row[k] for row in total_rows] for k in total_keys}, columns),
+        'bucket': _encode_table('bucket', {k: [row[k] for row in bucket_rows] for k in bucket_keys}, columns),
+        'tier': _encode_table('tier', tier_table, columns),
+    }
+
+    meta = {k: v for k, v in schedule_data.items() if k != 'monthly_schedule'}
+    meta['__layout__'] = {
+        'top': list(schedule_data),
+        'month_keys': month_keys,
+        'tables': layout,
+    }
+    columns['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+    return columns
+
+
+def write_columnar(schedule_data: Dict[str, Any], npz_path: Path):
+    """Write the columnar form, uncompressed so it can be memory-mapped."""
+    with open(npz_path, 'wb') as f:
+        np.savez(f, **encode_schedule(schedule_data))
+
+
+# .npy header dict as written by numpy for plain (non-structured) dtypes
+_NPY_HEADER = re.compile(
+    r"\{'descr': '([^']+)', 'fortran_order': (True|False), 'shape': \(([0-9, ]*)\), \}"
+)
+
+
+def _npy_header(buffer: mmap.mmap, start: int):
+    """Parse the .npy header at start; returns (shape, fortran_order, dtype, data offset)."""
+    major = buffer[start + 6]
+    if major == 1:
+        (header_len,) = struct.unpack_from('<H', buffer, start + 8)
+        header_start = start + 10
+    else:
+        (header_len,) = struct.unpack_from('<I', buffer, start + 8)
+        header_start = start + 12
+    data_offset = header_start + header_len
+    text = buffer[header_start:data_offset].decode('latin1')
+
+    # Fast path avoids numpy's literal_eval-based parser for the common case
+    match = _NPY_HEADER.match(text)
+    if match:
+        descr, fortran_order, shape = match.groups()
+        shape = tuple(int(n) for n in shape.split(',') if n.strip())
+        return shape, fortran_order == 'True', np.dtype(descr), data_offset
+
+    header = io.BytesIO(buffer[start:data_offset])
+    version = np.lib.format.read_magic(header)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+    return shape, fortran_order, dtype, data_offset
+
+
+def load_columns(npz_path: Path, memory_map: bool = True) -> Dict[str, np.ndarray]:
+    """Load every array in an .npz, memory-mapping stored (uncompressed) members.
+
+    The file is mapped once; each member becomes a read-only ndarray view at
+    its offset inside the zip.
+    """
+    with zipfile.ZipFile(npz_path) as zf:
+        members = zf.infolist()
+
+    if not memory_map or any(m.compress_type != zipfile.ZIP_STORED for m in members):
+        with np.load(npz_path) as npz:
+            return {name: npz[name] for name in npz.files}
+
+    with open(npz_path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    columns = {}
+    for member in members:
+        # Local file header: 30 fixed bytes, then name and extra field
+        start = member.header_offset
+        name_len, extra_len = struct.unpack_from('<HH', buffer, start + 26)
+        shape, fortran_order, dtype, offset = _npy_header(buffer, start + 30 + name_len + extra_len)
+
+        columns[member.filename[:-len('.npy')]] = np.ndarray(
+            shape, dtype=dtype, buffer=buffer, offset=offset, order='F' if fortran_order else 'C'
+        )
+    return columns
+
+
+class ColumnarSchedule:
+    """Read-only view of a columnar schedule.
+
+    get() mirrors dict.get() on the top-level JSON fields, so code that only
+    reads metadata such as tier_totals or genesis_date works unchanged; the
+    monthly data is reached through column() or to_json().
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.blocks = columns
+        self.meta = json.loads(bytes(columns['meta']).decode('utf-8'))
+        self.layout = self.meta.pop('__layout__')
+        self.specs = {
+            table: {spec['key']: spec for spec in info['columns']}
+            for table, info in self.layout['tables'].items()
+        }
+
+    def __len__(self):
+        return self.layout['tables']['month']['rows']
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.meta.get(key, default)
+
+    def has_column(self, table: str, key: str) -> bool:
+        return key in self.specs[table]
+
+    def column(self, table: str, key: str) -> List[Any]:
+        """Decoded values of one column ('month', 'total', 'bucket' or 'tier' table)."""
+        return _decode_column(self.specs[table][key], self.blocks)
+
+    def offsets(self, table: str) -> List[int]:
+        """Row offsets into the bucket or tier table: month i owns offsets[i]:offsets[i+1]."""
+        counts = self.column('month', '@buckets' if table == 'bucket' else '@tiers')
+        offsets = [0]
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        return offsets
+
+    def to_json(self) -> Dict[str, Any]:
+        """Rebuild the original schedule document exactly."""
+        def table_columns(table):
+            return {k: self.column(table, k) for k in self.specs[table] if not k.startswith('@')}
+
+        month_cols = table_columns('month')
+        total_cols = table_columns('total')
+        bucket_cols = table_columns('bucket')
+        tier_cols = table_columns('tier')
+        tier_names = self.column('tier', '@name')
+        bucket_offsets = self.offsets('bucket')
+        tier_offsets = self.offsets('tier')
+
+        monthly_schedule = []
+        for i in range(len(self)):
+            entry = {}
+            for key in self.layout['month_keys']:
+                if key == 'buckets':
+                    entry[key] = [
+                        {k: values[r] for k, values in bucket_cols.items()}
+                        for r in range(bucket_offsets[i], bucket_offsets[i + 1])
+                    ]
+                elif key == 'tier_aggregates':
+                    entry[key] = {
+                        tier_names[r]: {k: values[r] for k, values in tier_cols.items()}
+                        for r in range(tier_offsets[i], tier_offsets[i + 1])
+                    }
+                elif key == 'total':
+                    entry[key] = {k: values[i] for k, values in total_cols.items()}
+                else:
+                    entry[key] = month_cols[key][i]
+            monthly_schedule.append(entry)
+
+        return {
+            key: monthly_schedule if key == 'monthly_schedule' else self.meta[key]
+            for key in self.layout['top']
+        }
+
+
+def columnar_path(json_path: Path) -> Path:
+    return json_path.with_suffix('.npz')
+
+
+def load_columnar(json_path: Path) -> ColumnarSchedule:
+    """Columnar view of json_path, or None if there is no up-to-date .npz for it."""
+    npz_path = columnar_path(json_path)
+    if not npz_path.exists():
+        return None
+    if json_path.exists() and json_path.stat().st_mtime > npz_path.stat().st_mtime:
+        return None
+    return ColumnarSchedule(load_columns(npz_path))
+
+
+def _dump(schedule_data: Dict[str, Any]) -> str:
+    # Same formatting as the CSV converters
+    return json.dumps(schedule_data, indent=2)
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    repo_root = Path(__file__).parent.parent
+
+    if '--to-json' in sys.argv:
+        if not args:
+            print("Usage: python columnar.py --to-json <schedule.npz> [--output PATH]")
+            sys.exit(1)
+        npz_path = Path(args[0])
+        output_path = Path(args[1]) if '--output' in sys.argv and len(args) > 1 else npz_path.with_suffix('.json')
+        with open(output_path, 'w') as f:
+            f.write(_dump(ColumnarSchedule(load_columns(npz_path)).to_json()))
+        print(f"✓ Generated: {output_path}")
+        return
+
+    if '--all' in sys.argv or ('--check' in sys.argv and not args):
+        json_paths = sorted(p for name in SCHEDULE_FILES for p in (repo_root / 'allocations').glob(f'*/{name}'))
+    else:
+        json_paths = [Path(a) for a in args]
+
+    if not json_paths:
+        print("Usage: python columnar.py <schedule.json> [...] | --all | --check | --to-json <schedule.npz>")
+        sys.exit(1)
+
+    failed = False
+    for json_path in json_paths:
+        original = json_path.read_text()
+
+        if '--check' in sys.argv:
+            npz_path = columnar_path(json_path)
+            if not npz_path.exists():
+                print(f"✗ {npz_path}: missing")
+                failed = True
+            elif _dump(ColumnarSchedule(load_columns(npz_path)).to_json()) != original:
+                print(f"✗ {npz_path}: does not round-trip to {json_path.name}")
+                failed = True
+            else:
+                print(f"✓ {npz_path}: round-trips exactly")
+            continue
+
+        npz_path = columnar_path(json_path)
+        write_columnar(json.loads(original), npz_path)
+        json_size = json_path.stat().st_size
+        npz_size = npz_path.stat().st_size
+        print(f"✓ Generated: {npz_path} ({npz_size:,} bytes, JSON {json_size:,} bytes, {json_size / npz_size:.1f}x)")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
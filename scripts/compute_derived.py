@@ -19,11 +19,35 @@ Derived fields:
 Usage:
   python scripts/compute_derived.py <project>            # write fields back into the file
   python scripts/compute_derived.py <project> --check    # report diffs, write nothing (exit 1 if drift)
+  python scripts/compute_derived.py --all [--check]      # every data/projects/*.json
+  python scripts/compute_derived.py <file|dir> ... --check [--json]
+                                                         # any project snapshots, e.g. a
+                                                         # directory of historical copies
+  python scripts/compute_derived.py --all --check --profile --metrics-json metrics.json
+                                                         # stage timings, see instrumentation.py
+
+Batch mode loads the inputs of every file into aligned NumPy columns and
+computes all derived fields in one vectorized pass (see drift_table). Only
+files whose vectorized result disagrees with the stored value, or sits on a
+rounding tie, are re-checked with compute(), so the drift table is exactly
+what per-project --check would report. Without numpy every file goes
+through compute().
 """
 
+import copy
 import json
 import sys
 from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+import serialization
+from instrumentation import run_main, stage
+from repository import get_repository
+
+try:
+    import numpy as np
+except ImportError:  # numpy not installed: batch mode falls back to compute() per file
+    np = None
 
 
 def _round(value, ndigits):
@@ -80,38 +104,277 @@ def compute(project_data):
 
 
 def apply_to(project_data, computed):
-    """Write computed values into the nested dict in place."""
+    """Write computed values into the nested dict in place. Paths may be any
+    depth (e.g. mining.cost_to_mine_one_unit.total_cost_usd)."""
+    for dotted, value in computed.items():
+        *sections, field = dotted.split(".")
+        target = project_data
+        for section in sections:
+            target = target.setdefault(section, {})
+        target[field] = value
+
+
+def _existing(project_data, dotted):
+    value = project_data
+    for part in dotted.split("."):
+        value = (value or {}).get(part)
+    return value
+
+
+def diff(project_data, computed):
+    """[(dotted.path, value in file, computed value)] for every field that differs."""
+    drift = []
     for dotted, value in computed.items():
+        existing = _existing(project_data, dotted)
+        if existing != value:
+            drift.append((dotted, existing, value))
+    return drift
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+# Formula inputs, in the order compute() reads them
+INPUT_FIELDS = {
+    "max_supply": "supply.max_supply",
+    "current_supply": "supply.current_supply",
+    "block_reward": "emission.current_block_reward",
+    "block_time": "emission.block_time_seconds",
+    "price": "market_data.current_price_usd",
+    "daily_volume": "market_data.daily_volume",
+}
+
+# Derived field -> decimal places, as rounded by compute()
+DERIVED_FIELDS = {
+    "supply.pct_mined": 2,
+    "supply.emission_remaining": 0,
+    "emission.daily_emission": 2,
+    "emission.annual_inflation_pct": 2,
+    "market_data.fdmc": 0,
+    "market_data.circulating_mcap": 0,
+    "market_data.token_velocity": 4,
+}
+
+# Past 2**53 a float no longer holds every integer, while compute() keeps exact ints
+_EXACT_FLOAT_LIMIT = 2.0 ** 53
+
+
+class Drift(NamedTuple):
+    name: str
+    field: str
+    existing: Any
+    computed: Any
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def load_columns(projects, fields):
+    """{name: float64 array} of the given dotted fields, NaN where missing or non-numeric.
+
+    Values are gathered row by row (each section looked up once per
+    project) into one 2-D array; the columns are views into it.
+    """
+    by_section = {}
+    for name, dotted in fields.items():
         section, field = dotted.split(".", 1)
-        project_data.setdefault(section, {})[field] = value
+        by_section.setdefault(section, []).append((name, field))
+    order = [name for columns in by_section.values() for name, _ in columns]
+
+    empty = {}
+    rows = []
+    for p in projects:
+        row = []
+        for section, columns in by_section.items():
+            values = p.get(section) or empty
+            row.extend([values.get(field) for _, field in columns])
+        rows.append(row)
+    try:
+        # None becomes NaN; only stray strings need the slow path
+        table = np.array(rows, dtype=np.float64).reshape(len(projects), len(order))
+    except (TypeError, ValueError):
+        table = np.array([[_number(v) for v in row] for row in rows], dtype=np.float64)
+        table = table.reshape(len(projects), len(order))
+    return {name: table[:, j] for j, name in enumerate(order)}
+
+
+def compute_batch(columns):
+    """Vectorized compute(): {dotted.path: unrounded float64 array}, NaN where not derivable."""
+    max_supply = columns["max_supply"]
+    current_supply = columns["current_supply"]
+    block_reward = columns["block_reward"]
+    block_time = columns["block_time"]
+    price = columns["price"]
+    daily_volume = columns["daily_volume"]
+    present = lambda a: ~np.isnan(a)
+
+    out = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ok = present(max_supply) & (max_supply != 0) & present(current_supply)
+        out["supply.pct_mined"] = np.where(ok, (current_supply / max_supply) * 100, np.nan)
+        out["supply.emission_remaining"] = np.where(ok, max_supply - current_supply, np.nan)
+
+        ok = present(block_time) & (block_time != 0) & present(block_reward)
+        daily_emission = np.where(ok, (86400 / block_time) * block_reward, np.nan)
+        out["emission.daily_emission"] = daily_emission
+        ok = present(daily_emission) & present(current_supply) & (current_supply != 0)
+        out["emission.annual_inflation_pct"] = np.where(
+            ok, (daily_emission * 365 / current_supply) * 100, np.nan
+        )
+
+        # NaN inputs propagate, which matches compute()'s "is not None" guards
+        out["market_data.fdmc"] = price * max_supply
+        circulating_mcap = price * current_supply
+        out["market_data.circulating_mcap"] = circulating_mcap
+        ok = present(daily_volume) & present(circulating_mcap) & (circulating_mcap != 0)
+        out["market_data.token_velocity"] = np.where(ok, daily_volume / circulating_mcap, np.nan)
+    return out
+
+
+def drift_table(projects: List[Dict[str, Any]], names: List[str]) -> List[Drift]:
+    """Every derived field whose stored value differs from compute(), across all projects.
+
+    One vectorized pass flags candidate rows: stored value != rounded
+    formula, a value on a rounding tie (np.round and round() may disagree
+    there), or inputs too large for exact float math. Only candidates are
+    re-run through compute().
+    """
+    if np is None:
+        candidates = range(len(projects))
+    else:
+        columns = load_columns(projects, {**INPUT_FIELDS, **{dotted: dotted for dotted in DERIVED_FIELDS}})
+        inputs = {name: columns[name] for name in INPUT_FIELDS}
+        stored = {dotted: columns[dotted] for dotted in DERIVED_FIELDS}
+        inexact = np.zeros(len(projects), dtype=bool)
+        for column in inputs.values():
+            inexact |= np.abs(column) >= _EXACT_FLOAT_LIMIT
+
+        flagged = np.zeros(len(projects), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for dotted, values in compute_batch(inputs).items():
+                digits = DERIVED_FIELDS[dotted]
+                derivable = ~np.isnan(values)
+                scaled = values * 10.0 ** digits
+                tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+                flagged |= derivable & ((np.round(values, digits) != stored[dotted]) | tie | inexact)
+        candidates = np.flatnonzero(flagged).tolist()
+
+    table = []
+    for i in candidates:
+        for dotted, existing, value in diff(projects[i], compute(projects[i])):
+            table.append(Drift(names[i], dotted, existing, value))
+    return table
+
+
+def collect_project_files(targets):
+    """Project JSON files named by the CLI: project slugs, files, or directories (recursive).
+
+    Slugs resolve through the repository, so they work from any directory;
+    files and directories are taken as given.
+    """
+    repository = get_repository()
+    paths = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            paths.extend(p for p in sorted(path.rglob("*.json")) if "." not in p.stem)
+        elif path.suffix == ".json":
+            paths.append(path)
+        else:
+            paths.append(repository.path(repository.project(target).project_path))
+    return paths
+
+
+def display_path(path: Path) -> str:
+    """path relative to the repository root when it is inside the checkout."""
+    try:
+        return str(path.resolve().relative_to(get_repository().root))
+    except ValueError:
+        return str(path)
+
+
+def print_drift_table(table, n_files):
+    if not table:
+        print(f"OK: derived fields match in all {n_files} file(s).")
+        return
+    width = max(len(row.name) for row in table)
+    files = len({row.name for row in table})
+    print(f"DRIFT in {files} of {n_files} file(s): {len(table)} derived field(s) differ\n")
+    for row in table:
+        print(f"  {row.name:<{width}}  {row.field}: file={row.existing}  computed={row.computed}")
+
+
+def main_batch(targets, check_only, as_json):
+    paths = collect_project_files(targets)
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        for path in missing:
+            print(f"Project file not found: {display_path(path)}")
+        sys.exit(1)
+
+    projects = []
+    with stage("parse") as timer:
+        for path in paths:
+            with open(path) as f:
+                text = f.read()
+            projects.append(serialization.loads(text))
+            timer.bytes += len(text)
+        timer.rows += len(projects)
+    names = [display_path(p) for p in paths]
+    with stage("aggregate"):
+        table = drift_table(projects, names)
+
+    if as_json:
+        json.dump([row._asdict() for row in table], sys.stdout, indent=2)
+        print()
+    else:
+        print_drift_table(table, len(paths))
+
+    if check_only:
+        sys.exit(1 if table else 0)
+
+    # Only files with drift need rewriting
+    by_name = {name: (path, data) for name, path, data in zip(names, paths, projects)}
+    drifted = sorted({row.name for row in table})
+    for name in drifted:
+        path, data = by_name[name]
+        apply_to(data, compute(data))
+        with stage("write") as timer:
+            timer.bytes += serialization.write(path, data, newline=True)
+    if drifted:
+        print(f"\nRewrote {len(drifted)} file(s).")
 
 
 def main():
     args = [a for a in sys.argv[1:] if not a.startswith("--")]
     check_only = "--check" in sys.argv
 
+    if "--all" in sys.argv:
+        args = [str(get_repository().path("data/projects"))] + args
+    if len(args) > 1 or (args and (args[0].endswith(".json") or Path(args[0]).is_dir())):
+        main_batch(args, check_only, "--json" in sys.argv)
+        return
+
     if not args:
-        print("Usage: python scripts/compute_derived.py <project> [--check]")
+        print("Usage: python scripts/compute_derived.py <project> [--check]\n"
+              "       python scripts/compute_derived.py --all | <file|dir> ... [--check] [--json]")
         sys.exit(1)
 
     project = args[0]
-    path = Path(f"data/projects/{project}.json")
-    if not path.exists():
-        print(f"Project file not found: {path}")
+    repository = get_repository()
+    with stage("parse") as timer:
+        data = repository.project(project).data
+        timer.rows += 1
+    if data is None:
+        print(f"Project file not found: {repository.project(project).project_path}")
         sys.exit(1)
-
-    with open(path) as f:
-        data = json.load(f)
-
-    computed = compute(data)
+    with stage("aggregate"):
+        computed = compute(data)
 
     if check_only:
-        drift = []
-        for dotted, value in computed.items():
-            section, field = dotted.split(".", 1)
-            existing = (data.get(section) or {}).get(field)
-            if existing != value:
-                drift.append((dotted, existing, value))
+        drift = diff(data, computed)
         if drift:
             print(f"DRIFT in {project}: {len(drift)} derived field(s) differ\n")
             for dotted, existing, value in drift:
@@ -120,14 +383,15 @@ def main():
         print(f"OK: all {len(computed)} derived fields in {project} match.")
         sys.exit(0)
 
+    data = copy.deepcopy(data)  # the memoized document is shared
     apply_to(data, computed)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
+    with stage("write") as timer:
+        timer.bytes += serialization.write(repository.path(repository.project(project).project_path), data,
+                                           newline=True)
     print(f"Computed {len(computed)} derived field(s) for {project}:")
     for dotted, value in computed.items():
         print(f"  {dotted} = {value}")
 
 
 if __name__ == "__main__":
-    main()
+    run_main(main, Path(__file__).stem)
@@ -4,27 +4,32 @@ Convert vesting schedule CSV to JSON format with validation.
 
 Usage:
     python csv_to_vesting_json.py <csv_file_path> [genesis_json_path]
+    python csv_to_vesting_json.py <csv_file_path> --profile --metrics-json metrics.json
+                                                    # stage timings, see instrumentation.py
 
 Example:
     python csv_to_vesting_json.py allocations/alephium/vesting-schedule.csv allocations/alephium/genesis.json
 """
 
-import csv
-import json
 import sys
 from pathlib import Path
-from datetime import datetime
 from collections import defaultdict
-from typing import Dict, List, Any
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Tuple, Any
+
+import serialization
+from instrumentation import run_main, stage
+from repository import read_json
+from schedule_csv import BucketState, NameTable, ScheduleRow, feed, iter_schedule_rows, month_ordered
+from timeline import TimelineBuilder
+
+
+MILESTONE_MONTHS = [0, 6, 12, 18, 24, 36, 48]
 
 
 def load_genesis_json(genesis_path: Path) -> Dict[str, Any]:
     """Load genesis.json for validation."""
-    if not genesis_path.exists():
-        return {}
-
-    with open(genesis_path, 'r') as f:
-        return json.load(f)
+    return read_json(genesis_path) or {}
 
 
 def extract_bucket_names_from_genesis(genesis_data: Dict[str, Any]) -> Dict[str, List[str]]:
@@ -72,252 +77,304 @@ def extract_tier_totals_from_genesis(genesis_data: Dict[str, Any]) -> Dict[str,
     return tier_totals
 
 
-def validate_csv_data(rows: List[Dict], genesis_data: Dict[str, Any]) -> List[str]:
-    """Validate CSV data and return list of errors."""
-    errors = []
-
-    # Extract bucket names from genesis if available
-    valid_bucket_names = extract_bucket_names_from_genesis(genesis_data)
-    tier_totals = extract_tier_totals_from_genesis(genesis_data)
-
-    # Track cumulative by bucket
-    prev_cumulative = defaultdict(lambda: 0.0)
-
-    # Group by month for validation
-    months_data = defaultdict(lambda: {'buckets': [], 'total_unlock': 0})
-
-    for i, row in enumerate(rows, start=2):  # +2 for header and 0-indexing
-        month = int(row['month'])
-        tier = row['tier']
-        bucket_name = row['bucket_name']
-        unlock_tokens = float(row['unlock_tokens'])
-        cumulative_tokens = float(row['cumulative_tokens'])
-        cumulative_pct = float(row['cumulative_pct_of_bucket'])
-
-        bucket_key = f"{tier}::{bucket_name}"
+class ScheduleBuilder:
+    """Two-pass validator and aggregator for vesting schedule rows.
+
+    add() validates each typed row as it streams in (negative unlocks,
+    cumulative monotonicity per bucket, bucket names) and keeps only
+    per-bucket state: a BucketState per bucket (last and max cumulative,
+    whether genesis.json knows the name), indexed by the bucket's NameTable
+    id, and the rows seen at the latest month. No row is kept.
+
+    document() takes a second, month-ordered pass over the rows (see
+    schedule_csv.month_ordered) and emits each monthly_schedule entry as soon
+    as its month ends, from per-bucket and per-tier running state; the
+    timeline and milestones are collected in the same pass.
+    """
+
+    def __init__(self, genesis_data: Dict[str, Any]):
+        self.genesis_data = genesis_data
+        self.errors: List[str] = []
+        self.row_count = 0
+        self.first_date = None
+
+        # Extract bucket names from genesis if available
+        self.valid_bucket_names = extract_bucket_names_from_genesis(genesis_data)
+
+        self.names = NameTable()
+        self.buckets: List[BucketState] = []  # bucket id -> running state
+        self.final_month = None
+        self.final_rows: List[ScheduleRow] = []
+        self.in_month_order = True  # rows arrived month by month
+        self.has_blocks = False
+
+        # Filled in by the second pass
+        self.milestones: Dict[str, Any] = {}
+        self.last_entry = None
+
+    def _new_bucket(self, row: ScheduleRow) -> BucketState:
+        valid = self.valid_bucket_names.get(row.tier)
+        state = BucketState(self.names.bucket_tiers[row.bucket], row.bucket_name,
+                            not valid or row.bucket_name in valid)
+        self.buckets.append(state)
+        return state
+
+    def add(self, row: ScheduleRow):
+        """Validate one row and fold it into the per-bucket state."""
+        self.row_count += 1
+        if self.first_date is None:
+            self.first_date = row.date
+        if row.block_height is not None:
+            self.has_blocks = True
+
+        row.bucket = self.names.bucket(row.tier, row.bucket_name)
+        state = self.buckets[row.bucket] if row.bucket < len(self.buckets) else self._new_bucket(row)
 
         # Validation 1: No negative unlocks
-        if unlock_tokens < 0:
-            errors.append(f"Row {i}: Negative unlock_tokens ({unlock_tokens}) for {bucket_key}")
+        if row.amount < 0:
+            self.errors.append(f"Row {row.line}: Negative unlock_tokens ({row.amount}) for {row.tier}::{row.bucket_name}")
 
         # Validation 2: Cumulative never decreases
-        if cumulative_tokens < prev_cumulative[bucket_key]:
-            errors.append(
-                f"Row {i}: Cumulative decreased from {prev_cumulative[bucket_key]} to {cumulative_tokens} for {bucket_key}"
+        if row.cumulative_tokens < state.last_cumulative:
+            self.errors.append(
+                f"Row {row.line}: Cumulative decreased from {state.last_cumulative} "
+                f"to {row.cumulative_tokens} for {row.tier}::{row.bucket_name}"
             )
 
-        prev_cumulative[bucket_key] = cumulative_tokens
+        state.last_cumulative = row.cumulative_tokens
 
         # Validation 3: Check bucket names exist in genesis.json (if provided)
-        if valid_bucket_names and tier in valid_bucket_names:
-            if bucket_name not in valid_bucket_names[tier]:
-                errors.append(
-                    f"Row {i}: Bucket name '{bucket_name}' not found in genesis.json tier '{tier}'. "
-                    f"Valid names: {', '.join(valid_bucket_names[tier])}"
-                )
-
-        # Collect data for month-level validation
-        months_data[month]['buckets'].append({
-            'tier': tier,
-            'bucket': bucket_name,
-            'unlock': unlock_tokens
-        })
-        months_data[month]['total_unlock'] += unlock_tokens
-
-    # Validation 4: Check final cumulative is 100% for each bucket
-    final_month = max(int(row['month']) for row in rows)
-    final_rows = [row for row in rows if int(row['month']) == final_month]
-
-    for row in final_rows:
-        bucket_key = f"{row['tier']}::{row['bucket_name']}"
-        final_pct = float(row['cumulative_pct_of_bucket'])
-
-        # Allow some tolerance for rounding (99.9% - 100.1%)
-        if final_pct < 99.9 or final_pct > 100.1:
-            if final_pct > 0:  # Only warn if there were actual unlocks
-                errors.append(
-                    f"Final cumulative for {bucket_key} is {final_pct}%, expected 100%"
-                )
-
-    return errors
-
-
-def parse_csv(csv_path: Path) -> List[Dict]:
-    """Parse CSV file and return list of row dictionaries."""
-    rows = []
-
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Skip comment lines
-            if row.get('month', '').startswith('#'):
-                continue
-            rows.append(row)
-
-    return rows
-
-
-def convert_to_json(rows: List[Dict], genesis_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert CSV rows to JSON format."""
-
-    # Group by month
-    months_data = defaultdict(list)
-    for row in rows:
-        month = int(row['month'])
-        months_data[month].append(row)
+        if not state.in_genesis:
+            self.errors.append(
+                f"Row {row.line}: Bucket name '{row.bucket_name}' not found in genesis.json tier '{row.tier}'. "
+                f"Valid names: {', '.join(self.valid_bucket_names[row.tier])}"
+            )
 
-    # Calculate tier totals from CSV
-    tier_bucket_totals = defaultdict(lambda: defaultdict(float))
-    for row in rows:
-        tier = row['tier']
-        bucket = row['bucket_name']
-        # Find the maximum cumulative for this bucket (= total allocation)
-        cumulative = float(row['cumulative_tokens'])
-        tier_bucket_totals[tier][bucket] = max(tier_bucket_totals[tier][bucket], cumulative)
-
-    # Calculate tier totals
-    tier_totals_calc = {}
-    total_genesis_tokens = 0
-    for tier, buckets in tier_bucket_totals.items():
-        tier_total = sum(buckets.values())
-        tier_totals_calc[tier] = {
-            'tokens': tier_total
-        }
-        total_genesis_tokens += tier_total
-
-    # Build monthly schedule.
-    #
-    # bucket_state carries each bucket's latest cumulative across months so a
-    # tier's cumulative at month N is the sum of (cumulative for each bucket
-    # in that tier as of month N), using each bucket's most recent value when
-    # it has no row in the current month. Previously the script only summed
-    # rows present in the current month, which under-reported any tier whose
-    # earlier-finishing buckets had stopped emitting rows.
-    monthly_schedule = []
-    bucket_state = {}  # (tier, bucket_name) -> latest cumulative_tokens
-
-    for month in sorted(months_data.keys()):
-        month_rows = months_data[month]
-
-        # Get the date from first row (should be same for all rows in month)
-        date = month_rows[0]['date']
-
-        # Build buckets array; track this month's unlocks per tier separately
-        # from cumulative (cumulative is sourced from bucket_state below).
-        buckets = []
-        tier_unlock = defaultdict(float)
-
-        for row in month_rows:
-            tier = row['tier']
-            bucket_name = row['bucket_name']
-            unlock_tokens = float(row['unlock_tokens'])
-            unlock_pct = float(row['unlock_pct_of_bucket'])
-            cumulative_tokens = float(row['cumulative_tokens'])
-            cumulative_pct = float(row['cumulative_pct_of_bucket'])
-            notes = row.get('notes', '')
-
-            buckets.append({
-                'tier': tier,
-                'bucket_name': bucket_name,
-                'unlock_tokens': int(unlock_tokens),
-                'unlock_pct_of_bucket': round(unlock_pct, 2),
-                'cumulative_tokens': int(cumulative_tokens),
-                'cumulative_pct_of_bucket': round(cumulative_pct, 2),
-                'notes': notes
-            })
-
-            tier_unlock[tier] += unlock_tokens
-            bucket_state[(tier, bucket_name)] = cumulative_tokens
-
-        # Build tier_aggregates from the carried-forward bucket_state, summing
-        # across all buckets in each tier (not just those with rows this month).
-        tier_aggregates = defaultdict(lambda: {'unlock_tokens': 0, 'cumulative_tokens': 0})
-        for (tier, _bucket_name), cum in bucket_state.items():
-            tier_aggregates[tier]['cumulative_tokens'] += cum
-        for tier, unlock in tier_unlock.items():
-            tier_aggregates[tier]['unlock_tokens'] = unlock
-
-        # Calculate tier percentages
-        for tier in tier_aggregates:
-            tier_total = tier_totals_calc.get(tier, {}).get('tokens', 1)
-            tier_aggregates[tier]['cumulative_pct_of_tier'] = round(
-                (tier_aggregates[tier]['cumulative_tokens'] / tier_total * 100) if tier_total > 0 else 0,
+        # The maximum cumulative for a bucket is its total allocation
+        state.max_cumulative = max(state.max_cumulative, row.cumulative_tokens)
+
+        # Keep only the rows of the latest month for the final-cumulative check
+        if self.final_month is None or row.month > self.final_month:
+            self.final_month = row.month
+            self.final_rows = []
+        elif row.month < self.final_month:
+            self.in_month_order = False
+        if row.month == self.final_month:
+            self.final_rows.append(row)
+
+    def finish_validation(self) -> List[str]:
+        """Run the end-of-stream checks and return every error found."""
+        # Validation 4: Check final cumulative is 100% for each bucket
+        for row in self.final_rows:
+            final_pct = row.cumulative_pct
+
+            # Allow some tolerance for rounding (99.9% - 100.1%)
+            if final_pct < 99.9 or final_pct > 100.1:
+                if final_pct > 0:  # Only warn if there were actual unlocks
+                    self.errors.append(
+                        f"Final cumulative for {row.tier}::{row.bucket_name} is {final_pct}%, expected 100%"
+                    )
+
+        self.final_rows = []
+        return self.errors
+
+    def tier_totals(self) -> Dict[str, float]:
+        """Tier name -> sum of its buckets' total allocations, in first-seen order."""
+        totals = [0] * len(self.names.tiers)
+        for state in self.buckets:
+            totals[state.tier] += state.max_cumulative
+        return dict(zip(self.names.tiers, totals))
+
+    def iter_monthly_schedule(self, rows: Iterable[ScheduleRow], tier_totals_calc: Dict[str, Dict[str, float]],
+                              total_genesis_tokens: float, timeline: TimelineBuilder) -> Iterator[Dict[str, Any]]:
+        """Yield monthly_schedule entries from month-ordered rows, one as each month ends.
+
+        cumulative carries each bucket's latest cumulative across months so a
+        tier's cumulative at month N is the sum of (cumulative for each bucket
+        in that tier as of month N), using each bucket's most recent value when
+        it has no row in the current month. Previously the script only summed
+        rows present in the current month, which under-reported any tier whose
+        earlier-finishing buckets had stopped emitting rows.
+        """
+        tiers = self.names.tiers
+        tier_tokens = [tier_totals_calc.get(tier, {}).get('tokens', 1) for tier in tiers]
+        cumulative = [0.0] * len(self.buckets)  # bucket id -> latest cumulative_tokens
+        seen = [False] * len(self.buckets)
+        tier_buckets: List[List[int]] = [[] for _ in tiers]  # tier id -> bucket ids, first-seen order
+        tier_order: List[int] = []  # tier ids in first-seen order
+        tier_cumulative = [0.0] * len(tiers)  # tier id -> sum of its buckets' latest cumulatives
+
+        def entry(month: int, month_rows: List[ScheduleRow]) -> Dict[str, Any]:
+            # Get the date from first row (should be same for all rows in month)
+            date = month_rows[0].date
+
+            unlock = [0] * len(tiers)
+            buckets = []
+            for row in month_rows:
+                buckets.append({
+                    'tier': row.tier,
+                    'bucket_name': row.bucket_name,
+                    'unlock_tokens': int(row.amount),
+                    'unlock_pct_of_bucket': round(row.amount_pct, 2),
+                    'cumulative_tokens': int(row.cumulative_tokens),
+                    'cumulative_pct_of_bucket': round(row.cumulative_pct, 2),
+                    'notes': row.notes
+                })
+                bucket = row.bucket
+                tier = self.buckets[bucket].tier
+                if not seen[bucket]:
+                    seen[bucket] = True
+                    if not tier_buckets[tier]:
+                        tier_order.append(tier)
+                    tier_buckets[tier].append(bucket)
+                cumulative[bucket] = row.cumulative_tokens
+                unlock[tier] += row.amount
+
+            # Build tier_aggregates from the carried-forward cumulatives, summing
+            # across all buckets in each tier (not just those with rows this month).
+            tier_aggregates = {}
+            total_unlock = 0
+            total_cumulative = 0
+            for tier in tier_order:
+                tier_cumulative[tier] = sum(cumulative[bucket] for bucket in tier_buckets[tier])
+                tier_total = tier_tokens[tier]
+                tier_aggregates[tiers[tier]] = {
+                    'unlock_tokens': int(unlock[tier]),
+                    'cumulative_tokens': int(tier_cumulative[tier]),
+                    'cumulative_pct_of_tier': round(
+                        (tier_cumulative[tier] / tier_total * 100) if tier_total > 0 else 0,
+                        2
+                    )
+                }
+                total_unlock += unlock[tier]
+                total_cumulative += tier_cumulative[tier]
+
+            # Calculate total
+            total_cumulative_pct = round(
+                (total_cumulative / total_genesis_tokens * 100) if total_genesis_tokens > 0 else 0,
                 2
             )
 
-        # Calculate total
-        total_unlock = sum(tier_aggregates[t]['unlock_tokens'] for t in tier_aggregates)
-        total_cumulative = sum(tier_aggregates[t]['cumulative_tokens'] for t in tier_aggregates)
-        total_cumulative_pct = round(
-            (total_cumulative / total_genesis_tokens * 100) if total_genesis_tokens > 0 else 0,
-            2
-        )
-
-        monthly_schedule.append({
-            'month': month,
-            'date': date,
-            'buckets': buckets,
-            'tier_aggregates': {
-                tier: {
-                    'unlock_tokens': int(agg['unlock_tokens']),
-                    'cumulative_tokens': int(agg['cumulative_tokens']),
-                    'cumulative_pct_of_tier': agg['cumulative_pct_of_tier']
+            return {
+                'month': month,
+                'date': date,
+                'buckets': buckets,
+                'tier_aggregates': tier_aggregates,
+                'total': {
+                    'unlock_tokens': int(total_unlock),
+                    'cumulative_tokens': int(total_cumulative),
+                    'cumulative_pct_of_genesis': total_cumulative_pct
                 }
-                for tier, agg in tier_aggregates.items()
-            },
-            'total': {
-                'unlock_tokens': int(total_unlock),
-                'cumulative_tokens': int(total_cumulative),
-                'cumulative_pct_of_genesis': total_cumulative_pct
             }
-        })
-
-    # Generate milestone summary
-    milestones = {}
-    milestone_months = [0, 6, 12, 18, 24, 36, 48]
-
-    for milestone_month in milestone_months:
-        if milestone_month in months_data:
-            month_entry = next(m for m in monthly_schedule if m['month'] == milestone_month)
-            key = f"at_tge" if milestone_month == 0 else f"at_month_{milestone_month}"
-            milestones[key] = {
-                'month': milestone_month,
-                'date': month_entry['date'],
-                'liquid_pct_of_genesis': month_entry['total']['cumulative_pct_of_genesis'],
-                'liquid_tokens': month_entry['total']['cumulative_tokens']
+
+        # Reading a month's rows is timed as 'parse' and building its entry as
+        # 'aggregate'; both run while the writer pulls the next entry.
+        months = groupby(rows, key=lambda row: row.month)
+        while True:
+            with stage('parse'):
+                month, month_rows = next(months, (None, None))
+                if month_rows is None:
+                    return
+                month_rows = list(month_rows)
+            with stage('aggregate') as timer:
+                for row in month_rows:
+                    row.bucket = self.names.bucket(row.tier, row.bucket_name)
+                for key, row in sorted(((timeline.sort_key(row), row) for row in month_rows),
+                                       key=lambda item: item[0]):
+                    timeline.add(row, key)
+                month_entry = entry(month, month_rows)
+                timer.rows += len(month_rows)
+                if month in MILESTONE_MONTHS:
+                    key = f"at_tge" if month == 0 else f"at_month_{month}"
+                    self.milestones[key] = {
+                        'month': month,
+                        'date': month_entry['date'],
+                        'liquid_pct_of_genesis': month_entry['total']['cumulative_pct_of_genesis'],
+                        'liquid_tokens': month_entry['total']['cumulative_tokens']
+                    }
+            self.last_entry = month_entry
+            yield month_entry
+
+    def milestone_summary(self) -> Dict[str, Any]:
+        """Milestones collected by iter_monthly_schedule, plus the full-unlock month."""
+        milestones = dict(self.milestones)
+        final_month_entry = self.last_entry
+        if final_month_entry is not None and final_month_entry['total']['cumulative_pct_of_genesis'] >= 99.9:
+            milestones['at_full_unlock'] = {
+                'month': final_month_entry['month'],
+                'date': final_month_entry['date'],
+                'liquid_pct_of_genesis': 100.0,
+                'liquid_tokens': final_month_entry['total']['cumulative_tokens']
             }
+        return milestones
+
+    def iter_document(self, rows: Iterable[ScheduleRow]) -> Iterator[Tuple[str, Any]]:
+        """(key, value) pairs of vesting-schedule.json; monthly_schedule is a generator."""
+        genesis_data = self.genesis_data
+
+        # Calculate tier totals
+        tier_totals_calc = {}
+        total_genesis_tokens = 0
+        for tier, tier_total in self.tier_totals().items():
+            tier_totals_calc[tier] = {
+                'tokens': tier_total
+            }
+            total_genesis_tokens += tier_total
+
+        # Build tier_totals for output
+        tier_totals_output = {}
+        for tier, data in tier_totals_calc.items():
+            tier_totals_output[tier] = {
+                'tokens': int(data['tokens']),
+                'pct_of_genesis': round((data['tokens'] / total_genesis_tokens * 100) if total_genesis_tokens > 0 else 0, 2)
+            }
+
+        # Extract project info from genesis or use defaults
+        genesis_date = genesis_data.get('genesis_date', self.first_date or 'unknown')
+        timeline = TimelineBuilder(genesis_date, total_genesis_tokens, 'step', self.has_blocks)
+        self.milestones, self.last_entry = {}, None
+
+        yield 'project', genesis_data.get('project', 'unknown')
+        yield 'genesis_date', genesis_date
+        yield 'total_genesis_allocation_tokens', int(total_genesis_tokens)
+        yield 'total_genesis_allocation_pct', genesis_data.get('total_genesis_allocation_pct', 0)
+        yield 'tier_totals', tier_totals_output
+        yield 'monthly_schedule', self.iter_monthly_schedule(rows, tier_totals_calc, total_genesis_tokens, timeline)
+        # Both are complete once monthly_schedule has been consumed
+        yield 'milestone_summary', self.milestone_summary()
+        yield 'timeline', timeline.finish()
+
+    def document(self, rows: Iterable[ScheduleRow]) -> serialization.StreamedObject:
+        """vesting-schedule.json for serialization.write, generated while it is written."""
+        return serialization.StreamedObject(self.iter_document(rows))
+
+    def to_json(self, rows: Iterable[ScheduleRow]) -> Dict[str, Any]:
+        """The vesting-schedule.json structure as a dict (holds every entry)."""
+        return self.document(rows).materialize()
+
+
+def parse_csv(csv_path: Path) -> Iterator[ScheduleRow]:
+    """Stream typed rows from a vesting schedule CSV."""
+    return iter_schedule_rows(csv_path, 'unlock')
+
+
+def _build(rows: Iterable[ScheduleRow], genesis_data: Dict[str, Any]) -> ScheduleBuilder:
+    builder = ScheduleBuilder(genesis_data)
+    for row in rows:
+        builder.add(row)
+    builder.finish_validation()
+    return builder
+
+
+def validate_csv_data(rows: Iterable[ScheduleRow], genesis_data: Dict[str, Any]) -> List[str]:
+    """Validate CSV rows and return list of errors."""
+    return _build(rows, genesis_data).errors
+
 
-    # Find full unlock milestone
-    final_month_entry = monthly_schedule[-1]
-    if final_month_entry['total']['cumulative_pct_of_genesis'] >= 99.9:
-        milestones['at_full_unlock'] = {
-            'month': final_month_entry['month'],
-            'date': final_month_entry['date'],
-            'liquid_pct_of_genesis': 100.0,
-            'liquid_tokens': final_month_entry['total']['cumulative_tokens']
-        }
-
-    # Build tier_totals for output
-    tier_totals_output = {}
-    for tier, data in tier_totals_calc.items():
-        tier_totals_output[tier] = {
-            'tokens': int(data['tokens']),
-            'pct_of_genesis': round((data['tokens'] / total_genesis_tokens * 100) if total_genesis_tokens > 0 else 0, 2)
-        }
-
-    # Extract project info from genesis or use defaults
-    project_name = genesis_data.get('project', 'unknown')
-    genesis_date = genesis_data.get('genesis_date', rows[0]['date'] if rows else 'unknown')
-
-    return {
-        'project': project_name,
-        'genesis_date': genesis_date,
-        'total_genesis_allocation_tokens': int(total_genesis_tokens),
-        'total_genesis_allocation_pct': genesis_data.get('total_genesis_allocation_pct', 0),
-        'tier_totals': tier_totals_output,
-        'monthly_schedule': monthly_schedule,
-        'milestone_summary': milestones
-    }
+def convert_to_json(csv_path: Path, genesis_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a CSV file to JSON format (two streaming passes over the file)."""
+    builder = _build(parse_csv(csv_path), genesis_data)
+    return builder.to_json(month_ordered(lambda: parse_csv(csv_path), builder.in_month_order))
 
 
 def main():
@@ -340,19 +397,22 @@ def main():
     else:
         print(f"⚠ Genesis.json not found: {genesis_path} (validation will be limited)")
 
-    # Parse CSV
+    # First pass: parse and validate, keeping only per-bucket state
     print(f"✓ Parsing CSV: {csv_path}")
-    rows = parse_csv(csv_path)
+    builder = feed(ScheduleBuilder(genesis_data), parse_csv(csv_path))
+    with stage('parse') as timer:
+        timer.bytes += csv_path.stat().st_size
 
-    if not rows:
+    if not builder.row_count:
         print("Error: CSV file is empty or invalid")
         sys.exit(1)
 
-    print(f"✓ Parsed {len(rows)} rows")
+    print(f"✓ Parsed {builder.row_count} rows")
 
     # Validate
     print("✓ Validating data...")
-    errors = validate_csv_data(rows, genesis_data)
+    with stage('validate'):
+        errors = builder.finish_validation()
 
     if errors:
         print(f"\n✗ Validation failed with {len(errors)} error(s):\n")
@@ -363,26 +423,29 @@ def main():
 
     print("✓ All validations passed")
 
-    # Convert to JSON
+    # Second pass: each month is aggregated and written as it is read
     print("✓ Converting to JSON...")
-    json_data = convert_to_json(rows, genesis_data)
+    with stage('parse'):
+        rows = month_ordered(lambda: parse_csv(csv_path), builder.in_month_order)
+    document = builder.document(rows)
 
-    # Write output
+    # Write output (streamed: the serialize, parse and aggregate stages all run
+    # inside the write, each timed on its own)
     output_path = csv_path.with_suffix('.json')
-    with open(output_path, 'w') as f:
-        json.dump(json_data, f, indent=2)
+    with stage('write') as timer:
+        timer.bytes += serialization.write(output_path, document, stage=stage)
 
     print(f"✓ Generated: {output_path}")
 
     # Print summary
-    total_tokens = json_data['total_genesis_allocation_tokens']
-    final_month = json_data['monthly_schedule'][-1]
+    total_tokens = int(sum(builder.tier_totals().values()))
+    final_month = builder.last_entry
     print(f"\nSummary:")
-    print(f"  Project: {json_data['project']}")
+    print(f"  Project: {builder.genesis_data.get('project', 'unknown')}")
     print(f"  Total genesis allocation: {total_tokens:,} tokens")
     print(f"  Vesting period: {final_month['month']} months")
     print(f"  Final unlock: {final_month['date']}")
 
 
 if __name__ == '__main__':
-    main()
+    run_main(main, Path(__file__).stem)
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Semantic diff of two versions of a vesting / emission schedule or genesis file.
+
+A regenerated vesting-schedule.json differs in every bucket of every month
+when one row of the CSV changes, so the plain diff is unreadable. This tool
+aligns buckets by (tier, bucket_name) and months by month number and reports
+what changed per bucket:
+
+    total     final cumulative tokens
+    tge       tokens unlocked at month 0
+    cliff     first month after TGE with an unlock
+    vesting   months from the cliff to the last unlock
+    curve     largest |new - old| cumulative difference, and the month of it
+
+Each schedule becomes a (buckets x months) cumulative matrix, carried
+forward over months where a bucket has no row, so the curve comparison is
+one array subtraction however many months there are.
+
+Genesis files are diffed per bucket field (absolute_tokens, pct,
+tge_unlock_pct, cliff_months, vesting_months, ...) and per tier total_pct.
+
+Either side may be a path or a git revision in `git show` form (REV:path).
+With one argument the file is compared against its committed version
+(HEAD:path).
+
+Usage:
+    python scripts/diff_schedule.py allocations/quai/vesting-schedule.json
+    python scripts/diff_schedule.py HEAD~3:allocations/quai/vesting-schedule.json allocations/quai/vesting-schedule.json
+    python scripts/diff_schedule.py old.json new.json --limit 50 --json
+    python scripts/diff_schedule.py allocations/quai/vesting-schedule.json --profile --metrics-json metrics.json
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import serialization
+from instrumentation import run_main, stage
+from repository import REPO_ROOT, read_json
+
+
+LIMIT = 20
+AMOUNT_KEYS = ('unlock_tokens', 'emission_tokens')
+GENESIS_BUCKET_FIELDS = ('absolute_tokens', 'pct', 'tge_unlock_pct', 'cliff_months', 'vesting_months',
+                         'cost_per_token_usd', 'date')
+
+BucketKey = Tuple[str, str]
+
+
+def load_version(spec: str) -> Any:
+    """Parse a path, or REV:path read with git show."""
+    if not Path(spec).exists() and ':' in spec:
+        try:
+            text = subprocess.run(['git', 'show', spec], cwd=REPO_ROOT, capture_output=True,
+                                  text=True, check=True).stdout
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"git show {spec}: {e.stderr.strip()}")
+        return serialization.loads(text)
+    data = read_json(spec)
+    if data is None:
+        raise ValueError(f"File not found: {spec}")
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Schedules
+# ---------------------------------------------------------------------------
+
+class ScheduleMatrix:
+    """Cumulative tokens of every bucket at every month of one schedule.
+
+    observed marks the (bucket, month) cells the schedule actually lists;
+    the rest are carried forward from the bucket's previous row.
+    """
+
+    def __init__(self, schedule: Dict[str, Any], months: np.ndarray, keys: List[BucketKey]):
+        self.index = {key: i for i, key in enumerate(keys)}
+        self.months = months
+        position = {int(month): j for j, month in enumerate(months)}
+
+        rows, cols, cumulative, amounts = [], [], [], []
+        for entry in schedule.get('monthly_schedule', []):
+            j = position[entry['month']]
+            for bucket in entry['buckets']:
+                rows.append(self.index[(bucket['tier'], bucket['bucket_name'])])
+                cols.append(j)
+                cumulative.append(bucket.get('cumulative_tokens', 0))
+                amounts.append(next((bucket[k] for k in AMOUNT_KEYS if k in bucket), 0))
+
+        shape = (len(keys), len(months))
+        rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        # Carry each bucket's last cumulative forward over months without a row
+        self.observed = np.zeros(shape, dtype=bool)
+        self.observed[rows, cols] = True
+        values = np.zeros(shape, dtype=np.float64)
+        values[rows, cols] = cumulative
+        last = np.maximum.accumulate(np.where(self.observed, np.arange(shape[1]), -1), axis=1)
+        self.present = np.zeros(len(keys), dtype=bool)
+        self.present[rows] = True
+        self.cumulative = np.where(last >= 0, np.take_along_axis(values, np.maximum(last, 0), axis=1), 0.0)
+        self.unlocks = np.zeros(shape, dtype=np.float64)
+        np.add.at(self.unlocks, (rows, cols), amounts)
+
+
+def bucket_keys(schedule: Dict[str, Any]) -> List[BucketKey]:
+    """(tier, bucket_name) in first-seen order."""
+    keys = {}
+    for entry in schedule.get('monthly_schedule', []):
+        for bucket in entry['buckets']:
+            keys.setdefault((bucket['tier'], bucket['bucket_name']), None)
+    return list(keys)
+
+
+def unlock_shape(months: np.ndarray, unlocks: np.ndarray) -> Dict[str, Optional[np.ndarray]]:
+    """tge tokens, cliff month and vesting length per bucket row (NaN where undefined)."""
+    positive = unlocks > 0
+    after_tge = positive & (months > 0)[None, :]
+    has_after = after_tge.any(axis=1)
+    first = np.where(has_after, months[np.argmax(after_tge, axis=1)], np.nan)
+    last = np.where(has_after, months[len(months) - 1 - np.argmax(after_tge[:, ::-1], axis=1)], np.nan)
+    tge = unlocks[:, months == 0].sum(axis=1) if (months == 0).any() else np.zeros(len(unlocks))
+    return {'tge': tge, 'cliff': first, 'vesting': last - first}
+
+
+def _number(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
+
+def diff_schedules(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    old_keys, new_keys = bucket_keys(old), bucket_keys(new)
+    keys = old_keys + [key for key in new_keys if key not in set(old_keys)]
+    months = np.union1d([e['month'] for e in old.get('monthly_schedule', [])],
+                        [e['month'] for e in new.get('monthly_schedule', [])]).astype(np.int64)
+
+    before, after = ScheduleMatrix(old, months, keys), ScheduleMatrix(new, months, keys)
+    delta = after.cumulative - before.cumulative
+    shape_before, shape_after = unlock_shape(months, before.unlocks), unlock_shape(months, after.unlocks)
+    total_before, total_after = before.cumulative[:, -1], after.cumulative[:, -1]
+    if len(months):
+        worst = np.argmax(np.abs(delta), axis=1)
+        max_delta = delta[np.arange(len(keys)), worst]
+    else:
+        worst = max_delta = np.zeros(len(keys))
+
+    buckets = []
+    for i, (tier, name) in enumerate(keys):
+        status = 'added' if not before.present[i] else 'removed' if not after.present[i] else 'changed'
+        record = {
+            'tier': tier,
+            'bucket_name': name,
+            'status': status,
+            'total': [_number(total_before[i]), _number(total_after[i])],
+        }
+        for field in ('tge', 'cliff', 'vesting'):
+            record[field] = [_number(shape_before[field][i]), _number(shape_after[field][i])]
+        record['max_curve_delta'] = _number(max_delta[i])
+        record['max_curve_delta_month'] = int(months[worst[i]]) if max_delta[i] else None
+        if status == 'changed' and not max_delta[i] and \
+                all(record[f][0] == record[f][1] for f in ('total', 'tge', 'cliff', 'vesting')):
+            continue
+        buckets.append(record)
+    buckets.sort(key=lambda r: -abs(r['max_curve_delta'] or 0))
+
+    total_delta = delta.sum(axis=0)
+    return {
+        'kind': 'schedule',
+        'months': [len(old.get('monthly_schedule', [])), len(new.get('monthly_schedule', []))],
+        'last_month': [_last_month(old), _last_month(new)],
+        'buckets_compared': len(keys),
+        'total_tokens': [_number(total_before.sum()), _number(total_after.sum())],
+        'max_total_curve_delta': _number(total_delta[np.argmax(np.abs(total_delta))]) if len(months) else None,
+        'changed': buckets,
+    }
+
+
+def _last_month(schedule: Dict[str, Any]) -> Optional[int]:
+    entries = schedule.get('monthly_schedule', [])
+    return entries[-1]['month'] if entries else None
+
+
+# ---------------------------------------------------------------------------
+# Genesis files
+# ---------------------------------------------------------------------------
+
+def genesis_tiers(genesis: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """allocation_tiers without non-tier entries (the template's _comment strings)."""
+    return {tier: tier_data for tier, tier_data in (genesis.get('allocation_tiers') or {}).items()
+            if isinstance(tier_data, dict)}
+
+
+def genesis_buckets(genesis: Dict[str, Any]) -> Dict[BucketKey, Dict[str, Any]]:
+    return {
+        (tier, bucket.get('name')): bucket
+        for tier, tier_data in genesis_tiers(genesis).items()
+        for bucket in tier_data.get('buckets') or []
+        if isinstance(bucket, dict)
+    }
+
+
+def diff_genesis(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    before, after = genesis_buckets(old), genesis_buckets(new)
+    changed = []
+    for key in list(before) + [k for k in after if k not in before]:
+        if key not in after or key not in before:
+            bucket = before.get(key) or after.get(key)
+            changed.append({'tier': key[0], 'bucket_name': key[1], 'status': 'removed' if key not in after else 'added',
+                            'fields': {f: [before.get(key, {}).get(f), after.get(key, {}).get(f)]
+                                       for f in GENESIS_BUCKET_FIELDS if f in bucket}})
+            continue
+        fields = {f: [before[key].get(f), after[key].get(f)] for f in GENESIS_BUCKET_FIELDS
+                  if before[key].get(f) != after[key].get(f)}
+        if fields:
+            changed.append({'tier': key[0], 'bucket_name': key[1], 'status': 'changed', 'fields': fields})
+
+    old_tiers, new_tiers = genesis_tiers(old), genesis_tiers(new)
+    tiers = {
+        tier: [old_tiers.get(tier, {}).get('total_pct'), new_tiers.get(tier, {}).get('total_pct')]
+        for tier in list(old_tiers) + [t for t in new_tiers if t not in old_tiers]
+        if old_tiers.get(tier, {}).get('total_pct') != new_tiers.get(tier, {}).get('total_pct')
+    }
+    top = {
+        field: [old.get(field), new.get(field)]
+        for field in ('genesis_date', 'total_genesis_allocation_pct', 'has_premine')
+        if old.get(field) != new.get(field)
+    }
+    return {'kind': 'genesis', 'buckets_compared': len(set(before) | set(after)),
+            'fields': top, 'tiers': tiers, 'changed': changed}
+
+
+def diff_documents(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    if 'monthly_schedule' in old or 'monthly_schedule' in new:
+        return diff_schedules(old, new)
+    if 'allocation_tiers' in old or 'allocation_tiers' in new:
+        return diff_genesis(old, new)
+    raise ValueError("Neither a schedule (monthly_schedule) nor a genesis file (allocation_tiers)")
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def _pair(values: List[Any], tokens: bool = False) -> str:
+    old, new = values
+    fmt = (lambda v: '-' if v is None else f'{v:,}') if tokens else (lambda v: '-' if v is None else str(v))
+    return fmt(old) if old == new else f'{fmt(old)} → {fmt(new)}'
+
+
+def print_schedule_diff(result: Dict[str, Any], limit: int):
+    print(f"Months: {_pair(result['months'])} (last month {_pair(result['last_month'])}), "
+          f"total tokens {_pair(result['total_tokens'], tokens=True)}")
+    if result['max_total_curve_delta']:
+        print(f"Largest change in total cumulative: {result['max_total_curve_delta']:+,} tokens")
+    changed = result['changed']
+    if not changed:
+        print(f"✓ No bucket changed ({result['buckets_compared']} compared)")
+        return
+
+    print(f"\n{len(changed)} of {result['buckets_compared']} bucket(s) changed:\n")
+    rows = []
+    for record in changed[:limit]:
+        label = f"{record['tier']}/{record['bucket_name']}"
+        if len(label) > 48:
+            label = label[:47] + '…'
+        curve = '-' if not record['max_curve_delta'] else \
+            f"{record['max_curve_delta']:+,} @ m{record['max_curve_delta_month']}"
+        marker = {'added': '(added)', 'removed': '(removed)'}.get(record['status'], '')
+        rows.append((label, _pair(record['total'], tokens=True), _pair(record['cliff']),
+                     _pair(record['vesting']), curve, marker))
+    header = ('bucket', 'total', 'cliff', 'vesting', 'max Δ cumulative', '')
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(5)]
+
+    def line(row):
+        return ('  ' + row[0].ljust(widths[0]) + ''.join(f'  {cell:>{w}}' for cell, w in zip(row[1:5], widths[1:]))
+                + (f'  {row[5]}' if row[5] else ''))
+
+    print(line(header))
+    for record, row in zip(changed, rows):
+        print(line(row))
+        if record['tge'][0] != record['tge'][1]:
+            print(f"  {'':<{widths[0]}}  tge {_pair(record['tge'], tokens=True)}")
+    if len(changed) > limit:
+        print(f"\n  … {len(changed) - limit} more (--limit, or --json for all)")
+
+
+def print_genesis_diff(result: Dict[str, Any], limit: int):
+    for field, values in result['fields'].items():
+        print(f"{field}: {_pair(values)}")
+    for tier, values in result['tiers'].items():
+        print(f"{tier} total_pct: {_pair(values)}")
+    changed = result['changed']
+    if not changed and not result['fields'] and not result['tiers']:
+        print(f"✓ No genesis terms changed ({result['buckets_compared']} bucket(s) compared)")
+        return
+    if changed:
+        print(f"\n{len(changed)} of {result['buckets_compared']} bucket(s) changed:")
+    for record in changed[:limit]:
+        marker = {'added': ' (added)', 'removed': ' (removed)'}.get(record['status'], '')
+        print(f"  {record['tier']}/{record['bucket_name']}{marker}")
+        for field, values in record['fields'].items():
+            print(f"      {field}: {_pair(values, tokens=field == 'absolute_tokens')}")
+    if len(changed) > limit:
+        print(f"\n  … {len(changed) - limit} more (--limit, or --json for all)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Semantic diff of two schedule or genesis versions.')
+    parser.add_argument('old', help='Old version: a path or REV:path (with no NEW: HEAD:<path> vs the working copy)')
+    parser.add_argument('new', nargs='?', help='New version: a path or REV:path')
+    parser.add_argument('--limit', type=int, default=LIMIT, help=f'Buckets to list (default: {LIMIT})')
+    parser.add_argument('--json', action='store_true', help='Print the full diff as JSON')
+    args = parser.parse_args()
+
+    old_spec, new_spec = args.old, args.new
+    if new_spec is None:
+        path = Path(old_spec).resolve()
+        try:
+            old_spec, new_spec = f'HEAD:{path.relative_to(REPO_ROOT).as_posix()}', args.old
+        except ValueError:
+            parser.error('with a single argument the file must be inside the repository')
+
+    try:
+        with stage('parse') as timer:
+            old, new = load_version(old_spec), load_version(new_spec)
+            timer.rows += 2
+        with stage('aggregate'):
+            result = diff_documents(old, new)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(serialization.dumps(result))
+        return
+    print(f"{old_spec}  →  {new_spec}")
+    if result['kind'] == 'schedule':
+        print_schedule_diff(result, args.limit)
+    else:
+        print_genesis_diff(result, args.limit)
+
+
+if __name__ == '__main__':
+    run_main(main, Path(__file__).stem)
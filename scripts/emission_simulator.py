@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+PoW Tokenomics Tracker - Emission Simulator
+
+Turns a project's emission.halving_schedule (or a closed-form emission curve)
+into cumulative mined supply per block height and per day, so current_supply
+and pct_mined can be projected instead of estimated by hand.
+
+Supported models:
+  emission.emission_curve.model = "polynomial_decay"
+      Closed form from the Pearl whitepaper: cumulative(h) = S * h / (h + H),
+      per-block subsidy S*H / ((h+H)(h+H-1)).
+  halving_schedule entries with a numeric `height` and reward_before/after
+      Piecewise reward per block (Bitcoin halvings, Ergo EIP-27 steps). When
+      one event's reward_after doesn't match the next event's reward_before,
+      the undocumented steps in between are modelled as a linear ramp. A
+      regular schedule (fixed interval, reward halves each time) is extended
+      past the last listed event.
+  halving_schedule entries with a `date` and reward_before/after_per_second
+      Time-based emission (Kaspa); the "height" axis is seconds since launch.
+
+An optional emission.chain_tip {"height", "date"} pins the height<->date
+mapping to an observed block, which matters for young chains whose early
+block times are far from target.
+
+Every model is compiled to a segment table with the cumulative supply at
+each segment start, so supply-at-height and height-for-supply are a
+binary search plus a closed-form step: O(log n) per query, vectorized over
+arbitrarily many heights. A height<->date chronology anchored on the dated
+halving events (extrapolated with block_time_seconds) answers the calendar
+questions.
+
+Usage:
+  python scripts/emission_simulator.py <project>                      # projection summary
+  python scripts/emission_simulator.py <project> --date 2030-01-01    # supply at a date
+  python scripts/emission_simulator.py <project> --pct 50 --pct 99    # when Y% is mined
+  python scripts/emission_simulator.py <project> --write              # project current_supply
+                                                                      # at last_updated, then
+                                                                      # recompute derived fields
+
+--write refuses when the projection is more than --supply-tolerance percent
+(default 1%) away from the file's current_supply: a gap that size means the
+halving schedule or chain_tip is incomplete, not that the supply moved.
+"""
+
+import argparse
+import copy
+import json
+import sys
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from compute_derived import apply_to, compute
+from repository import get_repository
+
+
+SECONDS_PER_DAY = 86400
+SUPPLY_TOLERANCE_PCT = 1.0
+
+
+def _number(value):
+    """Halving tables mix ints, floats and strings like "~1200000"."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.replace("~", "").replace(",", "").strip()
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_date(value):
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+class PiecewiseCurve:
+    """Cumulative emission for a reward that is constant or linear per segment.
+
+    Segment i covers heights [starts[i], starts[i+1]) and pays a reward that
+    moves linearly from r0[i] to r1[i]. The last segment is open-ended. Supply
+    is capped at max_supply when one is given.
+    """
+
+    def __init__(self, starts, r0, r1, max_supply=None):
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.r0 = np.asarray(r0, dtype=np.float64)
+        self.r1 = np.asarray(r1, dtype=np.float64)
+        self.max_supply = max_supply
+
+        lengths = np.diff(self.starts)
+        self.slopes = np.zeros_like(self.r0)
+        self.slopes[:-1] = np.divide(self.r1[:-1] - self.r0[:-1], lengths,
+                                     out=np.zeros_like(lengths), where=lengths > 0)
+        # Precomputed cumulative index: supply at the start of each segment.
+        segment_supply = self.r0[:-1] * lengths + self.slopes[:-1] * lengths ** 2 / 2
+        self.index = np.concatenate(([0.0], np.cumsum(segment_supply)))
+
+    def reward_at(self, heights):
+        h = np.asarray(heights, dtype=np.float64)
+        i = np.clip(np.searchsorted(self.starts, h, side="right") - 1, 0, None)
+        reward = self.r0[i] + self.slopes[i] * (h - self.starts[i])
+        if self.max_supply is not None:
+            reward = np.where(self.supply_at(h) >= self.max_supply, 0.0, reward)
+        return reward
+
+    def supply_at(self, heights):
+        h = np.maximum(np.asarray(heights, dtype=np.float64), 0.0)
+        i = np.clip(np.searchsorted(self.starts, h, side="right") - 1, 0, None)
+        d = h - self.starts[i]
+        supply = self.index[i] + self.r0[i] * d + self.slopes[i] * d ** 2 / 2
+        if self.max_supply is not None:
+            supply = np.minimum(supply, self.max_supply)
+        return supply
+
+    def height_for_supply(self, supply):
+        """Inverse of supply_at; NaN where the curve never reaches the supply."""
+        y = np.asarray(supply, dtype=np.float64)
+        i = np.clip(np.searchsorted(self.index, y, side="right") - 1, 0, None)
+        remaining = y - self.index[i]
+        r0, k = self.r0[i], self.slopes[i]
+        # Solve r0*d + k/2*d^2 = remaining (linear when the segment is flat).
+        disc = np.maximum(r0 ** 2 + 2 * k * remaining, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d = np.where(k == 0, remaining / r0, (np.sqrt(disc) - r0) / k)
+        heights = self.starts[i] + d
+        unreachable = ~np.isfinite(heights) | (heights < 0)
+        if self.max_supply is not None:
+            unreachable |= y > self.max_supply
+        return np.where(unreachable, np.nan, heights)
+
+    @property
+    def total_supply(self):
+        if self.max_supply is not None:
+            return float(self.max_supply)
+        return float(self.index[-1]) if self.r0[-1] == 0 else None
+
+
+class PolynomialDecayCurve:
+    """Pearl's closed form: cumulative(h) = S*h/(h+H)."""
+
+    def __init__(self, total_supply, half_height):
+        self.S = float(total_supply)
+        self.H = float(half_height)
+        self.max_supply = self.S
+
+    def reward_at(self, heights):
+        h = np.asarray(heights, dtype=np.float64)
+        return self.S * self.H / ((h + self.H) * (h + self.H - 1))
+
+    def supply_at(self, heights):
+        h = np.maximum(np.asarray(heights, dtype=np.float64), 0.0)
+        return self.S * h / (h + self.H)
+
+    def height_for_supply(self, supply):
+        y = np.asarray(supply, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h = y * self.H / (self.S - y)
+        return np.where((y >= self.S) | (y < 0), np.nan, h)
+
+    @property
+    def total_supply(self):
+        return self.S
+
+
+class Chronology:
+    """Maps block heights to calendar days since launch and back.
+
+    Anchored on (0, launch_date), every halving event with an observed height
+    and date, and emission.chain_tip when present; heights beyond the last
+    anchor advance at block_time_seconds per block. A time_based chronology's
+    "heights" are seconds since launch, so they don't depend on block time.
+    """
+
+    def __init__(self, launch_date, block_time_seconds, anchors=(), time_based=False):
+        self.launch = launch_date
+        self.block_time = float(block_time_seconds)
+        self.time_based = time_based
+        heights, days = [0.0], [0.0]
+        for height, when in sorted(anchors):
+            day = float((when - launch_date).days)
+            if height > heights[-1] and day > days[-1]:
+                heights.append(height)
+                days.append(day)
+        self.heights = np.array(heights)
+        self.days = np.array(days)
+
+    def day_at_height(self, heights):
+        h = np.asarray(heights, dtype=np.float64)
+        beyond = self.days[-1] + (h - self.heights[-1]) * self.block_time / SECONDS_PER_DAY
+        return np.where(h > self.heights[-1], beyond, np.interp(h, self.heights, self.days))
+
+    def height_at_day(self, days):
+        d = np.asarray(days, dtype=np.float64)
+        beyond = self.heights[-1] + (d - self.days[-1]) * SECONDS_PER_DAY / self.block_time
+        return np.where(d > self.days[-1], beyond, np.interp(d, self.days, self.heights))
+
+    def to_date(self, day):
+        return self.launch + timedelta(days=float(day))
+
+    def to_day(self, when):
+        return float((when - self.launch).days)
+
+
+def _height_events(schedule):
+    events = []
+    for entry in schedule:
+        height = _number(entry.get("height"))
+        before = _number(entry.get("reward_before"))
+        after = _number(entry.get("reward_after"))
+        if height is None or before is None or after is None:
+            continue
+        # Only observed dates anchor the chronology; date_est values were
+        # themselves derived from the target block time.
+        events.append((height, before, after, _parse_date(entry.get("date"))))
+    return sorted(events, key=lambda e: e[0])
+
+
+def _per_second_events(schedule, launch):
+    events = []
+    for entry in schedule:
+        when = _parse_date(entry.get("date")) or _parse_date(entry.get("date_est"))
+        before = _number(entry.get("reward_before_per_second"))
+        after = _number(entry.get("reward_after_per_second"))
+        if when is None or before is None or after is None:
+            continue
+        events.append((float((when - launch).days * SECONDS_PER_DAY), before, after, when))
+    return sorted(events, key=lambda e: e[0])
+
+
+def _piecewise_from_events(events, max_supply):
+    """Segments from (height, reward_before, reward_after) events."""
+    starts, r0, r1 = [0.0], [events[0][1]], [events[0][1]]
+    for n, (height, _before, after, _when) in enumerate(events):
+        nxt = events[n + 1][1] if n + 1 < len(events) else after
+        starts.append(height)
+        r0.append(after)
+        r1.append(nxt)
+
+    # A regular halving schedule keeps going after the last documented event.
+    heights = [e[0] for e in events]
+    intervals = np.diff([0.0] + heights)
+    halves = all(abs(after - before / 2) < 1e-9 for _h, before, after, _w in events)
+    if len(events) >= 2 and halves and np.allclose(intervals, intervals[0]):
+        reward, height = r0[-1], starts[-1]
+        while reward > 1e-8:
+            height += intervals[0]
+            reward /= 2
+            starts.append(height)
+            r0.append(reward)
+            r1.append(reward)
+        starts.append(height + intervals[0])
+        r0.append(0.0)
+        r1.append(0.0)
+
+    return PiecewiseCurve(starts, r0, r1, max_supply=max_supply)
+
+
+def _chain_tip(emission):
+    tip = emission.get("chain_tip") or {}
+    height, when = _number(tip.get("height")), _parse_date(tip.get("date"))
+    return [(height, when)] if height is not None and when is not None else []
+
+
+def build_model(project_data):
+    """Return (curve, chronology) for a project, or raise ValueError."""
+    supply = project_data.get("supply") or {}
+    emission = project_data.get("emission") or {}
+    max_supply = supply.get("max_supply")
+    block_time = emission.get("block_time_seconds")
+    launch = _parse_date(project_data.get("launch_date"))
+    schedule = emission.get("halving_schedule") or []
+
+    if launch is None:
+        raise ValueError("launch_date is missing or not YYYY-MM-DD")
+
+    curve_spec = emission.get("emission_curve") or {}
+    if curve_spec.get("model") == "polynomial_decay":
+        curve = PolynomialDecayCurve(curve_spec["total_supply"], curve_spec["half_emission_height"])
+        anchors = [(e[0], e[3]) for e in _height_events(schedule) if e[3] is not None]
+        return curve, Chronology(launch, block_time or 1, anchors + _chain_tip(emission))
+
+    events = _height_events(schedule)
+    if events and block_time:
+        curve = _piecewise_from_events(events, max_supply)
+        anchors = [(e[0], e[3]) for e in events if e[3] is not None]
+        return curve, Chronology(launch, block_time, anchors + _chain_tip(emission))
+
+    events = _per_second_events(schedule, launch)
+    if events:
+        # Height axis is seconds since launch, so one "block" per second.
+        return _piecewise_from_events(events, max_supply), Chronology(launch, 1, time_based=True)
+
+    raise ValueError("no machine-readable emission curve (needs emission_curve, "
+                     "height-based or per-second halving_schedule entries)")
+
+
+class EmissionSimulator:
+    """Calendar-level queries over a compiled emission model."""
+
+    def __init__(self, project_data):
+        self.curve, self.chronology = build_model(project_data)
+        self.max_supply = (project_data.get("supply") or {}).get("max_supply")
+
+    def supply_by_day(self, n_days):
+        """Cumulative mined supply at the end of each day since launch."""
+        heights = self.chronology.height_at_day(np.arange(1, n_days + 1))
+        return self.curve.supply_at(heights)
+
+    def supply_at_date(self, when):
+        height = self.chronology.height_at_day(self.chronology.to_day(when))
+        return float(self.curve.supply_at(height))
+
+    def date_when_pct_mined(self, pct):
+        """Date at which pct% of max_supply has been mined, or None if never."""
+        if not self.max_supply:
+            return None
+        height = float(self.curve.height_for_supply(self.max_supply * pct / 100))
+        if np.isnan(height):
+            return None
+        return self.chronology.to_date(float(self.chronology.day_at_height(height)))
+
+
+def project_current_supply(project_data, as_of=None):
+    """Simulated current_supply at as_of (default: the file's last_updated)."""
+    as_of = as_of or _parse_date(project_data.get("last_updated"))
+    if as_of is None:
+        raise ValueError("no as-of date: pass one or set last_updated")
+    return EmissionSimulator(project_data).supply_at_date(as_of)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project mined supply from a project's emission schedule.")
+    parser.add_argument("project")
+    parser.add_argument("--date", help="Supply at this YYYY-MM-DD date (default: last_updated or today)")
+    parser.add_argument("--pct", type=float, action="append",
+                        help="Report the date when this %% of max_supply is mined (repeatable)")
+    parser.add_argument("--write", action="store_true",
+                        help="Write the projected current_supply and recompute derived fields")
+    parser.add_argument("--supply-tolerance", type=float, default=SUPPLY_TOLERANCE_PCT,
+                        help="--write refuses when the projection is further than this %% from the "
+                             f"reported current_supply (default: {SUPPLY_TOLERANCE_PCT:g})")
+    args = parser.parse_args()
+
+    project = get_repository().project(args.project)
+    if project.data is None:
+        print(f"Project file not found: {project.project_path}")
+        sys.exit(1)
+    data = copy.deepcopy(project.data)  # the memoized document is shared
+
+    try:
+        simulator = EmissionSimulator(data)
+    except ValueError as e:
+        print(f"Cannot simulate {args.project}: {e}")
+        sys.exit(1)
+
+    as_of = _parse_date(args.date) if args.date else (_parse_date(data.get("last_updated")) or date.today())
+    projected = simulator.supply_at_date(as_of)
+    reported = (data.get("supply") or {}).get("current_supply")
+    max_supply = simulator.max_supply
+
+    print(f"Emission model for {args.project}: {type(simulator.curve).__name__}")
+    print(f"  supply at {as_of}: {projected:,.0f}", end="")
+    if max_supply:
+        print(f" ({projected / max_supply * 100:.2f}% of max)", end="")
+    print()
+    gap_pct = (projected - reported) / reported * 100 if reported else None
+    if reported is not None:
+        print(f"  reported current_supply: {reported:,}  (diff {projected - reported:+,.0f}", end="")
+        print(f", {gap_pct:+.2f}%)" if gap_pct is not None else ")")
+    for pct in args.pct or [50, 90, 99]:
+        when = simulator.date_when_pct_mined(pct)
+        print(f"  {pct:g}% mined: {when if when else 'never / unknown'}")
+
+    if args.write:
+        if gap_pct is not None and abs(gap_pct) > args.supply_tolerance:
+            print(f"\nNot written: the projection is {gap_pct:+.2f}% ({projected - reported:+,.0f}) away from "
+                  f"the reported current_supply, more than the {args.supply_tolerance:g}% tolerance.")
+            print("  Complete the halving schedule or emission.chain_tip first, "
+                  "or raise --supply-tolerance if the reported figure is stale.")
+            sys.exit(1)
+        data.setdefault("supply", {})["current_supply"] = int(round(projected))
+        computed = compute(data)
+        apply_to(data, computed)
+        with open(project.repository.path(project.project_path), "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        print(f"\nWrote projected current_supply and {len(computed)} derived field(s) to {project.project_path}")
+
+
+if __name__ == "__main__":
+    main()
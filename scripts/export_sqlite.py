@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Export the whole dataset into one normalized SQLite database.
+
+Analytics jobs that re-parse a dozen JSON files per question can query this
+instead:
+
+    projects        (project, ticker, consensus, algorithm, launch_date, launch_type,
+                     has_premine, last_updated, genesis_date, total_genesis_allocation_pct,
+                     current_supply, max_supply, ... the snapshots.py value fields)
+    tiers           (project, tier, total_pct)
+    buckets         (bucket_id, project, tier, name, pct, absolute_tokens, cost_per_token_usd,
+                     date, tge_unlock_pct, cliff_months, vesting_months, allocation_mechanism,
+                     total_investors, total_raised_usd, notes)
+    investors       (project, bucket_id, name, pct_of_round, tokens, notes)
+    halving_events  (project, event, date, date_estimated, height, reward_before,
+                     reward_after, reward_unit, description)
+    schedule_rows   (project, schedule, month, date, tier, bucket_name, tokens,
+                     pct_of_bucket, cumulative_tokens, cumulative_pct_of_bucket, notes)
+    source_files    (path, project, mtime_ns, size, sha256)
+
+    indexes on schedule_rows (project, month), schedule_rows (tier),
+    schedule_rows (date), buckets (tier) and halving_events (date)
+
+schedule is 'vesting' or 'emission'; tokens is unlock_tokens or emission_tokens.
+Unknown numbers ("unknown", "~2000") are stored as NULL in numeric columns.
+halving_events.reward_unit is 'block', or 'second' for per-second rewards
+(kaspa).
+
+Export is incremental by default. A project's input files (data/projects/<p>.json
+and allocations/<p>/{genesis,vesting-schedule,emission-schedule}.json) are
+compared with source_files by mtime and size first and by SHA-256 only when
+those differ. A project is rewritten only when an input's content changed or an
+input appeared or disappeared. Projects that no longer exist are deleted.
+Everything happens in one transaction, with prepared executemany inserts.
+--full drops and rebuilds the database.
+
+Usage:
+    python scripts/export_sqlite.py export                # incremental
+    python scripts/export_sqlite.py export --full
+    python scripts/export_sqlite.py query "SELECT project, SUM(tokens) FROM schedule_rows WHERE month <= 12 GROUP BY project"
+    python scripts/export_sqlite.py query "SELECT * FROM investors" --json
+
+The database (data/tokenomics.sqlite) is gitignored.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import serialization
+from instrumentation import run_main, stage
+from repository import REPO_ROOT, get_repository
+from snapshots import VALUE_FIELDS, hashrate_th
+
+
+DB_FILE = 'data/tokenomics.sqlite'
+SCHEMA_VERSION = 1
+
+PROJECT_COLUMNS = ['project', 'ticker', 'consensus', 'algorithm', 'launch_date', 'launch_type', 'has_premine',
+                   'last_updated', 'genesis_date', 'total_genesis_allocation_pct'] + list(VALUE_FIELDS)
+TIER_COLUMNS = ['project', 'tier', 'total_pct']
+BUCKET_COLUMNS = ['bucket_id', 'project', 'tier', 'name', 'pct', 'absolute_tokens', 'cost_per_token_usd', 'date',
+                  'tge_unlock_pct', 'cliff_months', 'vesting_months', 'allocation_mechanism',
+                  'total_investors', 'total_raised_usd', 'notes']
+INVESTOR_COLUMNS = ['project', 'bucket_id', 'name', 'pct_of_round', 'tokens', 'notes']
+HALVING_COLUMNS = ['project', 'event', 'date', 'date_estimated', 'height', 'reward_before', 'reward_after',
+                   'reward_unit', 'description']
+SCHEDULE_COLUMNS = ['project', 'schedule', 'month', 'date', 'tier', 'bucket_name', 'tokens', 'pct_of_bucket',
+                    'cumulative_tokens', 'cumulative_pct_of_bucket', 'notes']
+SOURCE_COLUMNS = ['path', 'project', 'mtime_ns', 'size', 'sha256']
+
+TABLES = {
+    'projects': PROJECT_COLUMNS,
+    'tiers': TIER_COLUMNS,
+    'buckets': BUCKET_COLUMNS,
+    'investors': INVESTOR_COLUMNS,
+    'halving_events': HALVING_COLUMNS,
+    'schedule_rows': SCHEDULE_COLUMNS,
+    'source_files': SOURCE_COLUMNS,
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS projects (
+    project TEXT PRIMARY KEY,
+    ticker TEXT, consensus TEXT, algorithm TEXT, launch_date TEXT, launch_type TEXT,
+    has_premine INTEGER, last_updated TEXT, genesis_date TEXT, total_genesis_allocation_pct REAL,
+    {', '.join(f'{name} REAL' for name in VALUE_FIELDS)}
+);
+CREATE TABLE IF NOT EXISTS tiers (
+    project TEXT NOT NULL, tier TEXT NOT NULL, total_pct REAL,
+    PRIMARY KEY (project, tier)
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    bucket_id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL, tier TEXT NOT NULL, name TEXT NOT NULL,
+    pct REAL, absolute_tokens REAL, cost_per_token_usd REAL, date TEXT,
+    tge_unlock_pct REAL, cliff_months REAL, vesting_months REAL, allocation_mechanism TEXT,
+    total_investors INTEGER, total_raised_usd REAL, notes TEXT
+);
+CREATE TABLE IF NOT EXISTS investors (
+    project TEXT NOT NULL, bucket_id INTEGER NOT NULL REFERENCES buckets (bucket_id),
+    name TEXT NOT NULL, pct_of_round TEXT, tokens REAL, notes TEXT
+);
+CREATE TABLE IF NOT EXISTS halving_events (
+    project TEXT NOT NULL, event TEXT, date TEXT, date_estimated INTEGER, height INTEGER,
+    reward_before REAL, reward_after REAL, reward_unit TEXT, description TEXT
+);
+CREATE TABLE IF NOT EXISTS schedule_rows (
+    project TEXT NOT NULL, schedule TEXT NOT NULL, month INTEGER NOT NULL, date TEXT,
+    tier TEXT NOT NULL, bucket_name TEXT NOT NULL, tokens REAL, pct_of_bucket REAL,
+    cumulative_tokens REAL, cumulative_pct_of_bucket REAL, notes TEXT
+);
+CREATE TABLE IF NOT EXISTS source_files (
+    path TEXT PRIMARY KEY, project TEXT NOT NULL, mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL, sha256 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedule_rows_project_month ON schedule_rows (project, month);
+CREATE INDEX IF NOT EXISTS schedule_rows_tier ON schedule_rows (tier);
+CREATE INDEX IF NOT EXISTS schedule_rows_date ON schedule_rows (date);
+CREATE INDEX IF NOT EXISTS buckets_project_tier ON buckets (project, tier);
+CREATE INDEX IF NOT EXISTS buckets_tier ON buckets (tier);
+CREATE INDEX IF NOT EXISTS investors_bucket ON investors (bucket_id);
+CREATE INDEX IF NOT EXISTS halving_events_date ON halving_events (date);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+SCHEDULE_FILES = {'vesting': 'vesting-schedule.json', 'emission': 'emission-schedule.json'}
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _text(value):
+    return value if isinstance(value, str) else None
+
+
+def input_paths(slug: str) -> List[str]:
+    """Repo-relative input files of one project (existing or not)."""
+    return [f'data/projects/{slug}.json', f'allocations/{slug}/genesis.json'] + \
+        [f'allocations/{slug}/{name}' for name in SCHEDULE_FILES.values()]
+
+
+class ProjectRows:
+    """Rows for every table from one project's files."""
+
+    def __init__(self, slug: str, documents: Dict[str, Any], first_bucket_id: int):
+        self.slug = slug
+        self.rows: Dict[str, List[Tuple]] = {table: [] for table in TABLES if table != 'source_files'}
+        self.next_bucket_id = first_bucket_id
+
+        project = documents.get(f'data/projects/{slug}.json')
+        genesis = documents.get(f'allocations/{slug}/genesis.json')
+        if project is not None or genesis is not None:
+            self.add_project(project or {}, genesis or {})
+        if genesis is not None:
+            self.add_genesis(genesis)
+        if project is not None:
+            self.add_halvings(project)
+        for schedule, name in SCHEDULE_FILES.items():
+            data = documents.get(f'allocations/{slug}/{name}')
+            if data is not None:
+                self.add_schedule(schedule, data)
+
+    def add_project(self, project: Dict[str, Any], genesis: Dict[str, Any]):
+        values = [
+            hashrate_th(project) if dotted is None else _number(((project.get(dotted.split('.')[0]) or {})
+                                                                   .get(dotted.split('.')[1])))
+            for dotted in VALUE_FIELDS.values()
+        ]
+        has_premine = project.get('has_premine', genesis.get('has_premine'))
+        self.rows['projects'].append((
+            self.slug, _text(project.get('ticker')), _text(project.get('consensus')),
+            _text(project.get('algorithm')), _text(project.get('launch_date')), _text(project.get('launch_type')),
+            None if has_premine is None else int(bool(has_premine)), _text(project.get('last_updated')),
+            _text(genesis.get('genesis_date')), _number(genesis.get('total_genesis_allocation_pct')),
+            *values,
+        ))
+
+    def add_genesis(self, genesis: Dict[str, Any]):
+        for tier, tier_data in (genesis.get('allocation_tiers') or {}).items():
+            if not isinstance(tier_data, dict):  # e.g. the template's _comment strings
+                continue
+            self.rows['tiers'].append((self.slug, tier, _number(tier_data.get('total_pct'))))
+            for bucket in tier_data.get('buckets') or []:
+                if not isinstance(bucket, dict):
+                    continue
+                bucket_id = self.next_bucket_id
+                self.next_bucket_id += 1
+                investors = bucket.get('investors')
+                if isinstance(investors, dict):
+                    known, summary = investors.get('known') or [], investors
+                else:
+                    known, summary = investors or [], {}
+                self.rows['buckets'].append((
+                    bucket_id, self.slug, tier, bucket.get('name', ''),
+                    _number(bucket.get('pct')), _number(bucket.get('absolute_tokens')),
+                    _number(bucket.get('cost_per_token_usd')), _text(bucket.get('date') or bucket.get('date_start')),
+                    _number(bucket.get('tge_unlock_pct')), _number(bucket.get('cliff_months')),
+                    _number(bucket.get('vesting_months')), _text(bucket.get('allocation_mechanism')),
+                    _number(summary.get('total_investors')), _number(summary.get('total_raised_usd')),
+                    _text(bucket.get('notes') or summary.get('notes')),
+                ))
+                for investor in known:
+                    if not isinstance(investor, dict) or not investor.get('name'):
+                        continue
+                    pct = investor.get('pct_of_round')
+                    self.rows['investors'].append((
+                        self.slug, bucket_id, investor['name'], None if pct is None else str(pct),
+                        _number(investor.get('tokens')), _text(investor.get('notes')),
+                    ))
+
+    def add_halvings(self, project: Dict[str, Any]):
+        for event in (project.get('emission') or {}).get('halving_schedule') or []:
+            per_second = 'reward_before_per_second' in event or 'reward_after_per_second' in event
+            suffix = '_per_second' if per_second else ''
+            height = event.get('height')
+            self.rows['halving_events'].append((
+                self.slug, None if event.get('event') is None else str(event['event']),
+                _text(event.get('date') or event.get('date_est')), int('date' not in event and 'date_est' in event),
+                height if isinstance(height, int) and not isinstance(height, bool) else None,
+                _number(event.get('reward_before' + suffix)), _number(event.get('reward_after' + suffix)),
+                'second' if per_second else 'block',
+                _text(event.get('description') or event.get('notes') or event.get('note')),
+            ))
+
+    def add_schedule(self, schedule: str, data: Dict[str, Any]):
+        rows = self.rows['schedule_rows']
+        slug = self.slug
+        for entry in data.get('monthly_schedule') or []:
+            month, date = entry['month'], entry.get('date')
+            for bucket in entry['buckets']:
+                if 'unlock_tokens' in bucket:
+                    tokens, pct = bucket['unlock_tokens'], bucket.get('unlock_pct_of_bucket')
+                else:
+                    tokens, pct = bucket.get('emission_tokens'), bucket.get('emission_pct_of_bucket')
+                rows.append((slug, schedule, month, date, bucket['tier'], bucket['bucket_name'], tokens, pct,
+                             bucket.get('cumulative_tokens'), bucket.get('cumulative_pct_of_bucket'),
+                             bucket.get('notes')))
+
+
+class Exporter:
+    """Incremental writer of the SQLite export."""
+
+    def __init__(self, db_path: Path, repository=None, full: bool = False):
+        self.repository = repository or get_repository()
+        self.db_path = db_path
+        if full and db_path.exists():
+            db_path.unlink()
+        self.conn = sqlite3.connect(str(db_path))
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] not in (0, SCHEMA_VERSION):
+            # Older layout: rebuild from scratch rather than migrate
+            self.conn.close()
+            db_path.unlink()
+            self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _stat(self, slug: str) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for path in input_paths(slug):
+            try:
+                st = os.stat(self.repository.path(path))
+            except FileNotFoundError:
+                continue
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _stored(self) -> Dict[str, Dict[str, Tuple[int, int, str]]]:
+        stored: Dict[str, Dict[str, Tuple[int, int, str]]] = {}
+        for path, project, mtime_ns, size, sha256 in self.conn.execute(
+                f"SELECT {', '.join(SOURCE_COLUMNS)} FROM source_files"):
+            stored.setdefault(project, {})[path] = (mtime_ns, size, sha256)
+        return stored
+
+    def export(self, slugs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Bring the database up to date. Returns counts of what was rewritten."""
+        all_slugs = self.repository.project_slugs()
+        slugs = slugs or all_slugs
+        stored = self._stored()
+        summary = {'exported': [], 'unchanged': [], 'deleted': [], 'rows': 0}
+
+        with self.conn:
+            for slug in sorted(set(stored) - set(all_slugs)):
+                self._delete(slug)
+                summary['deleted'].append(slug)
+
+            next_bucket_id = (self.conn.execute('SELECT MAX(bucket_id) FROM buckets').fetchone()[0] or 0) + 1
+            for slug in slugs:
+                stats = self._stat(slug)
+                previous = stored.get(slug, {})
+                # Cheap check first: same files with the same mtime and size
+                if set(stats) == set(previous) and all(stats[p] == previous[p][:2] for p in stats):
+                    summary['unchanged'].append(slug)
+                    continue
+
+                with stage('read') as timer:
+                    raw = {path: self.repository.path(path).read_bytes() for path in stats}
+                    timer.rows += len(raw)
+                hashes = {path: hashlib.sha256(data).hexdigest() for path, data in raw.items()}
+                sources = [(path, slug, *stats[path], hashes[path]) for path in stats]
+                self.conn.execute('DELETE FROM source_files WHERE project = ?', (slug,))
+                self._insert('source_files', sources)
+                if set(hashes) == set(previous) and all(hashes[p] == previous[p][2] for p in hashes):
+                    summary['unchanged'].append(slug)  # touched, not changed
+                    continue
+
+                with stage('parse') as timer:
+                    documents = {path: serialization.loads(data) for path, data in raw.items()}
+                    timer.rows += len(documents)
+                project = ProjectRows(slug, documents, next_bucket_id)
+                next_bucket_id = project.next_bucket_id
+                with stage('insert') as timer:
+                    self._delete(slug, keep_sources=True)
+                    for table, rows in project.rows.items():
+                        self._insert(table, rows)
+                        timer.rows += len(rows)
+                summary['exported'].append(slug)
+                summary['rows'] += sum(len(rows) for rows in project.rows.values())
+        return summary
+
+    def _delete(self, slug: str, keep_sources: bool = False):
+        for table in TABLES:
+            if table == 'source_files' and keep_sources:
+                continue
+            self.conn.execute(f'DELETE FROM {table} WHERE project = ?', (slug,))
+
+    def _insert(self, table: str, rows: Iterable[Tuple]):
+        columns = TABLES[table]
+        self.conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})", rows
+        )
+
+
+def query(db_path: Path, sql: str, params: Iterable[Any] = ()) -> Tuple[List[str], List[Tuple]]:
+    """Run one read-only query. Returns (column names, rows)."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        cursor = conn.execute(sql, tuple(params))
+        return [d[0] for d in cursor.description or []], cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def _format_cell(value) -> str:
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f'{value:,.0f}' if abs(value) >= 1000 else f'{value:.6g}'
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalized SQLite export of projects, allocations and schedules.')
+    parser.add_argument('--db', default=DB_FILE, help=f'SQLite file (default: {DB_FILE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_cmd = commands.add_parser('export', help='Create or update the database')
+    export_cmd.add_argument('projects', nargs='*', help='Only check these projects (default: all)')
+    export_cmd.add_argument('--full', action='store_true', help='Drop the database and export everything')
+
+    query_cmd = commands.add_parser('query', help='Run a read-only SQL query')
+    query_cmd.add_argument('sql')
+    query_cmd.add_argument('--json', action='store_true', help='Print rows as JSON objects')
+
+    args = parser.parse_args()
+    db_path = Path(args.db)
+    if not db_path.is_absolute():
+        db_path = REPO_ROOT / db_path
+
+    if args.command == 'export':
+        start = time.perf_counter()
+        exporter = Exporter(db_path, full=args.full)
+        try:
+            summary = exporter.export(args.projects or None)
+        finally:
+            exporter.close()
+        print(f"✓ Exported {len(summary['exported'])} project(s), {summary['rows']:,} row(s) "
+              f"in {time.perf_counter() - start:.2f}s; {len(summary['unchanged'])} unchanged"
+              + (f", {len(summary['deleted'])} deleted" if summary['deleted'] else '')
+              + f" → {args.db}")
+        return
+
+    if not db_path.exists():
+        print(f"❌ {args.db} not found; run: python scripts/export_sqlite.py export")
+        sys.exit(1)
+    try:
+        columns, rows = query(db_path, args.sql)
+    except sqlite3.Error as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if args.json:
+        print(serialization.dumps([dict(zip(columns, row)) for row in rows]))
+        return
+    cells = [[_format_cell(value) for value in row] for row in rows]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(columns)]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in cells:
+        print('  '.join(cell.ljust(w) for cell, w in zip(row, widths)))
+    print(f"({len(rows)} row(s))")
+
+
+if __name__ == '__main__':
+    run_main(main, Path(__file__).stem)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server that answers from a file of canned responses.
+
+refresh.py --offline points its HTTP client here instead of the real price,
+explorer and hashrate APIs, so the whole refresh path (connection pool, rate
+limits, retries, parsing, writing, compute_derived) runs without a network.
+
+The fixture file maps each real URL to the response it should get:
+
+    {
+      "responses": {
+        "https://blockchain.info/q/totalbc": {"body": "1994043400000000"},
+        "https://api.ergoplatform.com/api/v1/info": {"body": {"supply": 82222470000000000}},
+        "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&include_24hr_vol=true":
+            {"body": {...}, "fail_first": 1}
+      }
+    }
+
+A string body is sent as text/plain, anything else as JSON. "status"
+defaults to 200. "fail_first": N answers the first N requests for that URL
+with 503, to exercise the client's retries. URLs not in the file get 404.
+
+Requests arrive as http://127.0.0.1:<port>/<percent-encoded original URL>
+(see url_for). The server speaks HTTP/1.1 with Content-Length, so pooled
+client connections stay open across requests.
+
+Usage:
+    with FixtureServer(path) as server:
+        client = HttpClient(rewrite=server.url_for)
+        ...
+        server.requests    # original URLs, in arrival order
+
+    python scripts/fixture_server.py scripts/fixtures/refresh-responses.json --port 8765
+"""
+
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Union
+from urllib.parse import quote, unquote
+
+import serialization
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: '_Server'
+
+    def do_GET(self):
+        url = unquote(self.path[1:])
+        status, content_type, body = self.server.fixture.respond(url)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # quiet: FixtureServer.requests is the log
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    fixture: 'FixtureServer'
+
+
+class FixtureServer:
+    """Serve canned responses from a fixture file on 127.0.0.1."""
+
+    def __init__(self, fixture_path: Union[str, Path], port: int = 0):
+        self.responses: Dict[str, Dict[str, Any]] = serialization.load(fixture_path)['responses']
+        self.port = port
+        self.requests: List[str] = []
+        self._failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def respond(self, url: str):
+        """(status, content type, body bytes) for one request to url."""
+        with self._lock:
+            self.requests.append(url)
+            entry = self.responses.get(url)
+            if entry is None:
+                return 404, 'text/plain', b'no fixture for this URL'
+            failed = self._failures.get(url, 0)
+            if failed < entry.get('fail_first', 0):
+                self._failures[url] = failed + 1
+                return 503, 'text/plain', b'fixture: simulated outage'
+        body = entry.get('body', '')
+        if isinstance(body, str):
+            return entry.get('status', 200), 'text/plain', body.encode('utf-8')
+        return entry.get('status', 200), 'application/json', serialization.dumps(body, 'compact').encode('utf-8')
+
+    def url_for(self, url: str) -> str:
+        """The local URL that serves the fixture for url."""
+        return f'http://127.0.0.1:{self.port}/{quote(url, safe="")}'
+
+    def start(self) -> 'FixtureServer':
+        self._server = _Server(('127.0.0.1', self.port), _Handler)
+        self._server.fixture = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve canned HTTP responses from a fixture file.')
+    parser.add_argument('fixture', type=Path, help='Fixture JSON file')
+    parser.add_argument('--port', type=int, default=8765, help='Port on 127.0.0.1 (default: 8765)')
+    args = parser.parse_args()
+
+    server = FixtureServer(args.fixture, args.port).start()
+    print(f"✓ Serving {len(server.responses)} fixture(s) on http://127.0.0.1:{server.port}/<percent-encoded URL>")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,144 +4,370 @@ Generate comparison matrix across all projects with vesting schedules.
 
 Usage:
     python generate_comparison_matrix.py
+    python generate_comparison_matrix.py --profile --metrics-json metrics.json
+                                              # stage timings, see instrumentation.py
 
 Reads all allocations/*/vesting-schedule.json files and generates:
     allocations/comparison-matrix.json
 
+When a schedule has an up-to-date columnar copy (vesting-schedule.npz, see
+columnar.py) it is memory-mapped and indexed column-wise instead of parsing
+the JSON.
+
 The comparison matrix extracts key milestones (TGE, 6mo, 12mo, 18mo, 24mo, 36mo, 48mo)
 for easy cross-project comparison.
 """
 
-import json
 import sys
+from bisect import bisect_left
+from functools import cached_property
+from itertools import accumulate
 from pathlib import Path
 from typing import Dict, List, Any
-from datetime import datetime
+from datetime import date, datetime, timedelta
+
+import serialization
+from instrumentation import run_main, stage
+from repository import read_json
+from timeline import Timeline
+
+try:
+    from columnar import ColumnarSchedule, load_columnar
+except ImportError:  # numpy not installed: read the JSON schedules only
+    ColumnarSchedule = load_columnar = None
+
+
+MILESTONE_MONTHS = [0, 6, 12, 18, 24, 36, 48]
+
+# Day offsets read off the sparse timeline (when the schedule has one)
+DAY_MILESTONES = [30, 90, 180, 365, 730]
 
 
 def load_vesting_schedule(project_path: Path) -> Dict[str, Any]:
-    """Load a project's vesting schedule JSON."""
+    """Load a project's vesting schedule, preferring an up-to-date columnar .npz."""
     vesting_file = project_path / 'vesting-schedule.json'
 
-    if not vesting_file.exists():
-        return None
+    if load_columnar is not None:
+        columnar = load_columnar(vesting_file)
+        if columnar is not None:
+            return columnar
 
-    with open(vesting_file, 'r') as f:
-        return json.load(f)
+    return read_json(vesting_file)
 
 
 def load_emission_schedule(project_path: Path) -> Dict[str, Any]:
-    """Load a project's emission schedule JSON."""
+    """Load a project's emission schedule, preferring an up-to-date columnar .npz."""
     emission_file = project_path / 'emission-schedule.json'
 
-    if not emission_file.exists():
-        return None
-
-    with open(emission_file, 'r') as f:
-        return json.load(f)
+    if load_columnar is not None:
+        columnar = load_columnar(emission_file)
+        if columnar is not None:
+            return columnar
+
+    return read_json(emission_file)
+
+
+class ScheduleIndex:
+    """Lookups over one monthly_schedule, built in a single pass per project.
+
+    Holds month -> row position, the cumulative pct column and per-tier
+    cumulative columns. Milestone, unlock-rate and full-unlock queries are
+    O(1) no matter how many are asked. query.py subclasses it and adds
+    threshold searches ("first month >= p%"), a bisect over the running
+    maximum of the pct column that is built on first use.
+    """
+
+    def __init__(self, allocation_data: Dict[str, Any], is_emission: bool = False):
+        pct_key = 'cumulative_pct_of_total' if is_emission else 'cumulative_pct_of_genesis'
+
+        self.months: List[int] = []
+        self.dates: List[str] = []
+        self.pcts: List[float] = []
+        self.tokens: List[int] = []
+        self.position: Dict[int, int] = {}
+        self.tier_columns: Dict[str, Dict[str, List[Any]]] = {}
+        self.last_full_position = None
+
+        if ColumnarSchedule is not None and isinstance(allocation_data, ColumnarSchedule):
+            self._index_columns(allocation_data, pct_key)
+        else:
+            self._index_json(allocation_data.get('monthly_schedule', []), pct_key)
+
+        # Sparse day-level change points, if the converter emitted them
+        self.genesis_date = allocation_data.get('genesis_date', '')
+        self.timeline_section = allocation_data.get('timeline')
+        self.timeline = self.tokens_timeline = None
+        if self.timeline_section and self.timeline_section.get('day'):
+            self.timeline = Timeline.from_section(self.timeline_section)
+            self.tokens_timeline = Timeline.from_section(self.timeline_section, value='cumulative_tokens')
+
+    def _index_json(self, monthly_schedule: List[Dict[str, Any]], pct_key: str):
+        for position, entry in enumerate(monthly_schedule):
+            total = entry['total']
+            pct = total.get(pct_key, total.get('cumulative_pct_of_genesis', 0))
+
+            self.position[entry['month']] = position
+            self.months.append(entry['month'])
+            self.dates.append(entry['date'])
+            self.pcts.append(pct)
+            self.tokens.append(total['cumulative_tokens'])
+            if pct >= 99.9:
+                self.last_full_position = position
 
+            for tier, agg in entry['tier_aggregates'].items():
+                column = self.tier_columns.setdefault(tier, {'pct': [None] * position, 'tokens': [None] * position})
+                column['pct'].append(agg['cumulative_pct_of_tier'])
+                column['tokens'].append(agg['cumulative_tokens'])
+            for column in self.tier_columns.values():
+                if len(column['pct']) <= position:
+                    column['pct'].append(None)
+                    column['tokens'].append(None)
+
+    def _index_columns(self, schedule: 'ColumnarSchedule', pct_key: str):
+        """Same index, read column-wise from a columnar schedule without building dicts."""
+        if not len(schedule):
+            return
+        if not schedule.has_column('total', pct_key):
+            pct_key = 'cumulative_pct_of_genesis'
+
+        self.months = schedule.column('month', 'month')
+        self.dates = schedule.column('month', 'date')
+        self.pcts = schedule.column('total', pct_key) if schedule.has_column('total', pct_key) else [0] * len(schedule)
+        self.tokens = schedule.column('total', 'cumulative_tokens')
+        self.position = {month: position for position, month in enumerate(self.months)}
+        full = [position for position, pct in enumerate(self.pcts) if pct >= 99.9]
+        self.last_full_position = full[-1] if full else None
+
+        offsets = schedule.offsets('tier')
+        names = schedule.column('tier', '@name')
+        tier_pcts = schedule.column('tier', 'cumulative_pct_of_tier')
+        tier_tokens = schedule.column('tier', 'cumulative_tokens')
+        n_months = len(self.months)
+        for position in range(n_months):
+            for row in range(offsets[position], offsets[position + 1]):
+                column = self.tier_columns.setdefault(names[row], {'pct': [None] * n_months, 'tokens': [None] * n_months})
+                column['pct'][position] = tier_pcts[row]
+                column['tokens'][position] = tier_tokens[row]
+
+    def __len__(self):
+        return len(self.months)
+
+    def pct_at(self, month: int):
+        position = self.position.get(month)
+        return None if position is None else self.pcts[position]
+
+    # Threshold search for query.py (ProjectTimeline); the matrix itself never
+    # asks, so the running maximum is only built on first use.
+    @cached_property
+    def running_max_pct(self) -> List[float]:
+        return list(accumulate(self.pcts, max))
+
+    def first_month_reaching(self, pct: float):
+        """First month whose cumulative pct is >= pct, or None if never reached."""
+        position = bisect_left(self.running_max_pct, pct)
+        return self.months[position] if position < len(self.months) else None
+
+    def milestones(self, milestone_months: List[int]) -> Dict[str, Any]:
+        """Extract milestone data at specific months."""
+        milestones = {}
+
+        for milestone_month in milestone_months:
+            position = self.position.get(milestone_month)
+            if position is None:
+                continue
 
-def extract_milestones(allocation_data: Dict[str, Any], milestone_months: List[int], is_emission: bool = False) -> Dict[str, Any]:
-    """Extract milestone data at specific months."""
-    milestones = {}
-    monthly_schedule = allocation_data.get('monthly_schedule', [])
+            key = f"month_{milestone_month}" if milestone_month > 0 else "tge"
+            milestones[key] = {
+                'liquid_pct': self.pcts[position],
+                'liquid_tokens': self.tokens[position],
+                'date': self.dates[position],
+                'tier_breakdown': {
+                    tier: {
+                        'pct': column['pct'][position],
+                        'tokens': column['tokens'][position]
+                    }
+                    for tier, column in self.tier_columns.items()
+                    if column['pct'][position] is not None
+                }
+            }
 
-    # Create lookup by month
-    month_lookup = {entry['month']: entry for entry in monthly_schedule}
+        return milestones
 
-    # Determine which keys to use based on type
-    if is_emission:
-        pct_key = 'cumulative_pct_of_total'
-    else:
-        pct_key = 'cumulative_pct_of_genesis'
+    def day_milestones(self, days: List[int]) -> Dict[str, Any]:
+        """Liquid pct/tokens at day offsets from genesis, interpolated between change points."""
+        if self.timeline is None:
+            return {}
 
-    for milestone_month in milestone_months:
-        if milestone_month in month_lookup:
-            entry = month_lookup[milestone_month]
-            key = f"month_{milestone_month}" if milestone_month > 0 else "tge"
-            milestones[key] = {
-                'liquid_pct': entry['total'].get(pct_key, entry['total'].get('cumulative_pct_of_genesis', 0)),
-                'liquid_tokens': entry['total']['cumulative_tokens'],
-                'date': entry['date']
+        genesis = date.fromisoformat(self.genesis_date) if self.genesis_date else None
+        return {
+            f"day_{day}": {
+                'liquid_pct': round(self.timeline.at(day), 2),
+                'liquid_tokens': int(self.tokens_timeline.at(day)),
+                'date': (genesis + timedelta(days=day)).isoformat() if genesis else None
             }
+            for day in days
+        }
 
-            # Add tier breakdown
-            tier_breakdown = {}
-            for tier, agg in entry['tier_aggregates'].items():
-                tier_breakdown[tier] = {
-                    'pct': agg['cumulative_pct_of_tier'],
-                    'tokens': agg['cumulative_tokens']
-                }
+    def largest_unlock_day(self) -> Dict[str, Any]:
+        """The single post-TGE day releasing the most tokens (cliff shocks), for step timelines."""
+        if self.timeline is None or self.timeline.interpolation != 'step':
+            return None
+
+        # The TGE release at day 0 is already the tge milestone
+        largest = self.tokens_timeline.largest_step(start=1 if self.timeline.xs[0] == 0 else 0)
+        if largest is None:
+            return None
+        day, tokens = largest
+        position = self.timeline_section['day'].index(day)
+        previous_pct = self.timeline.ys[position - 1] if position else 0
+        return {
+            'day': day,
+            'date': self.timeline_section['date'][position],
+            'tokens': int(tokens),
+            'pct': round(self.timeline.ys[position] - previous_pct, 2)
+        }
 
-            milestones[key]['tier_breakdown'] = tier_breakdown
+    def unlock_rate(self, start_month: int, end_month: int) -> float:
+        """Calculate average monthly unlock rate between two months."""
+        start_pct = self.pct_at(start_month)
+        end_pct = self.pct_at(end_month)
 
-    return milestones
+        if start_pct is None or end_pct is None:
+            return 0.0
 
+        months_diff = end_month - start_month
+        if months_diff == 0:
+            return 0.0
 
-def calculate_unlock_rate(allocation_data: Dict[str, Any], start_month: int, end_month: int, is_emission: bool = False) -> float:
-    """Calculate average monthly unlock rate between two months."""
-    monthly_schedule = allocation_data.get('monthly_schedule', [])
-    month_lookup = {entry['month']: entry for entry in monthly_schedule}
+        return round((end_pct - start_pct) / months_diff, 2)
 
-    if start_month not in month_lookup or end_month not in month_lookup:
-        return 0.0
+    def full_unlock(self) -> Dict[str, Any]:
+        """Find when vesting/emission is fully complete (100%)."""
+        if self.last_full_position is not None:
+            return {
+                'month': self.months[self.last_full_position],
+                'date': self.dates[self.last_full_position]
+            }
 
-    # Determine which key to use
-    pct_key = 'cumulative_pct_of_total' if is_emission else 'cumulative_pct_of_genesis'
+        # If not fully complete, return last entry
+        if self.months:
+            return {
+                'month': self.months[-1],
+                'date': self.dates[-1],
+                'note': f"Not fully complete - only {self.pcts[-1]}% released"
+            }
 
-    start_pct = month_lookup[start_month]['total'].get(pct_key, month_lookup[start_month]['total'].get('cumulative_pct_of_genesis', 0))
-    end_pct = month_lookup[end_month]['total'].get(pct_key, month_lookup[end_month]['total'].get('cumulative_pct_of_genesis', 0))
+        return None
 
-    months_diff = end_month - start_month
-    if months_diff == 0:
-        return 0.0
 
-    return round((end_pct - start_pct) / months_diff, 2)
+def load_genesis_summary(project_path: Path) -> Dict[str, Any]:
+    """Load summary info from genesis.json."""
+    genesis = read_json(project_path / 'genesis.json')
+    return genesis_summary(genesis) if genesis is not None else {}
 
 
-def find_full_unlock_month(allocation_data: Dict[str, Any], is_emission: bool = False) -> Dict[str, Any]:
-    """Find when vesting/emission is fully complete (100%)."""
-    monthly_schedule = allocation_data.get('monthly_schedule', [])
+def genesis_summary(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary info from a parsed genesis.json."""
+    return {
+        'has_premine': data.get('has_premine', False),
+        'total_genesis_allocation_pct': data.get('total_genesis_allocation_pct', 0),
+        'genesis_date': data.get('genesis_date', ''),
+        'has_dev_tax': data.get('has_dev_tax', False)
+    }
 
-    # Determine which key to use
-    pct_key = 'cumulative_pct_of_total' if is_emission else 'cumulative_pct_of_genesis'
 
-    for entry in reversed(monthly_schedule):
-        pct = entry['total'].get(pct_key, entry['total'].get('cumulative_pct_of_genesis', 0))
-        if pct >= 99.9:
+def build_project_entry(project_dir: Path) -> Dict[str, Any]:
+    """Build one project's comparison matrix entry.
+
+    Returns None for projects that have no allocation schedule but do have a
+    premine (nothing to compare yet).
+    """
+    # Load genesis summary and both vesting and emission schedules
+    return project_entry(
+        project_dir.name,
+        load_genesis_summary(project_dir),
+        load_vesting_schedule(project_dir),
+        load_emission_schedule(project_dir),
+    )
+
+
+def project_entry(project_name: str, genesis_summary: Dict[str, Any],
+                  vesting_data: Dict[str, Any], emission_data: Dict[str, Any]) -> Dict[str, Any]:
+    """build_project_entry over data that is already loaded (schedules may be None)."""
+    # Check if project has allocation data
+    if not vesting_data and not emission_data:
+        # No allocation schedule - check if it's because no premine
+        if not genesis_summary.get('has_premine', False):
             return {
-                'month': entry['month'],
-                'date': entry['date']
+                'name': project_name,
+                'has_premine': False,
+                'allocation_type': 'fair_launch_only',
+                'note': 'No genesis allocation - 100% mining/staking distribution'
             }
+        return None
 
-    # If not fully complete, return last entry
-    if monthly_schedule:
-        last_entry = monthly_schedule[-1]
-        pct = last_entry['total'].get(pct_key, last_entry['total'].get('cumulative_pct_of_genesis', 0))
-        return {
-            'month': last_entry['month'],
-            'date': last_entry['date'],
-            'note': f"Not fully complete - only {pct}% released"
+    # Determine which schedule to use for milestone extraction
+    # Prefer vesting if both exist, otherwise use emission
+    primary_data = vesting_data if vesting_data else emission_data
+    is_emission = primary_data == emission_data
+
+    # Index the schedule once; every query below goes through it
+    index = ScheduleIndex(primary_data, is_emission=is_emission)
+
+    # Extract data
+    milestones = index.milestones(MILESTONE_MONTHS)
+
+    # Calculate metrics
+    unlock_rate_year_1 = index.unlock_rate(0, 12)
+    unlock_rate_year_2 = index.unlock_rate(12, 24)
+
+    full_unlock = index.full_unlock()
+
+    # Determine allocation type
+    allocation_type = 'time_locked_vesting'
+    if emission_data and not vesting_data:
+        allocation_type = 'emission_based'
+    elif vesting_data and emission_data:
+        allocation_type = 'hybrid'
+
+    project_entry = {
+        'name': project_name,
+        'has_premine': True,
+        'allocation_type': allocation_type,
+        'genesis_date': primary_data.get('genesis_date', ''),
+        'total_genesis_allocation_tokens': primary_data.get('total_genesis_allocation_tokens', primary_data.get('total_emission_tokens', 0)),
+        'total_genesis_allocation_pct': genesis_summary.get('total_genesis_allocation_pct', 0),
+        'tier_composition': {
+            tier: totals
+            for tier, totals in primary_data.get('tier_totals', {}).items()
+        },
+        'milestones': milestones,
+        'unlock_metrics': {
+            'avg_monthly_unlock_rate_year_1_pct': unlock_rate_year_1,
+            'avg_monthly_unlock_rate_year_2_pct': unlock_rate_year_2,
+            'full_unlock_month': full_unlock['month'] if full_unlock else None,
+            'full_unlock_date': full_unlock['date'] if full_unlock else None
         }
+    }
 
-    return None
-
+    if full_unlock and 'note' in full_unlock:
+        project_entry['unlock_metrics']['note'] = full_unlock['note']
 
-def load_genesis_summary(project_path: Path) -> Dict[str, Any]:
-    """Load summary info from genesis.json."""
-    genesis_file = project_path / 'genesis.json'
+    if index.timeline is not None:
+        project_entry['day_milestones'] = index.day_milestones(DAY_MILESTONES)
+        largest_unlock = index.largest_unlock_day()
+        if largest_unlock:
+            project_entry['unlock_metrics']['largest_unlock_day'] = largest_unlock
 
-    if not genesis_file.exists():
-        return {}
+    return project_entry
 
-    with open(genesis_file, 'r') as f:
-        data = json.load(f)
 
+def _matrix_document(projects: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {
-        'has_premine': data.get('has_premine', False),
-        'total_genesis_allocation_pct': data.get('total_genesis_allocation_pct', 0),
-        'genesis_date': data.get('genesis_date', ''),
-        'has_dev_tax': data.get('has_dev_tax', False)
+        'generated_date': datetime.now().strftime('%Y-%m-%d'),
+        'description': 'Cross-project comparison of genesis allocations and vesting schedules',
+        'milestone_columns': [f"month_{m}" if m > 0 else 'tge' for m in MILESTONE_MONTHS],
+        'projects': projects
     }
 
 
@@ -154,80 +380,33 @@ def generate_comparison_matrix(allocations_dir: Path) -> Dict[str, Any]:
         if not project_dir.is_dir():
             continue
 
-        project_name = project_dir.name
-
-        # Load genesis summary
-        genesis_summary = load_genesis_summary(project_dir)
-
-        # Load both vesting and emission schedules
-        vesting_data = load_vesting_schedule(project_dir)
-        emission_data = load_emission_schedule(project_dir)
-
-        # Check if project has allocation data
-        if not vesting_data and not emission_data:
-            # No allocation schedule - check if it's because no premine
-            if not genesis_summary.get('has_premine', False):
-                projects.append({
-                    'name': project_name,
-                    'has_premine': False,
-                    'allocation_type': 'fair_launch_only',
-                    'note': 'No genesis allocation - 100% mining/staking distribution'
-                })
-            continue
+        project_entry = build_project_entry(project_dir)
+        if project_entry is not None:
+            projects.append(project_entry)
 
-        # Determine which schedule to use for milestone extraction
-        # Prefer vesting if both exist, otherwise use emission
-        primary_data = vesting_data if vesting_data else emission_data
-        is_emission = primary_data == emission_data
-
-        # Extract data
-        milestone_months = [0, 6, 12, 18, 24, 36, 48]
-        milestones = extract_milestones(primary_data, milestone_months, is_emission=is_emission)
-
-        # Calculate metrics
-        unlock_rate_year_1 = calculate_unlock_rate(primary_data, 0, 12, is_emission=is_emission)
-        unlock_rate_year_2 = calculate_unlock_rate(primary_data, 12, 24, is_emission=is_emission)
-
-        full_unlock = find_full_unlock_month(primary_data, is_emission=is_emission)
-
-        # Determine allocation type
-        allocation_type = 'time_locked_vesting'
-        if emission_data and not vesting_data:
-            allocation_type = 'emission_based'
-        elif vesting_data and emission_data:
-            allocation_type = 'hybrid'
-
-        project_entry = {
-            'name': project_name,
-            'has_premine': True,
-            'allocation_type': allocation_type,
-            'genesis_date': primary_data.get('genesis_date', ''),
-            'total_genesis_allocation_tokens': primary_data.get('total_genesis_allocation_tokens', primary_data.get('total_emission_tokens', 0)),
-            'total_genesis_allocation_pct': genesis_summary.get('total_genesis_allocation_pct', 0),
-            'tier_composition': {
-                tier: totals
-                for tier, totals in primary_data.get('tier_totals', {}).items()
-            },
-            'milestones': milestones,
-            'unlock_metrics': {
-                'avg_monthly_unlock_rate_year_1_pct': unlock_rate_year_1,
-                'avg_monthly_unlock_rate_year_2_pct': unlock_rate_year_2,
-                'full_unlock_month': full_unlock['month'] if full_unlock else None,
-                'full_unlock_date': full_unlock['date'] if full_unlock else None
-            }
-        }
+    return _matrix_document(projects)
 
-        if full_unlock and 'note' in full_unlock:
-            project_entry['unlock_metrics']['note'] = full_unlock['note']
 
-        projects.append(project_entry)
+def patch_comparison_matrix(comparison_data: Dict[str, Any], allocations_dir: Path,
+                            project_names: List[str]) -> Dict[str, Any]:
+    """Rebuild only the named projects' entries in an existing matrix.
 
-    return {
-        'generated_date': datetime.now().strftime('%Y-%m-%d'),
-        'description': 'Cross-project comparison of genesis allocations and vesting schedules',
-        'milestone_columns': ['tge', 'month_6', 'month_12', 'month_18', 'month_24', 'month_36', 'month_48'],
-        'projects': projects
-    }
+    Every other entry is kept as-is. Entries are replaced in place, added in
+    name order, or dropped if the project no longer yields an entry.
+    """
+    if not comparison_data or 'projects' not in comparison_data:
+        return generate_comparison_matrix(allocations_dir)
+
+    entries = {p['name']: p for p in comparison_data['projects']}
+    for name in project_names:
+        project_dir = allocations_dir / name
+        entry = build_project_entry(project_dir) if project_dir.is_dir() else None
+        if entry is None:
+            entries.pop(name, None)
+        else:
+            entries[name] = entry
+
+    return _matrix_document([entries[name] for name in sorted(entries)])
 
 
 def main():
@@ -243,7 +422,9 @@ def main():
     print(f"✓ Scanning projects in: {allocations_dir}")
 
     # Generate comparison matrix
-    comparison_data = generate_comparison_matrix(allocations_dir)
+    with stage('aggregate') as timer:
+        comparison_data = generate_comparison_matrix(allocations_dir)
+        timer.rows += len(comparison_data['projects'])
 
     project_count = len(comparison_data['projects'])
     premine_count = sum(1 for p in comparison_data['projects'] if p.get('has_premine', False))
@@ -252,8 +433,8 @@ def main():
 
     # Write output
     output_path = allocations_dir / 'comparison-matrix.json'
-    with open(output_path, 'w') as f:
-        json.dump(comparison_data, f, indent=2)
+    with stage('write') as timer:
+        timer.bytes += serialization.write(output_path, comparison_data)
 
     print(f"✓ Generated: {output_path}")
 
@@ -277,4 +458,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    run_main(main, Path(__file__).stem)
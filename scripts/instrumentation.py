@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Per-stage timers, row/byte counters and an optional profiler for the pipeline scripts.
+
+The converters, comparison matrix, derived-field calculator, validator and
+build_all.py wrap their work in named stages:
+
+    with stage('parse') as s:
+        for row in parse_csv(csv_path):
+            ...
+        s.rows += builder.row_count
+
+Stages are the same across scripts where the work is the same (parse,
+validate, aggregate, serialize, write), so metrics from different runs line
+up. Repeated stages accumulate: seconds, calls, rows and bytes are summed.
+Stages may nest, and a stage's seconds exclude the stages nested in it: a
+streamed write runs serialize (and the aggregate work feeding it) inside
+write, and each is reported on its own.
+
+Each script's entry point goes through run_main(), which strips two flags
+from sys.argv before the script parses its own:
+
+    --metrics-json PATH   write the run's metrics as JSON to PATH
+    --profile             run under cProfile and tracemalloc; print the stage
+                          table and the top functions to stderr, and add both
+                          (plus peak traced memory) to the metrics JSON
+
+It also takes --json-format FORMAT (see serialization.py) off argv.
+
+Without either flag the timers still run (a perf_counter call per stage) but
+nothing is reported.
+
+Usage:
+    python scripts/csv_to_vesting_json.py allocations/quai/vesting-schedule.csv --profile
+    python scripts/build_all.py --force --metrics-json /tmp/build-metrics.json
+"""
+
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import serialization
+
+
+PROFILE_TOP = 25
+
+
+class StageRecord:
+    """Totals for one named stage."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.bytes = 0
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'seconds': round(self.seconds, 6), 'calls': self.calls, 'rows': self.rows, 'bytes': self.bytes}
+
+
+class Metrics:
+    """Stage timers for one process, in first-use order."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageRecord] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._active = threading.local()  # per-thread stack of open stages
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one block, minus nested stages. Safe to use from several threads; their times are summed."""
+        with self._lock:
+            record = self.stages.setdefault(name, StageRecord())
+        stack = self._active.__dict__.setdefault('stack', [])
+        counts = StageRecord()  # .seconds collects the time of nested stages
+        stack.append(counts)
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1].seconds += elapsed
+            with self._lock:
+                record.seconds += elapsed - counts.seconds
+                record.calls += 1
+                record.rows += counts.rows
+                record.bytes += counts.bytes
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+            'stages': {name: record.to_json() for name, record in self.stages.items()},
+        }
+
+
+METRICS = Metrics()
+
+
+def stage(name: str):
+    """Time a block under `name` in the process-wide metrics."""
+    return METRICS.stage(name)
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int = PROFILE_TOP) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{filename}:{line}({function})",
+            'calls': calls,
+            'tottime': round(tottime, 6),
+            'cumtime': round(cumtime, 6),
+        })
+    rows.sort(key=lambda r: r['cumtime'], reverse=True)
+    return rows[:limit]
+
+
+def print_stage_table(metrics: Dict[str, Any], file=sys.stderr):
+    total = metrics['total_seconds'] or 1.0
+    print(f"\n{'stage':<14} {'seconds':>10} {'share':>7} {'calls':>7} {'rows':>10} {'bytes':>12}", file=file)
+    for name, record in metrics['stages'].items():
+        print(f"{name:<14} {record['seconds']:>10.4f} {record['seconds'] / total:>6.1%} {record['calls']:>7} "
+              f"{record['rows']:>10,} {record['bytes']:>12,}", file=file)
+    print(f"{'total':<14} {metrics['total_seconds']:>10.4f}", file=file)
+
+
+def _pop_flags(argv: List[str]):
+    """Remove --profile and --metrics-json PATH from argv in place."""
+    profile = '--profile' in argv
+    if profile:
+        argv.remove('--profile')
+    metrics_path = None
+    if '--metrics-json' in argv:
+        i = argv.index('--metrics-json')
+        if i + 1 >= len(argv):
+            print("❌ --metrics-json needs a file path", file=sys.stderr)
+            sys.exit(2)
+        metrics_path = argv[i + 1]
+        del argv[i:i + 2]
+    return profile, metrics_path
+
+
+def run_main(main: Callable[[], Any], script: str):
+    """Run a script's main() with the instrumentation and --json-format flags handled."""
+    serialization.pop_format_flag(sys.argv)
+    profile, metrics_path = _pop_flags(sys.argv)
+    profiler: Optional[cProfile.Profile] = None
+    if profile:
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+
+    started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    exit_code = 0
+    try:
+        if profiler is not None:
+            profiler.enable()
+        main()
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if profile or metrics_path:
+            metrics = {'script': script, 'argv': sys.argv[1:], 'started_at': started_at,
+                       'exit_code': exit_code, **METRICS.to_json()}
+            if profiler is not None:
+                metrics['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                metrics['top_functions'] = _top_functions(profiler)
+                print_stage_table(metrics)
+                print(f"peak traced memory: {metrics['peak_memory_bytes']:,} bytes\n", file=sys.stderr)
+                pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(PROFILE_TOP)
+            if metrics_path:
+                with open(metrics_path, 'w') as f:
+                    json.dump(metrics, f, indent=2)
+                print(f"✓ Metrics: {metrics_path}", file=sys.stderr)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Mining economics per GPU model, electricity price and project.
+
+mining.hardware_requirements.recommended_gpus lists each card's hashrate,
+power draw and price, but mining.cost_to_mine_one_unit is typed in by hand.
+This calculator derives it from the same numbers the project file already
+carries:
+
+    network hashrate     mining.current_hashrate_<unit>, else
+                         mining.current_difficulty / block_time_seconds
+                         (difficulty as expected hashes per block, which is how
+                         Autolykos reports it; Bitcoin-style difficulty needs a
+                         hashrate field)
+    daily emission       (86400 / block_time_seconds) * current_block_reward
+
+For one GPU at one electricity price:
+
+    coins_per_day          gpu_hashrate / network_hashrate * daily emission
+    electricity_usd        power_watts * 24 / 1000 * $/kWh / coins_per_day
+    hardware_amortization  cost_usd / (--lifetime-days * coins_per_day)
+    total_cost_usd         electricity_usd + hardware_amortization
+    breakeven_price_usd    electricity_usd: below it the card loses money every
+                           day, whatever it cost
+    payback_days           cost_usd / daily profit at current_price_usd
+                           (None when mining is unprofitable)
+
+Every (project, GPU) row is broadcast against every electricity price, so the
+whole grid (GPUs x $/kWh x projects) is one set of NumPy array operations.
+
+compute() is the compute_derived.py counterpart: it returns {dotted.path:
+value} for the project's reference GPU (mining.cost_to_mine_one_unit.
+reference_gpu, else the card with the most hashrate per watt) at
+electricity_usd_per_kwh (default $0.10, the rate the hand-typed notes use),
+ready for compute_derived.apply_to. It is not part of build_all.py's derived
+step: the result is only as good as the GPU table and network hashrate, so it
+is written on request (--write), and only when the project's hashrate field
+agrees with current_difficulty / block_time_seconds (either difficulty
+convention: hashes per block, or Bitcoin-style x 2^32) within
+--hashrate-tolerance. The grid runs the same check and flags a disagreeing
+project's rows (`!` in the table, hashrate_warning in --json), since its
+figures are off by the same factor as its hashrate.
+
+Usage:
+    python scripts/mining_economics.py                       # grid for every project with a GPU table
+    python scripts/mining_economics.py ergo --kwh 0.05 0.10 0.20 --json
+    python scripts/mining_economics.py ergo --check          # report drift in the derived fields
+    python scripts/mining_economics.py ergo --write          # write them into the project file
+    python scripts/mining_economics.py ergo --write --gpu "RTX 4070"
+"""
+
+import argparse
+import copy
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from compute_derived import apply_to, diff
+from repository import get_repository
+from snapshots import HASHRATE_TO_TH, hashrate_th
+
+
+DEFAULT_KWH = [0.05, 0.10, 0.15, 0.20]
+REFERENCE_KWH = 0.10
+LIFETIME_DAYS = 3 * 365
+
+COST_FIELDS = ['electricity_usd', 'hardware_amortization_usd', 'total_cost_usd']
+
+# Allowed relative gap between the hashrate field and difficulty / block time
+HASHRATE_TOLERANCE = 0.25
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _round_sig(value: float, digits: int = 4):
+    """Round to significant digits; per-coin costs span $0.0001 to $20,000."""
+    if value is None or not np.isfinite(value):
+        return None
+    return float(f'{value:.{digits}g}')
+
+
+def gpu_hashrate_hs(gpu: Dict[str, Any]) -> Optional[float]:
+    """hashrate_<unit> of one recommended_gpus entry, in H/s."""
+    for key, value in gpu.items():
+        factor = HASHRATE_TO_TH.get(key[len('hashrate_'):]) if key.startswith('hashrate_') else None
+        if factor is not None and _number(value) is not None:
+            return value * factor * 1e12
+    return None
+
+
+def network_inputs(project_data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Network hashrate (H/s), daily emission and price, or None if either of the first two is missing."""
+    mining = project_data.get('mining') or {}
+    emission = project_data.get('emission') or {}
+    block_time = _number(emission.get('block_time_seconds'))
+    block_reward = _number(emission.get('current_block_reward'))
+    if not block_time or block_reward is None:
+        return None
+
+    hashrate = hashrate_th(project_data)
+    if hashrate is not None:
+        hashrate *= 1e12
+    elif _number(mining.get('current_difficulty')):
+        hashrate = mining['current_difficulty'] / block_time
+    if not hashrate:
+        return None
+
+    price = _number((project_data.get('market_data') or {}).get('current_price_usd'))
+    return {
+        'network_hashrate_hs': hashrate,
+        'daily_emission': 86400 / block_time * block_reward,
+        'price': np.nan if price is None else price,
+    }
+
+
+def hashrate_consistency(project_data: Dict[str, Any],
+                         tolerance: float = HASHRATE_TOLERANCE) -> Optional[str]:
+    """Why the hashrate field disagrees with difficulty / block time, or None.
+
+    Nothing to compare (either side missing) is not a disagreement. Difficulty
+    is read both as expected hashes per block and Bitcoin-style (x 2^32); the
+    field agrees if either reading is within tolerance.
+    """
+    hashrate = hashrate_th(project_data)
+    difficulty = _number((project_data.get('mining') or {}).get('current_difficulty'))
+    block_time = _number((project_data.get('emission') or {}).get('block_time_seconds'))
+    if not hashrate or not difficulty or not block_time:
+        return None
+    implied = [difficulty / block_time / 1e12, difficulty * 2 ** 32 / block_time / 1e12]
+    if any(abs(hashrate - th) <= tolerance * th for th in implied):
+        return None
+    return (f"hashrate field is {hashrate:,.6g} TH/s but current_difficulty / block_time_seconds implies "
+            f"{implied[0]:,.6g} TH/s ({implied[1]:,.6g} TH/s Bitcoin-style)")
+
+
+def gpu_rows(name: str, project_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One row per usable recommended GPU, with the project's network inputs attached."""
+    network = network_inputs(project_data)
+    hardware = (project_data.get('mining') or {}).get('hardware_requirements') or {}
+    if network is None:
+        return []
+    rows = []
+    for gpu in hardware.get('recommended_gpus') or []:
+        hashrate = gpu_hashrate_hs(gpu)
+        power = _number(gpu.get('power_watts'))
+        if not hashrate or power is None:
+            continue
+        rows.append({
+            'project': name,
+            'gpu': gpu.get('model', 'unknown'),
+            'hashrate_hs': hashrate,
+            'power_watts': power,
+            'cost_usd': _number(gpu.get('cost_usd')) or 0.0,
+            **network,
+        })
+    return rows
+
+
+def compute_grid(rows: List[Dict[str, Any]], kwh: List[float], lifetime_days: float = LIFETIME_DAYS):
+    """Cost, breakeven and payback arrays of shape (len(rows), len(kwh))."""
+    def column(key):
+        return np.array([row[key] for row in rows], dtype=np.float64)[:, None]
+
+    kwh = np.asarray(kwh, dtype=np.float64)[None, :]
+    coins_per_day = column('hashrate_hs') / column('network_hashrate_hs') * column('daily_emission')
+    power_usd_per_day = column('power_watts') * 24 / 1000 * kwh
+    cost_usd = column('cost_usd')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        electricity = power_usd_per_day / coins_per_day
+        amortization = np.broadcast_to(cost_usd / (lifetime_days * coins_per_day), electricity.shape)
+        profit_per_day = coins_per_day * column('price') - power_usd_per_day
+        payback = np.where(profit_per_day > 0, cost_usd / profit_per_day, np.nan)
+    return {
+        'coins_per_day': np.broadcast_to(coins_per_day, electricity.shape),
+        'electricity_usd': electricity,
+        'hardware_amortization_usd': amortization,
+        'total_cost_usd': electricity + amortization,
+        'breakeven_price_usd': electricity,
+        'payback_days': payback,
+    }
+
+
+def reference_row(rows: List[Dict[str, Any]], reference_gpu: Optional[str]) -> int:
+    """Index of the named GPU, else the one with the most hashrate per watt."""
+    for i, row in enumerate(rows):
+        if row['gpu'] == reference_gpu:
+            return i
+    return max(range(len(rows)), key=lambda i: rows[i]['hashrate_hs'] / rows[i]['power_watts'])
+
+
+def compute(project_data: Dict[str, Any], lifetime_days: float = LIFETIME_DAYS,
+            reference_gpu: Optional[str] = None) -> Dict[str, Any]:
+    """{dotted.path: value} for the reference GPU, or {} without a usable GPU table.
+
+    reference_gpu overrides mining.cost_to_mine_one_unit.reference_gpu.
+    """
+    rows = gpu_rows('', project_data)
+    if not rows:
+        return {}
+    cost = (project_data.get('mining') or {}).get('cost_to_mine_one_unit') or {}
+    kwh = _number(cost.get('electricity_usd_per_kwh')) or REFERENCE_KWH
+    row = reference_row(rows, reference_gpu or cost.get('reference_gpu'))
+    grid = compute_grid([rows[row]], [kwh], lifetime_days)
+
+    prefix = 'mining.cost_to_mine_one_unit.'
+    out = {prefix + 'reference_gpu': rows[row]['gpu'], prefix + 'electricity_usd_per_kwh': kwh}
+    for field in COST_FIELDS:
+        out[prefix + field] = _round_sig(grid[field][0, 0])
+    payback = grid['payback_days'][0, 0]
+    out[prefix + 'payback_days'] = None if np.isnan(payback) else int(round(payback))
+    return out
+
+
+def grid_table(projects: Dict[str, Dict[str, Any]], kwh: List[float], lifetime_days: float = LIFETIME_DAYS,
+               hashrate_tolerance: float = HASHRATE_TOLERANCE) -> List[Dict[str, Any]]:
+    """Flat records for every (project, GPU, $/kWh) combination.
+
+    hashrate_warning is hashrate_consistency()'s reason when the project's
+    hashrate field disagrees with its difficulty (its figures are then off
+    by the same factor), else None.
+    """
+    rows = [row for name, data in projects.items() for row in gpu_rows(name, data)]
+    if not rows:
+        return []
+    warnings = {name: hashrate_consistency(data, hashrate_tolerance) for name, data in projects.items()}
+    grid = compute_grid(rows, kwh, lifetime_days)
+    return [
+        {
+            'project': row['project'],
+            'gpu': row['gpu'],
+            'usd_per_kwh': rate,
+            'coins_per_day': _round_sig(grid['coins_per_day'][i, j]),
+            'cost_to_mine_usd': _round_sig(grid['total_cost_usd'][i, j]),
+            'breakeven_price_usd': _round_sig(grid['breakeven_price_usd'][i, j]),
+            'payback_days': None if np.isnan(grid['payback_days'][i, j]) else int(round(grid['payback_days'][i, j])),
+            'hashrate_warning': warnings[row['project']],
+        }
+        for i, row in enumerate(rows)
+        for j, rate in enumerate(kwh)
+    ]
+
+
+def _format_usd(value) -> str:
+    if value is None:
+        return '-'
+    return f'${value:,.0f}' if abs(value) >= 1000 else f'${value:.4g}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cost to mine, breakeven price and payback per GPU and electricity price.')
+    parser.add_argument('projects', nargs='*', help='Project slugs (default: every project)')
+    parser.add_argument('--kwh', nargs='+', type=float, default=DEFAULT_KWH,
+                        help=f"Electricity prices in $/kWh (default: {' '.join(map(str, DEFAULT_KWH))})")
+    parser.add_argument('--lifetime-days', type=float, default=LIFETIME_DAYS,
+                        help=f'Days to amortize the card over (default: {LIFETIME_DAYS})')
+    parser.add_argument('--json', action='store_true', help='Print the grid as JSON')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--check', action='store_true', help='Report drift in the derived cost_to_mine fields (exit 1 if any)')
+    mode.add_argument('--write', action='store_true', help='Write the derived cost_to_mine fields into the project files')
+    parser.add_argument('--gpu', help='Reference GPU model for --check/--write (default: the file\'s reference_gpu, '
+                                      'else the most hashrate per watt)')
+    parser.add_argument('--hashrate-tolerance', type=float, default=HASHRATE_TOLERANCE,
+                        help=f'Allowed gap between the hashrate field and difficulty / block time '
+                             f'(default: {HASHRATE_TOLERANCE})')
+    args = parser.parse_args()
+
+    repository = get_repository()
+    names = args.projects or [slug for slug in repository.project_slugs() if repository.project(slug).data is not None]
+    missing = [n for n in names if repository.project(n).data is None]
+    if missing:
+        print(f"❌ Project file(s) not found: {', '.join(missing)}")
+        sys.exit(1)
+    projects = {name: repository.project(name).data for name in names}
+
+    if args.check or args.write:
+        drifted = refused = 0
+        for name, data in projects.items():
+            computed = compute(data, args.lifetime_days, args.gpu)
+            if not computed:
+                continue
+            drift = diff(data, computed)
+            mismatch = hashrate_consistency(data, args.hashrate_tolerance)
+            if mismatch:
+                print(f"⚠️  {name}: {mismatch}")
+            if args.write and mismatch:
+                refused += 1
+                print(f"❌ {name}: not written; fix the hashrate or difficulty first")
+                continue
+            if args.write:
+                data = copy.deepcopy(data)  # the memoized document is shared
+                apply_to(data, computed)
+                with open(repository.path(repository.project(name).project_path), 'w') as f:
+                    json.dump(data, f, indent=2)
+                    f.write('\n')
+                print(f"✓ {name}: wrote {len(computed)} field(s)")
+            elif drift:
+                drifted += 1
+                print(f"⚠️  {name}: {len(drift)} derived mining field(s) differ")
+                for dotted, existing, value in drift:
+                    print(f"  {dotted}: file={existing}  computed={value}")
+            else:
+                print(f"✓ {name}: derived mining fields match")
+        sys.exit(1 if drifted or refused else 0)
+
+    table = grid_table(projects, args.kwh, args.lifetime_days, args.hashrate_tolerance)
+    if args.json:
+        json.dump(table, sys.stdout, indent=2)
+        print()
+        return
+    if not table:
+        print("No project has a usable mining.hardware_requirements.recommended_gpus table")
+        return
+
+    print(f"  {'project':<10} {'gpu':<14} {'$/kWh':>6} {'coins/day':>11} {'cost/coin':>11} "
+          f"{'breakeven':>11} {'payback':>9}")
+    for entry in table:
+        payback = '-' if entry['payback_days'] is None else f"{entry['payback_days']}d"
+        flag = '  !' if entry['hashrate_warning'] else ''
+        print(f"  {entry['project']:<10} {entry['gpu']:<14} {entry['usd_per_kwh']:>6.3f} "
+              f"{entry['coins_per_day']:>11.4g} {_format_usd(entry['cost_to_mine_usd']):>11} "
+              f"{_format_usd(entry['breakeven_price_usd']):>11} {payback:>9}{flag}")
+    flagged = {entry['project']: entry['hashrate_warning'] for entry in table if entry['hashrate_warning']}
+    if flagged:
+        print()
+        for name, mismatch in flagged.items():
+            print(f"  ! {name}: {mismatch}; its figures are unreliable")
+    skipped = [name for name in projects if not gpu_rows(name, projects[name])]
+    if skipped:
+        print(f"\n  No GPU table or network inputs: {', '.join(skipped)}")
+
+
+if __name__ == '__main__':
+    main()
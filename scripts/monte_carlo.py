@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo scenarios for block-time, price and hashrate uncertainty.
+
+compute_derived.py turns one block_time_seconds and one current_price_usd
+into one fdmc and one annual_inflation_pct. When the inputs are uncertain
+(Pearl's observed block times run 44-119s against a 194s target, its price
+$0.36-$1.57), this runner samples them instead and reports percentile bands.
+
+Each scenario draws
+    block_time_seconds   seconds per block
+    current_price_usd    token price
+    hashrate             network hashrate, as a multiple of today's
+
+and pushes whole sample arrays through
+    compute_derived.compute_batch   daily_emission, annual_inflation_pct, fdmc, ...
+    the emission model              mined supply at --date (emission_simulator's
+                                    curve, extended past its last dated anchor
+                                    at the sampled block time; flat
+                                    daily_emission when there is no curve),
+                                    anchored on current_supply at last_updated,
+                                    plus the vesting unlocks between the two
+                                    dates (supply_projection.unlocked_by: the
+                                    schedule's timeline, else the genesis terms)
+    cost to mine one coin           mining.cost_to_mine_one_unit.total_cost_usd
+                                    scaled by hashrate x block time (same
+                                    energy per day, fewer coins per day when
+                                    blocks are slower)
+
+Time-based emission (Kaspa) fixes the reward per second, not per block, so
+for those projects a sampled block time changes neither daily_emission,
+annual_inflation_pct, supply_at_date nor the coins mined per day: compute_batch
+gets the project's own block time and cost_to_mine scales with hashrate only.
+
+Distributions are given as LOW:HIGH (uniform), LOW:MODE:HIGH (triangular) or
+a single fixed value. A value ending in "x" is a multiple of the project's own
+field, so one spec works across projects (metrics that depend on a field the
+project lacks come out as "no data"):
+
+    --block-time 0.8x:1x:1.2x   (default)
+    --price 0.5x:1x:2x          (default)
+    --hashrate 0.5x:1x:2x       (default)
+
+Scenarios are split into chunks with independent seeds (SeedSequence.spawn)
+and run on a process pool, so results are reproducible for a given --seed
+regardless of --jobs.
+
+Usage:
+    python scripts/monte_carlo.py pearl --block-time 44:119:194 --price 0.36:1.04:1.57
+    python scripts/monte_carlo.py --all --scenarios 200000 --date 2030-01-01
+    python scripts/monte_carlo.py kaspa --percentiles 1 50 99 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from compute_derived import compute_batch
+from emission_simulator import build_model
+from repository import get_repository
+from supply_projection import unlocked_by
+
+
+DEFAULT_PERCENTILES = [5, 25, 50, 75, 95]
+CHUNK_SIZE = 50_000
+METRICS = ['fdmc', 'annual_inflation_pct', 'daily_emission', 'supply_at_date', 'cost_to_mine']
+
+
+class Distribution:
+    """Uniform, triangular or fixed distribution, optionally relative to a base value."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        parts = spec.split(':')
+        if not 1 <= len(parts) <= 3:
+            raise ValueError(f"Expected VALUE, LOW:HIGH or LOW:MODE:HIGH, got {spec!r}")
+        self.relative = [p.endswith('x') for p in parts]
+        self.values = [float(p[:-1] if p.endswith('x') else p) for p in parts]
+
+    def resolve(self, base: Optional[float]) -> List[float]:
+        if any(self.relative) and base is None:
+            raise ValueError(f"{self.spec} is relative but the project has no base value")
+        return [v * base if rel else v for v, rel in zip(self.values, self.relative)]
+
+    def sample(self, rng: np.random.Generator, n: int, base: Optional[float]) -> np.ndarray:
+        """n draws; all NaN for a relative spec when the project lacks the base field."""
+        if any(self.relative) and base is None:
+            return np.full(n, np.nan)
+        values = self.resolve(base)
+        if len(values) == 1:
+            return np.full(n, values[0])
+        if len(values) == 2:
+            return rng.uniform(values[0], values[1], n)
+        low, mode, high = values
+        if low == high:
+            return np.full(n, low)
+        return rng.triangular(low, mode, high, n)
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def prepare(project_data: Dict[str, Any], target: date, project_dir: Path) -> Dict[str, Any]:
+    """Everything a worker needs for one project, resolved once in the parent."""
+    supply = project_data.get('supply') or {}
+    emission = project_data.get('emission') or {}
+    market = project_data.get('market_data') or {}
+    cost = ((project_data.get('mining') or {}).get('cost_to_mine_one_unit') or {})
+    as_of = project_data.get('last_updated')
+    as_of = date.fromisoformat(as_of) if isinstance(as_of, str) else date.today()
+
+    try:
+        curve, chronology = build_model(project_data)
+    except ValueError:
+        curve = chronology = None
+    # Vesting does not depend on the sampled inputs: one lookup per project
+    _, unlocked = unlocked_by(project_dir, project_data, np.array([target, as_of], dtype='datetime64[D]'))
+
+    return {
+        'project': project_data.get('project'),
+        'max_supply': _number(supply.get('max_supply')),
+        'current_supply': _number(supply.get('current_supply')),
+        'block_reward': _number(emission.get('current_block_reward')),
+        'block_time': _number(emission.get('block_time_seconds')),
+        'price': _number(market.get('current_price_usd')),
+        'daily_volume': _number(market.get('daily_volume')),
+        'cost_to_mine': _number(cost.get('total_cost_usd')),
+        'as_of': as_of,
+        'target': target,
+        'curve': curve,
+        'chronology': chronology,
+        'time_based': chronology is not None and chronology.time_based,
+        'unlocked': float(unlocked[0] - unlocked[1]),
+    }
+
+
+def _heights(chronology, day: float, block_time: np.ndarray) -> np.ndarray:
+    """Chronology.height_at_day with a per-scenario block time past the last anchor."""
+    if chronology.time_based or day <= chronology.days[-1]:
+        return np.full(len(block_time), float(chronology.height_at_day(day)))
+    return chronology.heights[-1] + (day - chronology.days[-1]) * 86400 / block_time
+
+
+def supply_at_target(inputs: Dict[str, Any], block_time: np.ndarray) -> np.ndarray:
+    current = inputs['current_supply']
+    if current is None:
+        return np.full(len(block_time), np.nan)
+
+    curve, chronology = inputs['curve'], inputs['chronology']
+    if curve is None:
+        # Flat emission: today's reward at the sampled block time
+        reward = inputs['block_reward'] or 0.0
+        days = (inputs['target'] - inputs['as_of']).days
+        supply = current + reward * 86400 / block_time * days
+    else:
+        as_of_day = chronology.to_day(inputs['as_of']) + 1
+        target_day = chronology.to_day(inputs['target']) + 1
+        mined = curve.supply_at(_heights(chronology, target_day, block_time)) \
+            - curve.supply_at(_heights(chronology, as_of_day, block_time))
+        supply = current + mined
+    supply = supply + inputs['unlocked']
+
+    if inputs['max_supply']:
+        supply = np.minimum(supply, max(inputs['max_supply'], current))
+    return supply
+
+
+def run_chunk(inputs: Dict[str, Any], distributions: Dict[str, Distribution],
+              n: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """Sample n scenarios and evaluate every metric as whole arrays."""
+    rng = np.random.default_rng(seed)
+    block_time = distributions['block_time'].sample(rng, n, inputs['block_time'])
+    price = distributions['price'].sample(rng, n, inputs['price'])
+    hashrate = distributions['hashrate'].sample(rng, n, 1.0)
+
+    def column(value):
+        return np.full(n, np.nan if value is None else value)
+
+    # current_block_reward of a time-based project holds at its own block time only
+    derived = compute_batch({
+        'max_supply': column(inputs['max_supply']),
+        'current_supply': column(inputs['current_supply']),
+        'block_reward': column(inputs['block_reward']),
+        'block_time': column(inputs['block_time']) if inputs['time_based'] else block_time,
+        'price': price,
+        'daily_volume': column(inputs['daily_volume']),
+    })
+
+    if inputs['cost_to_mine'] is not None and inputs['time_based']:
+        cost = inputs['cost_to_mine'] * hashrate
+    elif inputs['cost_to_mine'] is not None and inputs['block_time']:
+        cost = inputs['cost_to_mine'] * hashrate * block_time / inputs['block_time']
+    else:
+        cost = np.full(n, np.nan)
+
+    return {
+        'fdmc': derived['market_data.fdmc'],
+        'annual_inflation_pct': derived['emission.annual_inflation_pct'],
+        'daily_emission': derived['emission.daily_emission'],
+        'supply_at_date': supply_at_target(inputs, block_time),
+        'cost_to_mine': cost,
+    }
+
+
+def simulate(projects: Dict[str, Dict[str, Any]], distributions: Dict[str, Distribution], n_scenarios: int,
+             percentiles: List[float], seed: int = 0, jobs: int = None) -> Dict[str, Dict[str, Any]]:
+    """Percentile bands per project and metric, with chunks spread over a process pool."""
+    tasks = []
+    for name, inputs in projects.items():
+        n_chunks = max(1, -(-n_scenarios // CHUNK_SIZE))
+        # Per-project stream, so adding a project doesn't change another's results
+        seeds = np.random.SeedSequence([seed, zlib.crc32(name.encode())]).spawn(n_chunks)
+        sizes = [CHUNK_SIZE] * (n_chunks - 1) + [n_scenarios - CHUNK_SIZE * (n_chunks - 1)]
+        tasks.extend((name, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds))
+
+    jobs = jobs or min(len(tasks), os.cpu_count() or 1)
+    if jobs <= 1:
+        chunks = [run_chunk(projects[name], distributions, size, s) for name, size, s in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(run_chunk, projects[name], distributions, size, s) for name, size, s in tasks]
+            chunks = [f.result() for f in futures]
+
+    results = {}
+    for name in projects:
+        own = [chunk for (task_name, _, _), chunk in zip(tasks, chunks) if task_name == name]
+        bands = {}
+        for metric in METRICS:
+            values = np.concatenate([chunk[metric] for chunk in own])
+            if np.isnan(values).all():
+                bands[metric] = None
+                continue
+            bands[metric] = {f'p{p:g}': float(v) for p, v in zip(percentiles, np.nanpercentile(values, percentiles))}
+        results[name] = {
+            'scenarios': n_scenarios,
+            'target_date': projects[name]['target'].isoformat(),
+            'bands': bands,
+        }
+    return results
+
+
+def _format(value: float) -> str:
+    for unit, size in (('T', 1e12), ('B', 1e9), ('M', 1e6), ('K', 1e3)):
+        if abs(value) >= size:
+            return f'{value / size:.2f}{unit}'
+    return f'{value:.4g}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo bands for derived fields under input uncertainty.')
+    parser.add_argument('projects', nargs='*')
+    parser.add_argument('--all', action='store_true', help='Every project in data/projects')
+    parser.add_argument('--scenarios', type=int, default=100_000, help='Scenarios per project (default: 100000)')
+    parser.add_argument('--block-time', default='0.8x:1x:1.2x', help='Block time distribution (seconds)')
+    parser.add_argument('--price', default='0.5x:1x:2x', help='Price distribution (USD)')
+    parser.add_argument('--hashrate', default='0.5x:1x:2x', help='Hashrate distribution (multiple of today)')
+    parser.add_argument('--date', help='Target date for supply_at_date (default: one year from today)')
+    parser.add_argument('--percentiles', type=float, nargs='+', default=DEFAULT_PERCENTILES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    args = parser.parse_args()
+
+    repository = get_repository()
+    if args.all:
+        names = [slug for slug in repository.project_slugs() if repository.project(slug).data is not None]
+    else:
+        names = args.projects
+    if not names:
+        parser.error('name at least one project or pass --all')
+
+    try:
+        distributions = {
+            'block_time': Distribution(args.block_time),
+            'price': Distribution(args.price),
+            'hashrate': Distribution(args.hashrate),
+        }
+        target = date.fromisoformat(args.date) if args.date else date.today() + timedelta(days=365)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    projects = {}
+    for name in names:
+        project = repository.project(name)
+        if project.data is None:
+            print(f"❌ Project file not found: {repository.path(project.project_path)}")
+            sys.exit(1)
+        projects[name] = prepare(project.data, target, repository.path(project.allocations_path))
+
+    results = simulate(projects, distributions, args.scenarios, args.percentiles, args.seed, args.jobs)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    labels = [f'p{p:g}' for p in args.percentiles]
+    for name, result in results.items():
+        print(f"\n{name}: {result['scenarios']:,} scenarios, supply_at_date = {result['target_date']}")
+        print(f"  {'metric':<22}" + ''.join(f'{label:>12}' for label in labels))
+        for metric, band in result['bands'].items():
+            if band is None:
+                print(f"  {metric:<22}{'(no data)':>12}")
+                continue
+            print(f"  {metric:<22}" + ''.join(f'{_format(band[label]):>12}' for label in labels))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Full refresh of every generated artifact in one process.
+
+The manual flow runs csv_to_vesting_json.py / csv_to_emission_json.py,
+compute_derived.py and validate_submission.py once per project and then
+generate_comparison_matrix.py, so every step pays interpreter startup and
+re-reads the same genesis.json. This runner reads every input once into a
+Workspace (file text plus parsed JSON, keyed by repo-relative path), runs the
+steps as a dependency graph on a thread pool, and writes the outputs at the
+end:
+
+    load:<p>          read data/projects/<p>.json and allocations/<p>/*
+    schedule:<p>/<f>  allocations/<p>/<f>.csv -> vesting- / emission-schedule.json
+    derived:<p>       compute_derived fields                   (load:<p>)
+    validate:<p>      validate_submission checks over the in-memory
+                      files, including the new schedules       (derived:<p>, schedule:<p>/*)
+    matrix:<p>        that project's comparison-matrix entry   (schedule:<p>/*)
+    matrix            allocations/comparison-matrix.json       (every matrix:<p>)
+
+Tasks whose dependencies are done run concurrently (--jobs threads; they
+share the Workspace, so threads rather than processes). A failing task's
+dependents are skipped. Once the graph has finished, files whose content
+changed are written (columnar .npz copies after their JSON, so they stay
+up to date) and every project is captured into the snapshot store.
+
+build_all.py is the incremental counterpart: it rebuilds only targets whose
+inputs changed. This runner always recomputes everything.
+
+Usage:
+    python scripts/pipeline.py                 # full refresh
+    python scripts/pipeline.py --dry-run       # compute and validate, list changed files, write nothing
+    python scripts/pipeline.py --jobs 1        # run the graph serially
+    python scripts/pipeline.py --metrics-json metrics.json   # per-stage timings (instrumentation.py)
+
+Exits 1 if a schedule CSV fails conversion, a task raises, or a project fails
+validation.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import csv_to_emission_json
+import csv_to_vesting_json
+import serialization
+from build_all import schedule_output_name
+from compute_derived import apply_to, compute
+from generate_comparison_matrix import _matrix_document, genesis_summary, project_entry
+from instrumentation import run_main, stage
+from schedule_csv import feed, month_ordered, read_schedule_rows
+from snapshots import STORE_FILE, SnapshotStore, snapshot_row
+from validate_submission import Validator, print_report
+
+try:
+    from columnar import SCHEDULE_FILES, columnar_path, write_columnar
+except ImportError:  # numpy not installed: no columnar copies
+    SCHEDULE_FILES = ['vesting-schedule.json', 'emission-schedule.json']
+    write_columnar = None
+
+
+MATRIX_FILE = 'allocations/comparison-matrix.json'
+
+
+class Dag:
+    """Named tasks with dependencies, run on a thread pool as soon as their dependencies finish."""
+
+    def __init__(self):
+        self.tasks: Dict[str, Tuple[Callable[[], Any], List[str]]] = {}
+        self.results: Dict[str, Any] = {}
+
+    def add(self, name: str, fn: Callable[[], Any], deps: Iterable[str] = ()):
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        self.tasks[name] = (fn, list(deps))
+
+    def _check(self):
+        for name, (_, deps) in self.tasks.items():
+            unknown = [d for d in deps if d not in self.tasks]
+            if unknown:
+                raise ValueError(f"Task {name} depends on unknown task(s): {', '.join(unknown)}")
+        # Kahn's algorithm: anything left over sits on a cycle
+        indegree = {name: len(deps) for name, (_, deps) in self.tasks.items()}
+        ready = [name for name, n in indegree.items() if n == 0]
+        seen = 0
+        while ready:
+            done = ready.pop()
+            seen += 1
+            for name, (_, deps) in self.tasks.items():
+                if done in deps:
+                    indegree[name] -= 1
+                    if indegree[name] == 0:
+                        ready.append(name)
+        if seen != len(self.tasks):
+            raise ValueError("Task graph has a cycle")
+
+    def run(self, jobs: int = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Run every task. Returns (results, failures) keyed by task name.
+
+        results is also self.results, filled in as tasks finish, so a task can
+        read the return values of its dependencies from there.
+        """
+        self._check()
+        results = self.results
+        failures: Dict[str, str] = {}
+        pending = dict(self.tasks)
+
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            running = {}
+            while True:
+                for name, (fn, deps) in list(pending.items()):
+                    failed = [d for d in deps if d in failures]
+                    if failed:
+                        failures[name] = f"skipped: {failed[0]} failed"
+                        del pending[name]
+                    elif all(d in results for d in deps):
+                        running[pool.submit(fn)] = name
+                        del pending[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        failures[name] = f"{type(e).__name__}: {e}"
+        return results, failures
+
+
+class Workspace:
+    """Every input file read once, plus the outputs staged for writing.
+
+    texts     repo-relative path -> file text as read (to detect unchanged outputs)
+    documents repo-relative path -> parsed JSON, or the JSONDecodeError it raised;
+              this is what Validator(documents=...) sees, so generated schedules
+              replace their on-disk versions here
+    outputs   repo-relative path -> new text
+    """
+
+    def __init__(self, repo_root: Path):
+        self.root = repo_root
+        self.texts: Dict[str, str] = {}
+        self.documents: Dict[str, Any] = {}
+        self.outputs: Dict[str, str] = {}
+
+    def read(self, rel: str):
+        path = self.root / rel
+        if not path.exists():
+            return
+        with stage('parse') as timer:
+            text = path.read_text()
+            self.texts[rel] = text
+            if rel.endswith('.json'):
+                try:
+                    self.documents[rel] = serialization.loads(text)
+                except json.JSONDecodeError as e:
+                    self.documents[rel] = e
+            timer.rows += 1
+            timer.bytes += len(text)
+
+    def document(self, rel: str):
+        data = self.documents.get(rel)
+        return None if isinstance(data, json.JSONDecodeError) else data
+
+    def stage_output(self, rel: str, text: str, data: Any = None):
+        self.outputs[rel] = text
+        if data is not None:
+            self.documents[rel] = data
+
+    def changed(self) -> List[str]:
+        return [rel for rel, text in sorted(self.outputs.items()) if self.texts.get(rel) != text]
+
+
+def discover(repo_root: Path) -> Tuple[List[str], Dict[str, List[str]]]:
+    """(project slugs, slug -> schedule CSV names), from data/projects and allocations/."""
+    slugs = {p.stem for p in (repo_root / 'data' / 'projects').glob('*.json') if '.' not in p.stem}
+    csvs = {}
+    for project_dir in sorted((repo_root / 'allocations').iterdir()):
+        if project_dir.is_dir():
+            slugs.add(project_dir.name)
+            csvs[project_dir.name] = sorted(p.name for p in project_dir.glob('*.csv'))
+    return sorted(slugs), csvs
+
+
+def load_task(ws: Workspace, slug: str, csv_names: List[str]):
+    def run():
+        ws.read(f'data/projects/{slug}.json')
+        for name in ['genesis.json'] + SCHEDULE_FILES + csv_names:
+            ws.read(f'allocations/{slug}/{name}')
+    return run
+
+
+def schedule_task(ws: Workspace, slug: str, csv_name: str):
+    """Convert one CSV against the in-memory genesis.json. Returns its validation errors."""
+    def run():
+        csv_rel = f'allocations/{slug}/{csv_name}'
+        amount_column = 'emission' if 'emission' in csv_name else 'unlock'
+        converter = csv_to_emission_json if amount_column == 'emission' else csv_to_vesting_json
+
+        def rows():
+            return read_schedule_rows(io.StringIO(ws.texts[csv_rel]), amount_column)
+
+        builder = feed(converter.ScheduleBuilder(ws.document(f'allocations/{slug}/genesis.json') or {}), rows())
+        if not builder.row_count:
+            return [f"{csv_rel}: CSV file is empty or invalid"]
+        with stage('validate'):
+            errors = builder.finish_validation()
+        if errors:
+            return [f"{csv_rel}: {e}" for e in errors]
+        with stage('parse'):
+            ordered = month_ordered(rows, builder.in_month_order)
+        schedule = builder.to_json(ordered)  # times its own parse / aggregate stages per month
+        with stage('serialize'):
+            text = serialization.dumps(schedule)
+        ws.stage_output(f'allocations/{slug}/{schedule_output_name(Path(csv_name))}', text, schedule)
+        return []
+    return run
+
+
+def derived_task(ws: Workspace, slug: str):
+    def run():
+        rel = f'data/projects/{slug}.json'
+        data = ws.document(rel)
+        if data is None:
+            return None
+        with stage('aggregate'):
+            apply_to(data, compute(data))
+        with stage('serialize'):
+            text = serialization.dumps(data) + '\n'
+        ws.stage_output(rel, text)
+        return data
+    return run
+
+
+def validate_task(ws: Workspace, slug: str):
+    return lambda: Validator(slug, documents=ws.documents).run()
+
+
+def matrix_entry_task(ws: Workspace, slug: str):
+    def run():
+        genesis = ws.document(f'allocations/{slug}/genesis.json')
+        with stage('aggregate'):
+            return project_entry(
+                slug,
+                genesis_summary(genesis) if genesis is not None else {},
+                ws.document(f'allocations/{slug}/vesting-schedule.json'),
+                ws.document(f'allocations/{slug}/emission-schedule.json'),
+            )
+    return run
+
+
+def build_graph(ws: Workspace, slugs: List[str], csvs: Dict[str, List[str]]) -> Dag:
+    dag = Dag()
+    matrix_rows = []
+    for slug in slugs:
+        dag.add(f'load:{slug}', load_task(ws, slug, csvs.get(slug, [])))
+        schedules = [f'schedule:{slug}/{name}' for name in csvs.get(slug, [])]
+        for name, task in zip(csvs.get(slug, []), schedules):
+            dag.add(task, schedule_task(ws, slug, name), [f'load:{slug}'])
+        dag.add(f'derived:{slug}', derived_task(ws, slug), [f'load:{slug}'])
+        dag.add(f'validate:{slug}', validate_task(ws, slug), [f'derived:{slug}'] + schedules)
+        if slug in csvs:
+            dag.add(f'matrix:{slug}', matrix_entry_task(ws, slug), [f'load:{slug}'] + schedules)
+            matrix_rows.append(f'matrix:{slug}')
+
+    def assemble():
+        entries = [dag.results[task] for task in matrix_rows]
+        with stage('serialize'):
+            text = serialization.dumps(_matrix_document([e for e in entries if e is not None]))
+        ws.stage_output(MATRIX_FILE, text)
+
+    dag.add('matrix', assemble, matrix_rows)
+    return dag
+
+
+def write_outputs(ws: Workspace, paths: List[str]):
+    """Write changed files, then columnar copies of every schedule that changed or has none."""
+    for rel in paths:
+        with stage('write') as timer:
+            (ws.root / rel).write_text(ws.outputs[rel])
+            timer.bytes += len(ws.outputs[rel])
+    if write_columnar is None:
+        return
+    for rel in sorted(ws.outputs):
+        if Path(rel).name not in SCHEDULE_FILES:
+            continue
+        npz = columnar_path(ws.root / rel)
+        if rel in paths or not npz.exists():
+            with stage('columnar'):
+                write_columnar(ws.documents[rel], npz)
+
+
+def capture_snapshots(ws: Workspace, slugs: List[str], derived: Dict[str, Any]) -> int:
+    now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    today = date.today().isoformat()
+    rows = [snapshot_row(slug, derived[f'derived:{slug}'], 'pipeline', now, today)
+            for slug in slugs if derived.get(f'derived:{slug}') is not None]
+    with stage('snapshot'):
+        store = SnapshotStore(ws.root / STORE_FILE)
+        try:
+            return store.insert(rows)
+        finally:
+            store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh every generated artifact in one process.')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker threads (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='List files that would change, write nothing')
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).parent.parent
+    ws = Workspace(repo_root)
+    slugs, csvs = discover(repo_root)
+    dag = build_graph(ws, slugs, csvs)
+    results, failures = dag.run(args.jobs)
+
+    conversion_errors = [e for task, errors in results.items() if task.startswith('schedule:') for e in errors]
+    validations = [results[f'validate:{slug}'] for slug in slugs if f'validate:{slug}' in results]
+    changed = ws.changed()
+
+    print(f"✓ Ran {len(results)} of {len(dag.tasks)} task(s) for {len(slugs)} project(s)")
+    for rel in changed:
+        print(f"  {'would write' if args.dry_run else 'wrote'}  {rel}")
+    if not changed:
+        print("✓ Every output is up to date")
+
+    if not args.dry_run:
+        write_outputs(ws, changed)
+        added = capture_snapshots(ws, slugs, results)
+        print(f"  snapshot  {STORE_FILE} ({added} new row(s))")
+
+    if validations:
+        print()
+        print_report(validations)
+    if conversion_errors:
+        print(f"✗ {len(conversion_errors)} schedule conversion error(s):\n")
+        for error in conversion_errors:
+            print(f"  • {error}")
+    for task, reason in failures.items():
+        print(f"❌ {task}: {reason}")
+
+    if conversion_errors or failures or not all(v['passed'] for v in validations):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    run_main(main, Path(__file__).stem)
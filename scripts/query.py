@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Query API over every project, genesis file and allocation schedule.
+
+Dataset.load() reads data/projects/*.json, allocations/*/genesis.json and the
+vesting / emission schedules once and builds in-memory indexes:
+
+    bucket timelines   per (project, tier, bucket): sorted dates with the
+                       cumulative unlocked tokens at each, so "liquid at date D"
+                       is one bisect per bucket
+    tier index         tier name -> bucket timelines across all projects
+    project timelines  per project: the comparison matrix's ScheduleIndex
+                       (month offsets, cumulative pct of the allocation and
+                       its running maximum for threshold search)
+    event index        every non-zero unlock / emission row across all
+                       projects, sorted by date, so a date window is two bisects
+
+ISO dates sort lexicographically, so all date indexes bisect on the strings
+directly. A schedule's cumulative value holds until its next row (step
+function), which matches how the converters carry buckets forward.
+
+Usage:
+    python scripts/query.py liquid --date 2026-06-01 [--tier tier_1] [--project quai]
+    python scripts/query.py unlocked --pct 30 --months 12
+    python scripts/query.py events --from 2026-06-01 --days 90 [--top 10] [--tier tier_1]
+    python scripts/query.py ... --json
+
+Library use:
+    from query import Dataset
+    ds = Dataset.load()
+    ds.liquid_supply('2026-06-01', tier='tier_1')
+"""
+
+import argparse
+import heapq
+import json
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+from generate_comparison_matrix import ScheduleIndex
+from repository import REPO_ROOT, get_repository
+
+
+SCHEDULE_FILES = {
+    'vesting-schedule.json': ('vesting', 'unlock_tokens'),
+    'emission-schedule.json': ('emission', 'emission_tokens'),
+}
+
+
+class UnlockEvent(NamedTuple):
+    date: str
+    project: str
+    tier: str
+    bucket_name: str
+    tokens: int
+    pct_of_bucket: float
+    kind: str  # 'vesting' or 'emission'
+
+
+class BucketTimeline:
+    """Cumulative unlocked tokens of one bucket as a step function of date."""
+
+    __slots__ = ('project', 'tier', 'bucket_name', 'kind', 'dates', 'cumulative')
+
+    def __init__(self, project: str, tier: str, bucket_name: str, kind: str):
+        self.project = project
+        self.tier = tier
+        self.bucket_name = bucket_name
+        self.kind = kind
+        self.dates: List[str] = []
+        self.cumulative: List[int] = []
+
+    def at(self, as_of: str) -> int:
+        """Cumulative tokens unlocked on or before as_of (0 before the first row)."""
+        position = bisect_right(self.dates, as_of)
+        return self.cumulative[position - 1] if position else 0
+
+    @property
+    def total(self) -> int:
+        return self.cumulative[-1] if self.cumulative else 0
+
+
+class ProjectTimeline(ScheduleIndex):
+    """ScheduleIndex of one project's allocation schedule, with a step lookup by month."""
+
+    def __init__(self, project: str, kind: str, schedule: Dict[str, Any]):
+        super().__init__(schedule, is_emission=kind == 'emission')
+        self.project = project
+        self.kind = kind
+
+    def pct_at_month(self, month: int) -> float:
+        """Cumulative pct unlocked by the end of `month` (step function over sparse months)."""
+        position = bisect_right(self.months, month)
+        return self.pcts[position - 1] if position else 0.0
+
+
+class Dataset:
+    """Every project loaded once, with date, tier and event indexes."""
+
+    def __init__(self):
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.genesis: Dict[str, Dict[str, Any]] = {}
+        self.schedules: Dict[str, Dict[str, Any]] = {}
+        self.project_timelines: Dict[str, ProjectTimeline] = {}
+        self.buckets: List[BucketTimeline] = []
+        self.by_tier: Dict[str, List[BucketTimeline]] = {}
+        self.by_project: Dict[str, List[BucketTimeline]] = {}
+        self.events: List[UnlockEvent] = []
+        self.event_dates: List[str] = []
+
+    @classmethod
+    def load(cls, repo_root: Path = None) -> 'Dataset':
+        repository = get_repository(repo_root or REPO_ROOT)
+        dataset = cls()
+
+        for slug in repository.project_slugs():
+            project = repository.project(slug)
+            if project.data is not None:
+                dataset.projects[slug] = project.data
+            if project.genesis is not None:
+                dataset.genesis[slug] = project.genesis
+            # Prefer vesting when a project has both, like the comparison matrix
+            for filename, (kind, amount_key) in SCHEDULE_FILES.items():
+                schedule = repository.read_json(project.allocations_path / filename)
+                if schedule is not None:
+                    dataset._add_schedule(slug, kind, schedule, amount_key)
+                    break
+
+        dataset.events.sort()
+        dataset.event_dates = [event.date for event in dataset.events]
+        return dataset
+
+    def _add_schedule(self, project: str, kind: str, schedule: Dict[str, Any], amount_key: str):
+        self.schedules[project] = schedule
+        self.project_timelines[project] = ProjectTimeline(project, kind, schedule)
+
+        timelines: Dict[tuple, BucketTimeline] = {}
+        for entry in schedule.get('monthly_schedule', []):
+            for bucket in entry['buckets']:
+                key = (bucket['tier'], bucket['bucket_name'])
+                timeline = timelines.get(key)
+                if timeline is None:
+                    timeline = timelines[key] = BucketTimeline(project, key[0], key[1], kind)
+                timeline.dates.append(entry['date'])
+                timeline.cumulative.append(bucket['cumulative_tokens'])
+
+                amount = bucket.get(amount_key, 0)
+                if amount:
+                    self.events.append(UnlockEvent(
+                        entry['date'], project, key[0], key[1], amount,
+                        bucket.get(amount_key.replace('_tokens', '_pct_of_bucket'), 0.0), kind,
+                    ))
+
+        for timeline in timelines.values():
+            self.buckets.append(timeline)
+            self.by_tier.setdefault(timeline.tier, []).append(timeline)
+            self.by_project.setdefault(project, []).append(timeline)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def tiers_matching(self, tier: str) -> List[str]:
+        """Full tier names for an exact name or a prefix such as 'tier_1'."""
+        if tier in self.by_tier:
+            return [tier]
+        return sorted(t for t in self.by_tier if t.startswith(tier))
+
+    def _select(self, tier: str = None, project: str = None) -> List[BucketTimeline]:
+        if tier is not None:
+            selected = [b for t in self.tiers_matching(tier) for b in self.by_tier[t]]
+            return [b for b in selected if b.project == project] if project else selected
+        if project is not None:
+            return self.by_project.get(project, [])
+        return self.buckets
+
+    def liquid_supply(self, as_of: str, tier: str = None, project: str = None) -> Dict[str, Any]:
+        """Tokens unlocked on or before as_of, per project and in total."""
+        per_project: Dict[str, int] = {}
+        per_bucket = []
+        for timeline in self._select(tier, project):
+            tokens = timeline.at(as_of)
+            per_project[timeline.project] = per_project.get(timeline.project, 0) + tokens
+            per_bucket.append({
+                'project': timeline.project,
+                'tier': timeline.tier,
+                'bucket_name': timeline.bucket_name,
+                'liquid_tokens': tokens,
+                'total_tokens': timeline.total,
+            })
+        return {
+            'date': as_of,
+            'tier': tier,
+            'total_liquid_tokens': sum(per_project.values()),
+            'projects': per_project,
+            'buckets': per_bucket,
+        }
+
+    def projects_unlocked_within(self, pct: float, months: int) -> List[Dict[str, Any]]:
+        """Projects whose allocation is more than pct% unlocked by month `months`."""
+        matches = []
+        for name, timeline in self.project_timelines.items():
+            unlocked = timeline.pct_at_month(months)
+            if unlocked > pct:
+                matches.append({
+                    'project': name,
+                    'kind': timeline.kind,
+                    'unlocked_pct': unlocked,
+                    'first_month_reaching_pct': timeline.first_month_reaching(pct),
+                })
+        return sorted(matches, key=lambda m: -m['unlocked_pct'])
+
+    def unlock_events(self, start: str, end: str = None, days: int = None, top: int = None,
+                      tier: str = None, project: str = None) -> List[UnlockEvent]:
+        """Unlock / emission events with start <= date < end, by date or the `top` largest."""
+        if end is None:
+            end = (date.fromisoformat(start) + timedelta(days=days or 0)).isoformat()
+        window = self.events[bisect_left(self.event_dates, start):bisect_left(self.event_dates, end)]
+
+        if tier is not None:
+            tiers = set(self.tiers_matching(tier))
+            window = [e for e in window if e.tier in tiers]
+        if project is not None:
+            window = [e for e in window if e.project == project]
+        if top is not None:
+            return heapq.nlargest(top, window, key=lambda e: e.tokens)
+        return window
+
+
+def _print_json(data):
+    json.dump(data, sys.stdout, indent=2)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query allocations across all projects.')
+    # Shared by every subcommand, so --json goes after the subcommand like its other options
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    liquid = commands.add_parser('liquid', parents=[output], help='Liquid (unlocked) supply at a date')
+    liquid.add_argument('--date', required=True)
+    liquid.add_argument('--tier', help='Tier name or prefix, e.g. tier_1')
+    liquid.add_argument('--project')
+
+    unlocked = commands.add_parser('unlocked', parents=[output], help='Projects more than PCT%% unlocked within N months')
+    unlocked.add_argument('--pct', type=float, required=True)
+    unlocked.add_argument('--months', type=int, required=True)
+
+    events = commands.add_parser('events', parents=[output], help='Unlock events in a date window')
+    events.add_argument('--from', dest='start', default=date.today().isoformat())
+    events.add_argument('--to', dest='end')
+    events.add_argument('--days', type=int, default=90)
+    events.add_argument('--top', type=int)
+    events.add_argument('--tier')
+    events.add_argument('--project')
+
+    args = parser.parse_args()
+    for option, value in (('--date', getattr(args, 'date', None)), ('--from', getattr(args, 'start', None)),
+                          ('--to', getattr(args, 'end', None))):
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                print(f"❌ {option}: invalid date {value!r} (expected YYYY-MM-DD)")
+                sys.exit(1)
+    dataset = Dataset.load()
+
+    if args.command == 'liquid':
+        result = dataset.liquid_supply(args.date, tier=args.tier, project=args.project)
+        if args.json:
+            _print_json(result)
+            return
+        print(f"Liquid supply at {result['date']}" + (f" ({args.tier})" if args.tier else ''))
+        for name, tokens in result['projects'].items():
+            print(f"  {name:<20} {tokens:>18,}")
+        print(f"  {'total':<20} {result['total_liquid_tokens']:>18,}")
+
+    elif args.command == 'unlocked':
+        result = dataset.projects_unlocked_within(args.pct, args.months)
+        if args.json:
+            _print_json(result)
+            return
+        print(f"Projects more than {args.pct}% unlocked within {args.months} months")
+        for match in result:
+            print(f"  {match['project']:<20} {match['unlocked_pct']:>7.2f}%  "
+                  f"(reached {args.pct}% at month {match['first_month_reaching_pct']})")
+
+    else:
+        result = dataset.unlock_events(args.start, end=args.end, days=args.days, top=args.top,
+                                       tier=args.tier, project=args.project)
+        if args.json:
+            _print_json([e._asdict() for e in result])
+            return
+        print(f"Unlock events from {args.start}" + (f" to {args.end}" if args.end else f" (+{args.days} days)"))
+        for event in result:
+            print(f"  {event.date}  {event.project:<12} {event.bucket_name:<40} {event.tokens:>16,}  "
+                  f"({event.pct_of_bucket}% of bucket)")
+
+
+if __name__ == '__main__':
+    main()
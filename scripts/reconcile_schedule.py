@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Check that each vesting-schedule.json follows the terms in its genesis.json.
+
+For every bucket, the expected cumulative curve comes from the bucket's
+tge_unlock_pct, cliff_months, vesting_months and absolute_tokens (the vesting
+model in vesting_engine.py). The realized curve is the cumulative_tokens of the
+schedule. Both become (buckets x months) matrices, and the check is one
+subtraction. Only the cells the schedule actually lists are compared, so
+condensed schedules (one row every six months) are not penalized for the
+months they skip.
+
+Schedules count linear unlocks from either convention: the first step at
+the end of the first vesting month (month cliff + 1, as vesting_engine.py
+does) or at its start (month cliff, as kadena's schedule does). A bucket
+that only matches the month-0 start curve is accepted; deviations are
+reported against the vesting_engine.py curve.
+
+A bucket is flagged when its realized cumulative differs from the expected
+one by more than --tolerance percent of the bucket's allocation in any listed
+month. A bucket is also flagged when the genesis file has it but the schedule
+does not. Buckets with no fixed vesting schedule (vesting_months null) are
+only checked at TGE. Buckets with no vesting terms at all (no TGE unlock,
+cliff or vesting period, e.g. quai's 'Undisclosed / Unaccounted') are not
+scheduled on purpose and are skipped. Block reward buckets belong to
+emission schedules and are not checked.
+
+validate_submission.py reports the same deviations as warnings.
+
+Usage:
+    python scripts/reconcile_schedule.py                  # every project with a vesting schedule
+    python scripts/reconcile_schedule.py quai --tolerance 0.1
+    python scripts/reconcile_schedule.py --json
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import serialization
+from diff_schedule import ScheduleMatrix, bucket_keys
+from instrumentation import run_main, stage
+from repository import get_repository
+from vesting_engine import BucketTerms, UnlockMatrix
+
+
+TOLERANCE_PCT = 0.5
+
+
+def reconcile(genesis: Dict[str, Any], schedule: Dict[str, Any],
+              tolerance_pct: float = TOLERANCE_PCT) -> List[Dict[str, Any]]:
+    """Buckets whose schedule deviates from their genesis terms, worst first."""
+    terms = BucketTerms(genesis)
+    if not len(terms):
+        return []
+    expected_keys = list(zip(terms.tiers, terms.names))
+    keys = expected_keys + [key for key in bucket_keys(schedule) if key not in set(expected_keys)]
+    last_month = max([entry['month'] for entry in schedule.get('monthly_schedule', [])] + [terms.horizon_months()])
+    months = np.arange(last_month + 1, dtype=np.int64)
+
+    # Month-0 start convention: the linear curve one month earlier
+    expected = UnlockMatrix(terms, last_month + 1).cumulative
+    month_end, month_start = expected[:, :-1], expected[:, 1:]
+    realized = ScheduleMatrix(schedule, months, keys)
+    n = len(terms)
+    observed = realized.observed[:n].copy()
+    observed[~terms.scheduled, 1:] = False
+
+    def _deviation_pct_of(expected):
+        deviation = np.where(observed, realized.cumulative[:n] - expected, 0.0)
+        return np.abs(deviation) * 100 / terms.tokens[:, None]
+
+    end_pct, start_pct = _deviation_pct_of(month_end), _deviation_pct_of(month_start)
+    starts_at_zero = ((terms.vesting > 0) & (start_pct.max(axis=1) <= tolerance_pct)
+                      & (end_pct.max(axis=1) > tolerance_pct))
+    expected = np.where(starts_at_zero[:, None], month_start, month_end)
+    deviation_pct = np.where(starts_at_zero[:, None], start_pct, end_pct)
+    worst = np.argmax(deviation_pct, axis=1)
+    rows = np.arange(n)
+    no_terms = (terms.tge_frac == 0) & (terms.cliff == 0) & (terms.vesting == 0)
+    flagged = ((deviation_pct[rows, worst] > tolerance_pct) | ~realized.present[:n]) & ~no_terms
+
+    findings = []
+    for i in np.flatnonzero(flagged):
+        finding = {
+            'tier': terms.tiers[i],
+            'bucket_name': terms.names[i],
+            'terms': {
+                'absolute_tokens': _number(terms.tokens[i]),
+                'tge_unlock_pct': _number(terms.tge_frac[i] * 100),
+                'cliff_months': int(terms.cliff[i]),
+                'vesting_months': int(terms.vesting[i]) if terms.scheduled[i] else None,
+            },
+        }
+        if not realized.present[i]:
+            finding['missing'] = True
+        else:
+            month = int(worst[i])
+            finding.update({
+                'month': month,
+                'expected_cumulative': _number(expected[i, month]),
+                'realized_cumulative': _number(realized.cumulative[i, month]),
+                'deviation_pct': round(float(deviation_pct[i, month]), 2),
+                'months_over_tolerance': int((deviation_pct[i] > tolerance_pct).sum()),
+            })
+        findings.append(finding)
+    findings.sort(key=lambda f: (not f.get('missing'), -f.get('deviation_pct', 0)))
+    return findings
+
+
+def _number(value):
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
+
+def describe(finding: Dict[str, Any]) -> str:
+    """One-line explanation, used for validator warnings and the CLI report."""
+    terms = finding['terms']
+    declared = (f"tge {terms['tge_unlock_pct']}%, cliff {terms['cliff_months']}mo, "
+                + (f"vesting {terms['vesting_months']}mo" if terms['vesting_months'] is not None
+                   else "no fixed vesting"))
+    if finding.get('missing'):
+        return f"Bucket '{finding['bucket_name']}' ({declared}) has no rows in the vesting schedule"
+    return (f"Bucket '{finding['bucket_name']}' deviates from its genesis terms ({declared}): "
+            f"month {finding['month']} cumulative {finding['realized_cumulative']:,} vs expected "
+            f"{finding['expected_cumulative']:,} ({finding['deviation_pct']}% of allocation, "
+            f"{finding['months_over_tolerance']} month(s) over tolerance)")
+
+
+def reconcile_project(slug: str, tolerance_pct: float = TOLERANCE_PCT, repository=None) -> Optional[Dict[str, Any]]:
+    """Findings for one project, or None if it has no genesis file or vesting schedule."""
+    project = (repository or get_repository()).project(slug)
+    if project.genesis is None or project.vesting is None:
+        return None
+    with stage('reconcile') as timer:
+        findings = reconcile(project.genesis, project.vesting, tolerance_pct)
+        timer.rows += 1
+    return {'project': slug, 'findings': findings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check vesting schedules against their genesis.json terms.')
+    parser.add_argument('projects', nargs='*', help='Project slugs (default: every project with a vesting schedule)')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE_PCT,
+                        help=f'Allowed deviation, percent of the bucket allocation (default: {TOLERANCE_PCT})')
+    parser.add_argument('--json', action='store_true', help='Print findings as JSON')
+    args = parser.parse_args()
+
+    repository = get_repository()
+    slugs = args.projects or repository.project_slugs()
+    results = [r for r in (reconcile_project(slug, args.tolerance, repository) for slug in slugs) if r is not None]
+
+    if args.json:
+        print(serialization.dumps(results))
+    else:
+        for result in results:
+            findings = result['findings']
+            if not findings:
+                print(f"✓ {result['project']}: schedule matches genesis terms")
+                continue
+            print(f"⚠️  {result['project']}: {len(findings)} bucket(s) deviate")
+            for finding in findings:
+                print(f"    {describe(finding)}")
+        if not results:
+            print("No project has both genesis.json and vesting-schedule.json")
+
+    sys.exit(1 if any(r['findings'] for r in results) else 0)
+
+
+if __name__ == '__main__':
+    run_main(main, Path(__file__).stem)
@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Refresh market, supply and hashrate figures in the project files from live APIs.
+
+data/refresh-sources.json lists, per project, the fetchers to run:
+
+    coingecko   market_data.current_price_usd, market_data.daily_volume
+    supply      supply.current_supply from an explorer endpoint
+    hashrate    mining.current_hashrate_<unit>, in whichever unit the
+                project file already uses (TH/s when it has none)
+
+Fetchers are asyncio coroutines registered by name (see register()), so a
+new source is a small Fetcher subclass plus an entry in the sources file.
+All of them share one HttpClient:
+
+    connection pool   keep-alive http.client connections per host, at most
+                      --connections per host in flight; requests run in
+                      worker threads so the event loop never blocks
+    rate limits       a minimum interval between requests to one host
+                      (rate_limits in the sources file)
+    retries           429, 5xx and connection errors are retried with
+                      exponential backoff, honouring Retry-After
+    cache             successful responses are kept in .refresh-cache.json
+                      for --cache-ttl seconds, and two fetchers asking for
+                      the same URL in one run share a single request
+
+The fetched values are applied to a copy of the project file along with
+last_updated (and market_data.data_date when the price changed), then
+compute_derived.compute() recomputes every derived field. Without --write
+the changes are only printed. With --write the files are rewritten and each
+refreshed project gets a snapshot row (see snapshots.py).
+
+--offline serves scripts/fixtures/refresh-responses.json from a local
+fixture server (fixture_server.py) instead of the real APIs, so the whole
+path, retries included, runs without a network.
+
+Usage:
+    python scripts/refresh.py                        # every project, print changes
+    python scripts/refresh.py bitcoin ergo --write   # refresh and rewrite two files
+    python scripts/refresh.py --offline --json       # against the fixtures
+"""
+
+import argparse
+import asyncio
+import copy
+import http.client
+import math
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Type
+from urllib.parse import urlsplit
+
+import serialization
+from compute_derived import apply_to, compute
+from fixture_server import FixtureServer
+from instrumentation import run_main, stage
+from repository import REPO_ROOT, get_repository
+from snapshots import HASHRATE_TO_TH, STORE_FILE, SnapshotStore, capture
+
+
+SOURCES_FILE = 'data/refresh-sources.json'
+FIXTURE_FILE = Path(__file__).parent / 'fixtures' / 'refresh-responses.json'
+CACHE_FILE = '.refresh-cache.json'
+
+CACHE_TTL = 15 * 60
+CONNECTIONS_PER_HOST = 2
+RETRIES = 3
+BACKOFF = 0.5
+TIMEOUT = 15.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+USER_AGENT = 'pow-tokenomics-tracker-refresh/1.0'
+
+COINGECKO_URL = 'https://api.coingecko.com/api/v3/simple/price?ids={id}&vs_currencies=usd&include_24hr_vol=true'
+
+
+class FetchError(Exception):
+    """A source could not be fetched or did not contain the expected value."""
+    pass
+
+
+class Response(NamedTuple):
+    url: str
+    status: int
+    body: bytes
+    from_cache: bool = False
+
+    def json(self) -> Any:
+        return serialization.loads(self.body)
+
+    def text(self) -> str:
+        return self.body.decode('utf-8').strip()
+
+
+# ---------------------------------------------------------------------------
+# HTTP client
+# ---------------------------------------------------------------------------
+
+class ResponseCache:
+    """Successful response bodies by URL, reused for ttl seconds."""
+
+    def __init__(self, path: Optional[Path], ttl: float = CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path is not None and path.exists():
+            try:
+                self.entries = serialization.load(path)
+            except ValueError:
+                self.entries = {}  # a corrupt cache is only a cache
+        self.dirty = False
+
+    def get(self, url: str) -> Optional[bytes]:
+        entry = self.entries.get(url)
+        if entry is None or time.time() - entry['fetched_at'] > self.ttl:
+            return None
+        return entry['body'].encode('utf-8')
+
+    def put(self, url: str, body: bytes):
+        self.entries[url] = {'fetched_at': round(time.time(), 3), 'body': body.decode('utf-8', errors='replace')}
+        self.dirty = True
+
+    def save(self):
+        if self.path is None or not self.dirty:
+            return
+        now = time.time()
+        live = {url: entry for url, entry in self.entries.items() if now - entry['fetched_at'] <= self.ttl}
+        serialization.write(self.path, live, 'compact')
+        self.dirty = False
+
+
+class ConnectionPool:
+    """Idle keep-alive http.client connections per (scheme, host). Blocking; called from worker threads."""
+
+    def __init__(self, timeout: float = TIMEOUT):
+        self.timeout = timeout
+        self._idle: Dict[tuple, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def _release(self, scheme: str, netloc: str, connection: http.client.HTTPConnection):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(connection)
+
+    def get(self, url: str):
+        """(status, headers, body) of one GET."""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        connection = self._acquire(parts.scheme, parts.netloc)
+        try:
+            connection.request('GET', path, headers={'User-Agent': USER_AGENT, 'Accept': 'application/json, text/plain'})
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(parts.scheme, parts.netloc, connection)
+        return response.status, dict(response.getheaders()), body
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+class HostLimiter:
+    """Minimum interval between request starts to one host."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = loop.time() + self.interval
+
+
+class HttpClient:
+    """Async GETs over a ConnectionPool, with per-host limits, retries and a cache.
+
+    rewrite, if given, maps each URL to the one actually requested (the
+    fixture server in --offline mode). Rate limits, the cache and error
+    messages still use the original URL.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, rate_limits: Dict[str, float] = None,
+                 connections_per_host: int = CONNECTIONS_PER_HOST, retries: int = RETRIES,
+                 backoff: float = BACKOFF, timeout: float = TIMEOUT,
+                 rewrite: Optional[Callable[[str], str]] = None):
+        self.cache = cache
+        self.rate_limits = dict(rate_limits or {})
+        self.connections_per_host = connections_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.rewrite = rewrite
+        self.pool = ConnectionPool(timeout)
+        self.requests = 0  # HTTP requests sent, retries included
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _host_state(self, host: str):
+        if host not in self._limiters:
+            interval = self.rate_limits.get(host, self.rate_limits.get('default', 0.0))
+            self._limiters[host] = HostLimiter(interval)
+            self._slots[host] = asyncio.Semaphore(self.connections_per_host)
+        return self._limiters[host], self._slots[host]
+
+    async def get(self, url: str) -> Response:
+        """GET url. Concurrent and repeated calls for one URL share a single request."""
+        if url not in self._inflight:
+            self._inflight[url] = asyncio.ensure_future(self._get(url))
+        return await self._inflight[url]
+
+    async def get_json(self, url: str) -> Any:
+        response = await self.get(url)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise FetchError(f"{url}: response is not JSON ({e})")
+
+    async def _get(self, url: str) -> Response:
+        if self.cache is not None:
+            body = self.cache.get(url)
+            if body is not None:
+                return Response(url, 200, body, from_cache=True)
+
+        limiter, slots = self._host_state(urlsplit(url).netloc)
+        target = self.rewrite(url) if self.rewrite else url
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(error[1] if error[1] is not None else self.backoff * 2 ** (attempt - 1))
+            await limiter.wait()
+            async with slots:
+                self.requests += 1
+                try:
+                    status, headers, body = await asyncio.to_thread(self.pool.get, target)
+                except (OSError, http.client.HTTPException) as e:
+                    error = (f"{type(e).__name__}: {e}", None)
+                    continue
+            if status in RETRY_STATUSES:
+                error = (f"HTTP {status}", _retry_after(headers))
+                continue
+            if status != 200:
+                raise FetchError(f"{url}: HTTP {status}")
+            if self.cache is not None:
+                self.cache.put(url, body)
+            return Response(url, status, body)
+        raise FetchError(f"{url}: {error[0]} after {self.retries + 1} attempt(s)")
+
+    def close(self):
+        self.pool.close()
+        if self.cache is not None:
+            self.cache.save()
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    value = next((v for k, v in headers.items() if k.lower() == 'retry-after'), None)
+    try:
+        return min(float(value), 60.0) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form: fall back to the backoff
+
+
+# ---------------------------------------------------------------------------
+# Fetchers
+# ---------------------------------------------------------------------------
+
+FETCHERS: Dict[str, Type['Fetcher']] = {}
+
+
+def register(cls: Type['Fetcher']) -> Type['Fetcher']:
+    """Class decorator: make a Fetcher available to the sources file under cls.name."""
+    FETCHERS[cls.name] = cls
+    return cls
+
+
+def _dig(data: Any, path: Optional[str]) -> Any:
+    for key in path.split('.') if path else []:
+        if not isinstance(data, dict) or key not in data:
+            raise FetchError(f"response has no '{path}'")
+        data = data[key]
+    return data
+
+
+def _positive(value: Any, what: str) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise FetchError(f"{what} is not a number: {value!r}")
+    if not math.isfinite(number) or number <= 0:
+        raise FetchError(f"{what} is not a positive number: {value!r}")
+    return number
+
+
+def _sig(value: float, digits: int = 4):
+    """Round to significant digits, as an int when that is whole."""
+    rounded = float(f'{value:.{digits}g}')
+    return int(rounded) if rounded.is_integer() else rounded
+
+
+class Fetcher:
+    """One source for one project: fetch() returns {dotted.path: value}."""
+
+    name = None
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+
+    @property
+    def url(self) -> str:
+        return self.spec['url']
+
+    async def fetch(self, client: HttpClient, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def _value(self, client: HttpClient) -> Any:
+        """The raw value at spec['path'] (or the whole text body when there is no path)."""
+        if self.spec.get('path'):
+            return _dig(await client.get_json(self.url), self.spec['path'])
+        return (await client.get(self.url)).text()
+
+
+@register
+class CoinGeckoFetcher(Fetcher):
+    """Price and 24h volume in USD from CoinGecko's simple/price endpoint."""
+
+    name = 'coingecko'
+
+    @property
+    def url(self) -> str:
+        return COINGECKO_URL.format(id=self.spec['id'])
+
+    async def fetch(self, client, project_data):
+        quote = _dig(await client.get_json(self.url), self.spec['id'])
+        values = {'market_data.current_price_usd': _sig(_positive(_dig(quote, 'usd'), 'price'), 6)}
+        if quote.get('usd_24h_vol') is not None:
+            values['market_data.daily_volume'] = round(_positive(quote['usd_24h_vol'], 'volume'), 1)
+        return values
+
+
+@register
+class SupplyFetcher(Fetcher):
+    """Circulating supply from an explorer endpoint, in whole coins."""
+
+    name = 'supply'
+
+    async def fetch(self, client, project_data):
+        supply = _positive(await self._value(client), 'supply') * self.spec.get('scale', 1)
+        return {'supply.current_supply': int(round(supply))}
+
+
+@register
+class HashrateFetcher(Fetcher):
+    """Network hashrate, written in the unit of the project's current_hashrate_<unit> field."""
+
+    name = 'hashrate'
+
+    async def fetch(self, client, project_data):
+        unit = self.spec.get('unit', 'th')
+        if unit not in HASHRATE_TO_TH:
+            raise FetchError(f"unknown hashrate unit '{unit}'")
+        hashrate_th = _positive(await self._value(client), 'hashrate') * HASHRATE_TO_TH[unit]
+        field = next((key for key in (project_data.get('mining') or {})
+                      if key.startswith('current_hashrate_') and key[len('current_hashrate_'):] in HASHRATE_TO_TH),
+                     'current_hashrate_th')
+        return {f'mining.{field}': _sig(hashrate_th / HASHRATE_TO_TH[field[len('current_hashrate_'):]])}
+
+
+# ---------------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------------
+
+class ProjectRefresh:
+    """Outcome of refreshing one project."""
+
+    def __init__(self, name: str, original: Dict[str, Any]):
+        self.name = name
+        self.original = original
+        self.fetched: Dict[str, Any] = {}
+        self.errors: List[str] = []
+        self.updated: Optional[Dict[str, Any]] = None
+        self.changes: List[tuple] = []  # (dotted.path, old, new)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'project': self.name,
+            'fetched': self.fetched,
+            'errors': self.errors,
+            'changes': [{'field': f, 'old': old, 'new': new} for f, old, new in self.changes],
+        }
+
+
+def _get(data: Dict[str, Any], dotted: str) -> Any:
+    for key in dotted.split('.'):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def apply_refresh(project_data: Dict[str, Any], fetched: Dict[str, Any], as_of: str) -> Dict[str, Any]:
+    """A copy of project_data with the fetched values, refresh dates and recomputed derived fields."""
+    data = copy.deepcopy(project_data)
+    for dotted in fetched:
+        section = dotted.split('.')[0]
+        if not isinstance(data.get(section), dict):
+            data[section] = {}  # e.g. market_data: null
+    apply_to(data, fetched)
+    if 'market_data.current_price_usd' in fetched:
+        data['market_data']['data_date'] = as_of
+    data['last_updated'] = as_of
+    apply_to(data, compute(data))
+    return data
+
+
+def changed_fields(before: Dict[str, Any], after: Dict[str, Any], prefix: str = '') -> List[tuple]:
+    """(dotted.path, old, new) for every leaf that differs."""
+    changes = []
+    for key in list(before) + [k for k in after if k not in before]:
+        old, new = before.get(key), after.get(key)
+        if isinstance(old, dict) and isinstance(new, dict):
+            changes.extend(changed_fields(old, new, f'{prefix}{key}.'))
+        elif old != new:
+            changes.append((f'{prefix}{key}', old, new))
+    return changes
+
+
+async def refresh_project(client: HttpClient, name: str, specs: List[Dict[str, Any]],
+                          project_data: Dict[str, Any], as_of: str) -> ProjectRefresh:
+    result = ProjectRefresh(name, project_data)
+    fetchers = []
+    for spec in specs:
+        if spec.get('fetcher') not in FETCHERS:
+            result.errors.append(f"unknown fetcher '{spec.get('fetcher')}'")
+            continue
+        fetchers.append(FETCHERS[spec['fetcher']](spec))
+
+    outcomes = await asyncio.gather(*(f.fetch(client, project_data) for f in fetchers), return_exceptions=True)
+    for fetcher, outcome in zip(fetchers, outcomes):
+        if isinstance(outcome, FetchError):
+            result.errors.append(f"{fetcher.name}: {outcome}")
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            result.fetched.update(outcome)
+
+    if result.fetched:
+        result.updated = apply_refresh(project_data, result.fetched, as_of)
+        result.changes = changed_fields(project_data, result.updated)
+    return result
+
+
+async def refresh_all(client: HttpClient, sources: Dict[str, List[Dict[str, Any]]],
+                      projects: Dict[str, Dict[str, Any]], as_of: str) -> List[ProjectRefresh]:
+    """Refresh every project concurrently; results in input order."""
+    try:
+        return await asyncio.gather(*(
+            refresh_project(client, name, sources[name], data, as_of) for name, data in projects.items()
+        ))
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh price, volume, supply and hashrate from live APIs.')
+    parser.add_argument('projects', nargs='*', help=f'Project slugs (default: every project in {SOURCES_FILE})')
+    parser.add_argument('--write', action='store_true', help='Rewrite the project files and capture snapshots')
+    parser.add_argument('--offline', action='store_true', help=f'Answer from {FIXTURE_FILE.relative_to(REPO_ROOT)} instead of the network')
+    parser.add_argument('--date', default=date.today().isoformat(), help='as-of date written to last_updated (default: today)')
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL,
+                        help=f'Seconds to reuse cached responses (default: {CACHE_TTL}; 0 disables the cache)')
+    parser.add_argument('--connections', type=int, default=CONNECTIONS_PER_HOST,
+                        help=f'Concurrent connections per host (default: {CONNECTIONS_PER_HOST})')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    repository = get_repository()
+    config = repository.read_json(SOURCES_FILE)
+    sources = config['projects']
+    names = args.projects or list(sources)
+    unknown = [n for n in names if n not in sources]
+    if unknown:
+        print(f"❌ No refresh sources for: {', '.join(unknown)} (see {SOURCES_FILE})")
+        sys.exit(1)
+    projects = {}
+    for name in names:
+        project = repository.project(name)
+        if project.data is None:
+            print(f"❌ Project file not found: {project.project_path}")
+            sys.exit(1)
+        projects[name] = project.data
+
+    server = FixtureServer(FIXTURE_FILE).start() if args.offline else None
+    try:
+        if server is not None:
+            # No on-disk cache and no waiting: fixtures are local and fixed
+            client = HttpClient(connections_per_host=args.connections, backoff=0.01, rewrite=server.url_for)
+        else:
+            cache = ResponseCache(repository.path(CACHE_FILE), args.cache_ttl) if args.cache_ttl > 0 else None
+            client = HttpClient(cache, config.get('rate_limits'), connections_per_host=args.connections)
+        with stage('fetch') as timer:
+            results = asyncio.run(refresh_all(client, sources, projects, args.date))
+            timer.rows += len(results)
+    finally:
+        if server is not None:
+            server.stop()
+
+    written = []
+    if args.write:
+        for result in results:
+            if result.changes:
+                path = repository.path(repository.project(result.name).project_path)
+                with stage('write') as timer:
+                    timer.bytes += serialization.write(path, result.updated, newline=True)
+                written.append(path)
+        if written:
+            store = SnapshotStore(repository.path(STORE_FILE))
+            try:
+                added = capture(store, written, source='refresh')
+            finally:
+                store.close()
+
+    if args.json:
+        print(serialization.dumps([r.to_json() for r in results]))
+    else:
+        for result in results:
+            status = '❌' if result.errors and not result.fetched else ('⚠️ ' if result.errors else '✓')
+            print(f"{status} {result.name}: {len(result.fetched)} field(s) fetched, {len(result.changes)} change(s)")
+            for field, old, new in result.changes:
+                print(f"    {field}: {old} -> {new}")
+            for error in result.errors:
+                print(f"    ❌ {error}")
+        print(f"\n{client.requests} HTTP request(s)" + (' (offline fixtures)' if args.offline else ''))
+        if written:
+            print(f"✓ Wrote {len(written)} project file(s); {STORE_FILE}: {added} new snapshot row(s)")
+        elif not args.write and any(r.changes for r in results):
+            print("Dry run: re-run with --write to update the project files")
+
+    if any(r.errors for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    run_main(main, Path(__file__).stem)
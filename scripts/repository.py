@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+One place to read the repository's JSON files from.
+
+The converters, comparison matrix, validator and calculators each used to
+open data/projects/<p>.json and allocations/<p>/*.json themselves, relative
+to the current directory, and read the same genesis.json several times in
+one run. They now go through a Repository:
+
+    repo = get_repository()              # the checkout this script lives in
+    project = repo.project('quai')
+    project.data                         # data/projects/quai.json
+    project.sources                      # data/projects/quai.sources.json
+    project.genesis                      # allocations/quai/genesis.json
+    project.vesting                      # allocations/quai/vesting-schedule.json
+    project.emission                     # allocations/quai/emission-schedule.json
+
+Each property is read on first access and returns None when the file does
+not exist. Parsed files are memoized per process, keyed by path and
+invalidated when the file's mtime or size changes, so a file rewritten
+mid-run (compute_derived.py --write, build_all.py) is re-read on the next
+access.
+
+Memoized documents are shared between callers: treat them as read-only and
+copy.deepcopy() before modifying one.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import serialization
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+PathLike = Union[str, Path]
+
+
+class Project:
+    """Lazy views of one project's files."""
+
+    def __init__(self, repository: 'Repository', slug: str):
+        self.repository = repository
+        self.slug = slug
+        self.project_path = Path('data/projects') / f'{slug}.json'
+        self.sources_path = Path('data/projects') / f'{slug}.sources.json'
+        self.allocations_path = Path('allocations') / slug
+        self.genesis_path = self.allocations_path / 'genesis.json'
+        self.vesting_path = self.allocations_path / 'vesting-schedule.json'
+        self.emission_path = self.allocations_path / 'emission-schedule.json'
+
+    @property
+    def data(self) -> Optional[Dict[str, Any]]:
+        return self.repository.read_json(self.project_path)
+
+    @property
+    def sources(self) -> Optional[Dict[str, Any]]:
+        return self.repository.read_json(self.sources_path)
+
+    @property
+    def genesis(self) -> Optional[Dict[str, Any]]:
+        return self.repository.read_json(self.genesis_path)
+
+    @property
+    def vesting(self) -> Optional[Dict[str, Any]]:
+        return self.repository.read_json(self.vesting_path)
+
+    @property
+    def emission(self) -> Optional[Dict[str, Any]]:
+        return self.repository.read_json(self.emission_path)
+
+
+class Repository:
+    """Memoized JSON reads under one checkout."""
+
+    def __init__(self, root: PathLike = REPO_ROOT):
+        self.root = Path(root).resolve()
+        self._documents: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+        self._projects: Dict[str, Project] = {}
+
+    def path(self, path: PathLike) -> Path:
+        """Absolute path; relative paths are taken from the repository root,
+        absolute ones (files outside the checkout) are used as given."""
+        return self.root / path
+
+    def exists(self, path: PathLike) -> bool:
+        return self.path(path).exists()
+
+    def read_json(self, path: PathLike) -> Any:
+        """Parsed file at path, or None if it does not exist. Raises json.JSONDecodeError
+        for invalid JSON (not memoized, so a fixed file is picked up)."""
+        full = self.path(path)
+        try:
+            stat = full.stat()
+        except FileNotFoundError:
+            self._documents.pop(full, None)
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._documents.get(full)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        data = serialization.load(full)
+        self._documents[full] = (key, data)
+        return data
+
+    def invalidate(self, path: PathLike = None):
+        """Forget one memoized file, or all of them."""
+        if path is None:
+            self._documents.clear()
+        else:
+            self._documents.pop(self.path(path), None)
+
+    def project(self, slug: str) -> Project:
+        if slug not in self._projects:
+            self._projects[slug] = Project(self, slug)
+        return self._projects[slug]
+
+    def project_slugs(self) -> List[str]:
+        """Every slug with a data/projects/<slug>.json or allocations/<slug>/ entry."""
+        slugs = {
+            path.stem for path in (self.root / 'data' / 'projects').glob('*.json')
+            if '.' not in path.stem  # skip sidecars like pearl.sources.json
+        }
+        allocations = self.root / 'allocations'
+        if allocations.exists():
+            slugs.update(path.name for path in allocations.iterdir() if path.is_dir())
+        return sorted(slugs)
+
+
+_repositories: Dict[Path, Repository] = {}
+
+
+def get_repository(root: PathLike = REPO_ROOT) -> Repository:
+    """The process-wide Repository for root."""
+    root = Path(root).resolve()
+    if root not in _repositories:
+        _repositories[root] = Repository(root)
+    return _repositories[root]
+
+
+def clear_cache():
+    """Forget every memoized file in every Repository of this process."""
+    for repository in _repositories.values():
+        repository.invalidate()
+
+
+def read_json(path: PathLike) -> Any:
+    """Memoized read of any JSON file (relative paths are from the current directory)."""
+    return get_repository().read_json(Path(path).resolve())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for vesting and emission schedule CSVs.
+
+Shared by csv_to_vesting_json.py and csv_to_emission_json.py. Each data row is
+parsed into a typed ScheduleRow and yielded immediately, so the converters
+can validate and aggregate without holding the raw CSV rows (see feed for
+their first pass and month_ordered for their second).
+
+Rows are read with csv.reader and a header index rather than
+csv.DictReader, so no per-row dict is built. The date, tier, bucket_name
+and notes strings repeat on every row of a bucket; each distinct value is
+kept once per file and shared by every row that carries it.
+
+Two optional columns refine the month grid: `day` (days since genesis, for
+unlocks that land mid-month) and, for emission schedules, `block_height`.
+They feed the sparse timeline section (see timeline.py); rows without them
+get None.
+
+The converters key their per-bucket state on dense integer ids from a
+NameTable instead of "tier::bucket" strings, and keep it in BucketState
+records.
+"""
+
+import csv
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from instrumentation import stage
+
+
+class ScheduleRow:
+    """One typed CSV row. `amount` is unlock_tokens or emission_tokens.
+
+    `bucket` is the row's NameTable id, set by the converter that consumes
+    it (None until then).
+    """
+
+    __slots__ = ('line', 'month', 'date', 'tier', 'bucket_name', 'amount', 'amount_pct',
+                 'cumulative_tokens', 'cumulative_pct', 'notes', 'day', 'block_height', 'bucket')
+
+    def __init__(self, line: int, month: int, date: str, tier: str, bucket_name: str, amount: float,
+                 amount_pct: float, cumulative_tokens: float, cumulative_pct: float, notes: str,
+                 day: Optional[int] = None, block_height: Optional[int] = None):
+        self.line = line  # row number used in error messages (header is row 1)
+        self.month = month
+        self.date = date
+        self.tier = tier
+        self.bucket_name = bucket_name
+        self.amount = amount
+        self.amount_pct = amount_pct
+        self.cumulative_tokens = cumulative_tokens
+        self.cumulative_pct = cumulative_pct
+        self.notes = notes
+        self.day = day
+        self.block_height = block_height
+        self.bucket: Optional[int] = None
+
+    def __repr__(self):
+        return (f"ScheduleRow(line={self.line}, month={self.month}, tier={self.tier!r}, "
+                f"bucket_name={self.bucket_name!r}, amount={self.amount})")
+
+
+class BucketState:
+    """Running per-bucket state of a converter, indexed by NameTable bucket id."""
+
+    __slots__ = ('tier', 'name', 'in_genesis', 'last_cumulative', 'max_cumulative')
+
+    def __init__(self, tier: int, name: str, in_genesis: bool):
+        self.tier = tier  # NameTable tier id
+        self.name = name
+        self.in_genesis = in_genesis  # False only when genesis.json lists the tier but not this bucket
+        self.last_cumulative = 0.0
+        self.max_cumulative = 0.0  # the bucket's total allocation
+
+
+class NameTable:
+    """Dense integer ids for tier names and (tier, bucket_name) pairs, in first-seen order."""
+
+    __slots__ = ('tiers', 'bucket_tiers', '_tier_ids', '_bucket_ids')
+
+    def __init__(self):
+        self.tiers: List[str] = []  # tier id -> tier name
+        self.bucket_tiers: List[int] = []  # bucket id -> tier id
+        self._tier_ids: Dict[str, int] = {}
+        self._bucket_ids: List[Dict[str, int]] = []  # tier id -> bucket_name -> bucket id
+
+    def tier(self, name: str) -> int:
+        tier = self._tier_ids.get(name)
+        if tier is None:
+            tier = self._tier_ids[name] = len(self.tiers)
+            self.tiers.append(name)
+            self._bucket_ids.append({})
+        return tier
+
+    def bucket(self, tier_name: str, bucket_name: str) -> int:
+        """Id of the pair; a new pair gets the next id (len(bucket_tiers) before the call)."""
+        tier = self._tier_ids.get(tier_name)
+        if tier is None:
+            tier = self.tier(tier_name)
+        ids = self._bucket_ids[tier]
+        bucket = ids.get(bucket_name)
+        if bucket is None:
+            bucket = ids[bucket_name] = len(self.bucket_tiers)
+            self.bucket_tiers.append(tier)
+        return bucket
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def iter_schedule_rows(csv_path: Path, amount_column: str) -> Iterator[ScheduleRow]:
+    """Yield typed rows from a schedule CSV, skipping '#' comment lines.
+
+    amount_column is 'unlock' for vesting schedules or 'emission' for emission
+    schedules; it selects the <amount_column>_tokens and
+    <amount_column>_pct_of_bucket columns.
+    """
+    with open(csv_path, 'r') as f:
+        yield from read_schedule_rows(f, amount_column)
+
+
+def read_schedule_rows(lines: Iterable[str], amount_column: str) -> Iterator[ScheduleRow]:
+    """iter_schedule_rows over CSV text that is already in memory (an open file or lines)."""
+    required = ['month', 'date', 'tier', 'bucket_name', f'{amount_column}_tokens',
+                f'{amount_column}_pct_of_bucket', 'cumulative_tokens', 'cumulative_pct_of_bucket']
+
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    column = {name: i for i, name in enumerate(header)}  # a repeated name reads its last column, as in DictReader
+    missing = [name for name in required if name not in column]
+    (month_i, date_i, tier_i, bucket_i, tokens_i, pct_i,
+     cumulative_i, cumulative_pct_i) = [column.get(name) for name in required]
+    notes_i, day_i, block_i = column.get('notes'), column.get('day'), column.get('block_height')
+    width = len(header)
+
+    # One shared copy of each repeated string value
+    shared: Dict[str, str] = {}
+    share = shared.setdefault
+
+    line = 2
+    for row in reader:
+        if not row:  # blank line
+            continue
+        if len(row) < width:  # short rows read as missing (None) fields
+            row += [None] * (width - len(row))
+        # Skip comment lines
+        month = row[month_i] if month_i is not None else ''
+        if month is not None and month.startswith('#'):
+            continue
+        if missing:
+            raise KeyError(missing[0])
+        date, tier, bucket_name = row[date_i], row[tier_i], row[bucket_i]
+        notes = (row[notes_i] if notes_i is not None else None) or ''
+        yield ScheduleRow(
+            line,
+            int(month),
+            share(date, date),
+            share(tier, tier),
+            share(bucket_name, bucket_name),
+            float(row[tokens_i]),
+            float(row[pct_i]),
+            float(row[cumulative_i]),
+            float(row[cumulative_pct_i]),
+            share(notes, notes),
+            _optional_int(row[day_i]) if day_i is not None else None,
+            _optional_int(row[block_i]) if block_i is not None else None,
+        )
+        line += 1
+
+
+BATCH_ROWS = 4096
+
+
+def feed(builder, rows: Iterable[ScheduleRow]):
+    """First pass: builder.add() every row, in batches of BATCH_ROWS.
+
+    Reading a batch is timed as 'parse' and adding it (add() is where rows
+    are validated) as 'validate', so the two stages stay apart even though
+    validation happens while the file streams.
+    """
+    rows = iter(rows)
+    while True:
+        with stage('parse') as timer:
+            batch = list(islice(rows, BATCH_ROWS))
+            timer.rows += len(batch)
+        if not batch:
+            return builder
+        with stage('validate') as timer:
+            for row in batch:
+                builder.add(row)
+            timer.rows += len(batch)
+
+
+def month_ordered(open_rows: Callable[[], Iterable[ScheduleRow]], in_order: bool) -> Iterable[ScheduleRow]:
+    """A fresh pass over a schedule's rows, in month order (input order within a month).
+
+    The converters read a CSV twice: once to validate and total it, once to
+    emit monthly_schedule a month at a time. A CSV written month by month is
+    simply streamed again. One grouped another way (quai's is grouped by
+    bucket) is sorted by month for the second pass, which holds its rows.
+    """
+    rows = open_rows()
+    return rows if in_order else sorted(rows, key=lambda row: (row.month, row.line))
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+JSON Schema validation for project, genesis and schedule files.
+
+The formal schemas live in schemas/*.schema.json (draft 2020-12). Each is
+compiled once per process and reused for every file of that kind, so
+structural checks are a single pass and validate_submission.py only has to
+hand-check the math.
+
+Compilation produces two checkers per schema:
+
+    fast check   nested closures over the small keyword subset the schemas
+                 use; answers "valid?" without building error objects
+    validator    jsonschema's Draft202012Validator with a date format
+                 checker, run only for documents the fast check rejects, to
+                 collect every error with its path
+
+Most files are valid, so the common case never enters jsonschema. A schema
+using a keyword the fast compiler doesn't know is always run through
+jsonschema. tests/test_schema_validation.py checks that the two agree on
+every repo file and on single-point mutations of each.
+
+Usage:
+    python scripts/schema_validation.py              # every file in the repo
+    python scripts/schema_validation.py <file> ...   # specific files
+
+Library use:
+    from schema_validation import SCHEMAS_AVAILABLE, schema_errors
+    errors = schema_errors('project', data)
+
+jsonschema is optional. Without it SCHEMAS_AVAILABLE is False and callers
+fall back to their own checks.
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from jsonschema import Draft202012Validator, FormatChecker
+except ImportError:  # jsonschema not installed: callers use hand-written checks
+    Draft202012Validator = None
+
+SCHEMAS_AVAILABLE = Draft202012Validator is not None
+
+SCHEMA_DIR = Path(__file__).parent.parent / 'schemas'
+SCHEMA_FILES = {
+    'project': 'project.schema.json',
+    'genesis': 'genesis.schema.json',
+    'vesting-schedule': 'vesting-schedule.schema.json',
+    'emission-schedule': 'emission-schedule.schema.json',
+}
+
+
+@lru_cache(maxsize=None)
+def load_schema(kind: str) -> Dict[str, Any]:
+    with open(SCHEMA_DIR / SCHEMA_FILES[kind], 'r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def get_validator(kind: str):
+    """jsonschema validator for one file kind, built on first use."""
+    schema = load_schema(kind)
+    Draft202012Validator.check_schema(schema)
+    return Draft202012Validator(schema, format_checker=FormatChecker())
+
+
+# ---------------------------------------------------------------------------
+# Fast check compiler
+# ---------------------------------------------------------------------------
+
+# Keywords with no effect on validity
+_ANNOTATIONS = {'$schema', '$id', '$defs', 'title', 'description'}
+
+# Python classes per JSON type. As in jsonschema's draft 2020-12 type
+# checker, bools are not numbers and integral floats count as integers.
+_TYPE_CLASSES = {
+    'object': (dict,),
+    'array': (list,),
+    'string': (str,),
+    'null': (type(None),),
+    'number': (int, float),
+    'integer': (int,),
+    'boolean': (),
+}
+
+
+def _type_check(types: List[str]) -> Callable[[Any], bool]:
+    classes = tuple(c for t in types for c in _TYPE_CLASSES[t])
+    allow_bool = 'boolean' in types
+    integral_floats = 'integer' in types and 'number' not in types
+
+    def check(v):
+        if isinstance(v, bool):
+            return allow_bool
+        if isinstance(v, classes):
+            return True
+        return integral_floats and isinstance(v, float) and v.is_integer()
+    return check
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$', re.ASCII)
+
+
+def _is_date(value: str) -> bool:
+    if not _DATE.fullmatch(value):
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def compile_check(schema: Dict[str, Any], defs: Dict[str, Any] = None) -> Callable[[Any], bool]:
+    """Compile a schema into a predicate. Raises ValueError on an unsupported keyword."""
+    if defs is None:
+        defs = schema.get('$defs', {})
+    unsupported = set(schema) - _ANNOTATIONS - {
+        '$ref', 'type', 'enum', 'required', 'properties', 'additionalProperties', 'items',
+        'minimum', 'maximum', 'minLength', 'pattern', 'format',
+    }
+    if unsupported:
+        raise ValueError(f"Fast check does not support: {', '.join(sorted(unsupported))}")
+
+    checks: List[Callable[[Any], bool]] = []
+
+    if '$ref' in schema:
+        ref = schema['$ref']
+        if not ref.startswith('#/$defs/'):
+            raise ValueError(f"Fast check does not support $ref {ref}")
+        checks.append(compile_check(defs[ref[len('#/$defs/'):]], defs))
+
+    if 'type' in schema:
+        checks.append(_type_check(schema['type'] if isinstance(schema['type'], list) else [schema['type']]))
+
+    if 'enum' in schema:
+        if not all(isinstance(option, str) for option in schema['enum']):
+            raise ValueError("Fast check only supports string enums")
+        options = frozenset(schema['enum'])
+        checks.append(lambda v: isinstance(v, str) and v in options)
+
+    required = schema.get('required', [])
+    properties = {k: compile_check(sub, defs) for k, sub in schema.get('properties', {}).items()}
+    additional = schema.get('additionalProperties', True)
+    if additional is False:
+        raise ValueError("Fast check does not support additionalProperties: false")
+    additional = None if additional is True else compile_check(additional, defs)
+    if required or properties or additional:
+        def check_object(v):
+            if not isinstance(v, dict):
+                return True
+            for key in required:
+                if key not in v:
+                    return False
+            for key, value in v.items():
+                check = properties.get(key, additional)
+                if check is not None and not check(value):
+                    return False
+            return True
+        checks.append(check_object)
+
+    if 'items' in schema:
+        item_check = compile_check(schema['items'], defs)
+        checks.append(lambda v: not isinstance(v, list) or all(map(item_check, v)))
+
+    if 'minimum' in schema:
+        minimum = schema['minimum']
+        checks.append(lambda v: not _is_number(v) or v >= minimum)
+    if 'maximum' in schema:
+        maximum = schema['maximum']
+        checks.append(lambda v: not _is_number(v) or v <= maximum)
+    if 'minLength' in schema:
+        min_length = schema['minLength']
+        checks.append(lambda v: not isinstance(v, str) or len(v) >= min_length)
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+        checks.append(lambda v: not isinstance(v, str) or pattern.search(v) is not None)
+    if 'format' in schema:
+        if schema['format'] != 'date':
+            raise ValueError(f"Fast check does not support format {schema['format']}")
+        checks.append(lambda v: not isinstance(v, str) or _is_date(v))
+
+    if not checks:
+        return lambda v: True
+    # Chain as plain `and` calls; a generator per value is measurably slower
+    combined = checks[-1]
+    for check in reversed(checks[:-1]):
+        combined = (lambda first, rest: lambda v: first(v) and rest(v))(check, combined)
+    return combined
+
+
+@lru_cache(maxsize=None)
+def get_fast_check(kind: str) -> Optional[Callable[[Any], bool]]:
+    """Compiled fast check for one file kind, or None if the schema needs full jsonschema."""
+    try:
+        return compile_check(load_schema(kind))
+    except ValueError:
+        return None
+
+
+def _dotted(path) -> str:
+    parts = []
+    for part in path:
+        if isinstance(part, int):
+            parts.append(f"[{part}]")
+        else:
+            parts.append(f".{part}" if parts else part)
+    return ''.join(parts)
+
+
+def _path_key(path) -> tuple:
+    """Sort key for an error path: array indexes compare as numbers ([2] before [10])."""
+    return tuple((1, part, '') if isinstance(part, int) else (0, 0, part) for part in path)
+
+
+def format_error(error) -> List[str]:
+    """Messages for one jsonschema error, worded like validate_submission.py's own checks."""
+    path = _dotted(error.absolute_path)
+    prefix = f"{path}." if path else ''
+
+    if error.validator == 'required':
+        missing = [f for f in error.validator_value if f not in error.instance]
+        return [f"Missing required field: {prefix}{field}" for field in missing]
+
+    if error.validator == 'format' and error.validator_value == 'date':
+        return [
+            f"Invalid date format for {path}: {error.instance}\n"
+            f"  → Must be YYYY-MM-DD format (e.g., 2023-01-15)"
+        ]
+
+    if error.validator == 'pattern' and error.validator_value == '^https?://':
+        field = _dotted(p for p in error.absolute_path if not isinstance(p, int))
+        return [
+            f"Invalid URL in {field}: {error.instance}\n"
+            f"  → URLs must start with http:// or https://"
+        ]
+
+    return [f"{path or '<root>'}: {error.message}"]
+
+
+def schema_errors(kind: str, data: Any) -> List[str]:
+    """All schema violations of one document, ordered by path."""
+    fast_check = get_fast_check(kind)
+    if fast_check is not None and fast_check(data):
+        return []
+    errors = sorted(get_validator(kind).iter_errors(data), key=lambda e: _path_key(e.absolute_path))
+    messages = [message for error in errors for message in format_error(error)]
+    # `required` reports every missing field once per error; keep the first of each
+    return list(dict.fromkeys(messages))
+
+
+def kind_for_path(path: Path) -> Optional[str]:
+    """Schema kind for a repo file, or None if no schema covers it."""
+    if path.parent.name == 'projects' and '.' not in path.stem:
+        return 'project'
+    if path.name == 'genesis.json':
+        return 'genesis'
+    if path.name in ('vesting-schedule.json', 'emission-schedule.json'):
+        return path.stem
+    return None
+
+
+def discover_files(repo_root: Path) -> List[Path]:
+    """Every project, genesis and schedule file in the repo."""
+    files = [p for p in sorted((repo_root / 'data' / 'projects').glob('*.json')) if '.' not in p.stem]
+    for project_dir in sorted((repo_root / 'allocations').iterdir()):
+        if project_dir.is_dir():
+            files.extend(project_dir / name for name in
+                         ('genesis.json', 'vesting-schedule.json', 'emission-schedule.json')
+                         if (project_dir / name).exists())
+    return files
+
+
+def validate_files(paths: List[Path]) -> Dict[str, List[str]]:
+    """path -> schema errors, for every file with a known kind."""
+    results: Dict[str, List[str]] = {}
+    for path in paths:
+        kind = kind_for_path(path)
+        if kind is None:
+            continue
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            results[str(path)] = [f"Invalid JSON: {e}"]
+            continue
+        results[str(path)] = schema_errors(kind, data)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate repo JSON files against schemas/.')
+    parser.add_argument('files', nargs='*', help='Files to check (default: every project, genesis and schedule file)')
+    args = parser.parse_args()
+
+    if not SCHEMAS_AVAILABLE:
+        print("❌ jsonschema is not installed (pip install -r requirements.txt)")
+        sys.exit(1)
+
+    repo_root = Path(__file__).parent.parent
+    paths = [Path(f) for f in args.files] or discover_files(repo_root)
+    results = validate_files(paths)
+
+    failed = {path: errors for path, errors in results.items() if errors}
+    for path, errors in failed.items():
+        print(f"\n❌ {path}: {len(errors)} error(s)")
+        for error in errors:
+            print(f"  • {error}")
+
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(results)} file(s) failed schema validation")
+        sys.exit(1)
+    print(f"✅ {len(results)} file(s) match their schemas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+JSON reading and writing for schedules, the comparison matrix and project files.
+
+Three output formats:
+
+    pretty      indent=2, keys in document order: the format of every committed
+                file, byte-identical to json.dump(data, f, indent=2)
+    compact     no whitespace
+    canonical   pretty with keys sorted at every level, for stable diffs
+
+orjson is used when installed (pip install orjson). Its number and string
+formatting differs from the json module in a few places: floats below 1e-4
+or from 1e16 up, non-ASCII text and DEL (the json module escapes both). Each
+encoded chunk is checked for those and re-encoded with the json module when
+one shows up, so the bytes written are the same with or without orjson.
+The one exception is NaN / Infinity, which orjson writes as null.
+
+Large documents are streamed: the top-level object is written one key at a
+time, and arrays longer than STREAM_ITEMS (monthly_schedule, timeline
+columns) STREAM_ITEMS elements at a time, so the full text is never held in
+memory. A StreamedObject goes further: its keys and arrays are generated while
+they are written, so the document itself is never held either (the schedule
+converters write monthly_schedule this way).
+
+The default format for dump()/dumps() is "pretty". Scripts going through
+instrumentation.run_main accept --json-format {pretty,compact,canonical} to
+change it for that run.
+
+load()/loads() parse with orjson when it accepts the input and fall back to
+the json module otherwise (NaN literals, integers past 64 bits), so errors
+are the json module's json.JSONDecodeError.
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from itertools import islice
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson not installed: the json module does everything
+    orjson = None
+
+
+FORMATS = ('pretty', 'compact', 'canonical')
+STREAM_ITEMS = 256
+
+# Numbers that orjson and the json module format differently: any exponent
+# (orjson writes 1e16 and 1e-7, never e+), or a plain decimal below 1e-4 (the
+# json module switches to 1e-05 there). Checked as a literal-prefix regex plus
+# a substring test; both are far cheaper than a digit-anchored pattern.
+_EXPONENT = re.compile(rb'e[-0-9]')
+_BELOW_1E4 = b'0.0000'
+
+_default_format = 'pretty'
+
+
+def set_default_format(fmt: str):
+    global _default_format
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown JSON format: {fmt} (expected one of {', '.join(FORMATS)})")
+    _default_format = fmt
+
+
+def pop_format_flag(argv: List[str]):
+    """Remove --json-format FORMAT from argv in place and make it the default."""
+    if '--json-format' not in argv:
+        return
+    i = argv.index('--json-format')
+    if i + 1 >= len(argv) or argv[i + 1] not in FORMATS:
+        print(f"❌ --json-format needs one of: {', '.join(FORMATS)}", file=sys.stderr)
+        sys.exit(2)
+    set_default_format(argv[i + 1])
+    del argv[i:i + 2]
+
+
+def _encode(value: Any, fmt: str) -> str:
+    """One value at indent level 0."""
+    sort = fmt == 'canonical'
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort else 0
+        if fmt != 'compact':
+            option |= orjson.OPT_INDENT_2
+        try:
+            encoded = orjson.dumps(value, option=option)
+        except TypeError:  # integers past 64 bits, non-str keys, ...
+            encoded = None
+        if encoded is not None and encoded.isascii() and b'\x7f' not in encoded \
+                and _BELOW_1E4 not in encoded and not _EXPONENT.search(encoded):
+            return encoded.decode('ascii')
+    if fmt == 'compact':
+        return json.dumps(value, separators=(',', ':'))
+    return json.dumps(value, indent=2, sort_keys=sort)
+
+
+def _indent(text: str, prefix: str) -> str:
+    # JSON strings never contain a raw newline, so every newline is structural
+    return text.replace('\n', '\n' + prefix)
+
+
+class StreamedObject:
+    """A JSON object produced lazily: an iterable of (key, value) pairs.
+
+    A value may itself be an iterator of array items. In the pretty format
+    both are written as they are produced, so a value computed while an
+    earlier key's iterator runs (a summary of the rows just written) is
+    ready by the time its key is reached. Other formats materialize the
+    object first, in the same order.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, Any]]):
+        self.items = items
+
+    def materialize(self) -> Dict[str, Any]:
+        return {key: list(value) if isinstance(value, Iterator) else value for key, value in self.items}
+
+
+def _iter_array(items: Iterator[Any], fmt: str) -> Iterator[str]:
+    """An array written STREAM_ITEMS elements at a time, at indent level 1."""
+    start = True
+    while True:
+        batch = list(islice(items, STREAM_ITEMS))
+        if not batch:
+            break
+        # "[\n  a,\n  b\n]" -> "    a,\n    b"
+        yield ('[\n  ' if start else ',\n  ') + _indent(_encode(batch, fmt)[2:-2], '  ')
+        start = False
+    yield '[]' if start else '\n  ]'
+
+
+def iter_chunks(data: Any, fmt: str = None) -> Iterator[str]:
+    """The serialized document as a sequence of text chunks."""
+    fmt = fmt or _default_format
+    if isinstance(data, StreamedObject):
+        if fmt != 'pretty':
+            yield from iter_chunks(data.materialize(), fmt)
+            return
+        items = data.items
+    elif fmt == 'compact' or not isinstance(data, (dict, list)) or not data or \
+            (isinstance(data, dict) and not all(isinstance(key, str) for key in data)):
+        yield _encode(data, fmt)
+        return
+    elif isinstance(data, dict):
+        items = sorted(data.items(), key=lambda item: item[0]) if fmt == 'canonical' else data.items()
+    else:
+        yield '['
+        for i, item in enumerate(data):
+            yield ('\n  ' if i == 0 else ',\n  ') + _indent(_encode(item, fmt), '  ')
+        yield '\n]'
+        return
+
+    empty = True
+    for key, value in items:
+        yield ('{\n  ' if empty else ',\n  ') + json.dumps(key) + ': '
+        empty = False
+        if isinstance(value, Iterator) or (isinstance(value, list) and len(value) > STREAM_ITEMS):
+            yield from _iter_array(iter(value), fmt)
+        else:
+            yield _indent(_encode(value, fmt), '  ')
+    yield '{}' if empty else '\n}'
+
+
+def dumps(data: Any, fmt: str = None) -> str:
+    return ''.join(iter_chunks(data, fmt))
+
+
+def dump(data: Any, fp, fmt: str = None):
+    """Stream the serialized document into an open text file."""
+    for chunk in iter_chunks(data, fmt):
+        fp.write(chunk)
+
+
+def write(path: Union[str, Path], data: Any, fmt: str = None, newline: bool = False,
+          stage: Callable[[str], ContextManager] = None) -> int:
+    """Write data to path, optionally followed by a newline. Returns the number of bytes written.
+
+    stage, if given, is instrumentation.stage: producing each chunk is timed
+    as 'serialize', apart from the file writes around it.
+    """
+    written = 0
+    chunks = iter_chunks(data, fmt)
+    with open(path, 'w') as f:
+        while True:
+            if stage is None:
+                chunk = next(chunks, None)
+            else:
+                with stage('serialize'):
+                    chunk = next(chunks, None)
+            if chunk is None:
+                break
+            f.write(chunk)
+            written += len(chunk)
+        if newline:
+            f.write('\n')
+            written += 1
+    return written
+
+
+def loads(text: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # re-parse for the json module's result or error message
+    return json.loads(text)
+
+
+def load(path: Union[str, Path]) -> Any:
+    with open(path, 'rb') as f:
+        return loads(f.read())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Append-only snapshot store for project supply, market and mining data.
+
+data/projects/<p>.json only holds the latest numbers; compute_derived.py and
+every refresh overwrite them in place. Each capture appends one row per
+project to a SQLite table, so trends (supply, price, volume, hashrate,
+inflation over time) are a query instead of a walk through git history:
+
+    snapshots(project, date, captured_at, source, content_hash,
+              current_supply, max_supply, pct_mined, current_block_reward,
+              daily_emission, annual_inflation_pct, current_price_usd,
+              daily_volume, circulating_mcap, fdmc, hashrate_th, difficulty)
+
+    index snapshots_project_date on (project, date)
+
+`date` is the as-of date of the data (last_updated, else market_data's date,
+else the capture / commit date). A row is only added when a project's
+captured values changed: (project, date, content_hash) is unique, so
+re-capturing the same data is a no-op. Hashrate is normalized to TH/s from
+whichever mining.current_hashrate_<unit> field a project uses.
+
+Usage:
+    python scripts/snapshots.py capture [<project> ...]       # default: every project
+    python scripts/snapshots.py backfill                      # every committed version in git
+    python scripts/snapshots.py history <project> [--field current_supply ...] [--json]
+
+build_all.py captures every project file it touched, so each refresh lands
+here without an extra step. The store (data/snapshots.sqlite) is gitignored;
+`backfill` rebuilds it from the repository history.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import subprocess
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+STORE_FILE = 'data/snapshots.sqlite'
+
+# Snapshot column -> dotted path in the project file
+VALUE_FIELDS = {
+    'current_supply': 'supply.current_supply',
+    'max_supply': 'supply.max_supply',
+    'pct_mined': 'supply.pct_mined',
+    'current_block_reward': 'emission.current_block_reward',
+    'daily_emission': 'emission.daily_emission',
+    'annual_inflation_pct': 'emission.annual_inflation_pct',
+    'current_price_usd': 'market_data.current_price_usd',
+    'daily_volume': 'market_data.daily_volume',
+    'circulating_mcap': 'market_data.circulating_mcap',
+    'fdmc': 'market_data.fdmc',
+    'hashrate_th': None,  # from mining.current_hashrate_<unit>
+    'difficulty': 'mining.current_difficulty',
+}
+
+HASHRATE_TO_TH = {
+    'hs': 1e-12, 'khs': 1e-9, 'mhs': 1e-6, 'ghs': 1e-3,
+    'h': 1e-12, 'kh': 1e-9, 'mh': 1e-6, 'gh': 1e-3,
+    'th': 1.0, 'ph': 1e3, 'eh': 1e6,
+}
+
+COLUMNS = ['project', 'date', 'captured_at', 'source', 'content_hash'] + list(VALUE_FIELDS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    project TEXT NOT NULL,
+    date TEXT NOT NULL,
+    captured_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    {', '.join(f'{name} REAL' for name in VALUE_FIELDS)},
+    UNIQUE (project, date, content_hash)
+);
+CREATE INDEX IF NOT EXISTS snapshots_project_date ON snapshots (project, date);
+"""
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _get(project_data: Dict[str, Any], dotted: str):
+    section, field = dotted.split('.', 1)
+    return (project_data.get(section) or {}).get(field)
+
+
+def hashrate_th(project_data: Dict[str, Any]) -> Optional[float]:
+    """mining.current_hashrate_<unit> converted to TH/s, or None."""
+    for key, value in (project_data.get('mining') or {}).items():
+        if key.startswith('current_hashrate_') and _number(value) is not None:
+            factor = HASHRATE_TO_TH.get(key[len('current_hashrate_'):])
+            if factor is not None:
+                return value * factor
+    return None
+
+
+def as_of_date(project_data: Dict[str, Any], fallback: str) -> str:
+    market = project_data.get('market_data') or {}
+    for candidate in (project_data.get('last_updated'), market.get('data_date'), market.get('current_date')):
+        if isinstance(candidate, str) and len(candidate) == 10:
+            return candidate
+    return fallback
+
+
+def snapshot_row(project: str, project_data: Dict[str, Any], source: str,
+                 captured_at: str, fallback_date: str) -> Tuple:
+    """One snapshots row (in COLUMNS order) for a project file's current contents."""
+    values = {
+        name: hashrate_th(project_data) if dotted is None else _number(_get(project_data, dotted))
+        for name, dotted in VALUE_FIELDS.items()
+    }
+    content_hash = hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()[:16]
+    return (project, as_of_date(project_data, fallback_date), captured_at, source, content_hash,
+            *values.values())
+
+
+class SnapshotStore:
+    """SQLite snapshot table; rows are only ever inserted."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def insert(self, rows: Iterable[Tuple]) -> int:
+        """Bulk insert in one transaction. Returns the number of new rows."""
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO snapshots ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            return self.conn.total_changes - before
+
+    def history(self, project: str, fields: List[str] = None) -> List[Dict[str, Any]]:
+        """Every snapshot of one project, oldest first (one index range scan)."""
+        fields = fields or list(VALUE_FIELDS)
+        unknown = [f for f in fields if f not in VALUE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        cursor = self.conn.execute(
+            f"SELECT date, source, {', '.join(fields)} FROM snapshots "
+            f"WHERE project = ? ORDER BY date, rowid",
+            (project,),
+        )
+        names = ['date', 'source'] + fields
+        return [dict(zip(names, row)) for row in cursor]
+
+    def projects(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT project FROM snapshots ORDER BY project")]
+
+
+def project_files(projects_dir: Path, names: List[str] = None) -> List[Path]:
+    # Skip sidecar files such as <p>.sources.json
+    paths = [p for p in sorted(projects_dir.glob('*.json')) if '.' not in p.stem]
+    if names:
+        paths = [p for p in paths if p.stem in names]
+    return paths
+
+
+def capture(store: SnapshotStore, paths: List[Path], source: str = 'capture') -> int:
+    """Snapshot the current contents of the given project files."""
+    now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    today = date.today().isoformat()
+    rows = []
+    for path in paths:
+        with open(path, 'r') as f:
+            rows.append(snapshot_row(path.stem, json.load(f), source, now, today))
+    return store.insert(rows)
+
+
+def _git(repo_root: Path, *args) -> str:
+    return subprocess.run(['git', *args], cwd=repo_root, capture_output=True, text=True, check=True).stdout
+
+
+def backfill(store: SnapshotStore, repo_root: Path) -> int:
+    """Snapshot every committed version of data/projects/*.json, oldest commit first."""
+    log = _git(repo_root, 'log', '--reverse', '--format=%H %cI', '--', 'data/projects')
+    rows = []
+    for line in log.splitlines():
+        commit, committed_at = line.split(' ', 1)
+        listing = _git(repo_root, 'ls-tree', '--name-only', commit, 'data/projects/')
+        for name in listing.splitlines():
+            stem = Path(name).stem
+            if not name.endswith('.json') or '.' in stem:
+                continue
+            try:
+                data = json.loads(_git(repo_root, 'show', f'{commit}:{name}'))
+            except json.JSONDecodeError:
+                continue  # a broken intermediate commit; skip that version
+            rows.append(snapshot_row(stem, data, f'git:{commit[:12]}', committed_at, committed_at[:10]))
+    return store.insert(rows)
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return '-'
+    return f'{value:,.0f}' if abs(value) >= 1000 else f'{value:.6g}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Append-only snapshots of project supply and market data.')
+    parser.add_argument('--store', default=STORE_FILE, help=f'SQLite file (default: {STORE_FILE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    capture_cmd = commands.add_parser('capture', help='Snapshot the current project files')
+    capture_cmd.add_argument('projects', nargs='*')
+
+    commands.add_parser('backfill', help='Snapshot every committed version from git history')
+
+    history_cmd = commands.add_parser('history', help="Print one project's snapshots")
+    history_cmd.add_argument('project')
+    history_cmd.add_argument('--field', action='append', dest='fields', choices=list(VALUE_FIELDS))
+    history_cmd.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+
+    args = parser.parse_args()
+    repo_root = Path(__file__).parent.parent
+    store_path = Path(args.store)
+    if not store_path.is_absolute():
+        store_path = repo_root / store_path
+    store = SnapshotStore(store_path)
+
+    try:
+        if args.command == 'capture':
+            paths = project_files(repo_root / 'data' / 'projects', args.projects)
+            missing = set(args.projects) - {p.stem for p in paths}
+            if missing:
+                print(f"❌ Project file(s) not found: {', '.join(sorted(missing))}")
+                sys.exit(1)
+            added = capture(store, paths)
+            print(f"✓ Captured {len(paths)} project(s), {added} new snapshot(s) in {args.store}")
+
+        elif args.command == 'backfill':
+            added = backfill(store, repo_root)
+            print(f"✓ Backfilled {added} new snapshot(s) from git history into {args.store}")
+
+        else:
+            rows = store.history(args.project, args.fields)
+            if args.json:
+                json.dump(rows, sys.stdout, indent=2)
+                print()
+                return
+            if not rows:
+                print(f"No snapshots for {args.project}")
+                return
+            fields = args.fields or list(VALUE_FIELDS)
+            print(f"{'date':<10}  " + '  '.join(f'{f:>20}' for f in fields))
+            for row in rows:
+                print(f"{row['date']:<10}  " + '  '.join(f"{_format_value(row[f]):>20}" for f in fields))
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
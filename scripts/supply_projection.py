@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Circulating supply and sell-pressure projection across all projects.
+
+The comparison matrix tracks vesting progress (cumulative_pct_of_genesis) on
+its own. This engine puts each project's two sources of new liquid tokens on
+one daily time axis:
+
+    mined      the project's emission model from emission_simulator.py
+               (halving_schedule / emission_curve), or a flat
+               emission.daily_emission when no machine-readable curve exists
+    unlocked   the vesting schedule's day-resolution timeline
+               (allocations/<p>/vesting-schedule.json), or vesting_engine.py
+               run on the genesis terms when a premined project has no schedule
+
+Both are anchored on the project file: circulating supply on the as-of date
+(last_updated, else the start date) is supply.current_supply, and later days
+add only the tokens mined and unlocked since then. So whatever
+current_supply already includes is never counted twice. Emission schedules
+(allocations carved out of block rewards, e.g. Ergo's treasury) are already
+part of the mined flow and add nothing on top.
+
+Per project and day:
+
+    circulating_supply     current_supply + mined + unlocked since as-of
+    new_liquid_tokens      circulating_supply minus the previous day's
+    unlock_to_volume       new_liquid_tokens * current_price_usd /
+                           market_data.daily_volume (NaN without market data)
+
+Projects are stacked into (projects x days) arrays, so the summary statistics
+are whole-matrix NumPy reductions.
+
+Usage:
+    python scripts/supply_projection.py                                  # every project, 10 years
+    python scripts/supply_projection.py --project quai --project kadena --years 5
+    python scripts/supply_projection.py --start 2026-01-01 --json
+    python scripts/supply_projection.py --output /tmp/projection.json    # full daily series
+"""
+
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from emission_simulator import build_model
+from repository import get_repository, read_json
+from vesting_engine import daily_cumulative
+
+
+SUMMARY_YEARS = [1, 2, 5, 10]
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _date(value) -> Optional[date]:
+    try:
+        return date.fromisoformat(value) if isinstance(value, str) else None
+    except ValueError:
+        return None
+
+
+def mined_since(project_data: Dict[str, Any], as_of: date, dates: np.ndarray):
+    """(model name, tokens mined from end of as_of to end of each date)."""
+    try:
+        curve, chronology = build_model(project_data)
+    except ValueError:
+        daily = _number((project_data.get('emission') or {}).get('daily_emission')) or 0.0
+        elapsed = (dates - np.datetime64(as_of, 'D')).astype(np.int64)
+        return 'flat_daily_emission', elapsed * daily
+
+    launch = np.datetime64(chronology.launch, 'D')
+    end_of_day = (dates - launch).astype(np.int64) + 1.0
+    supply = curve.supply_at(chronology.height_at_day(end_of_day))
+    anchor = curve.supply_at(chronology.height_at_day(chronology.to_day(as_of) + 1.0))
+    return type(curve).__name__, np.asarray(supply, dtype=np.float64) - float(anchor)
+
+
+def unlocked_by(project_dir: Path, project_data: Dict[str, Any], dates: np.ndarray):
+    """(source name, cumulative genesis tokens unlocked at each date), or (None, zeros)."""
+    schedule = read_json(project_dir / 'vesting-schedule.json')
+    if schedule is not None:
+        timeline = schedule.get('timeline')
+        if timeline and timeline.get('day') and schedule.get('genesis_date', 'unknown') != 'unknown':
+            day = (dates - np.datetime64(schedule['genesis_date'], 'D')).astype(np.int64)
+            # Step function: the last change point on or before each day
+            position = np.searchsorted(np.asarray(timeline['day']), day, side='right')
+            cumulative = np.concatenate([[0.0], np.asarray(timeline['cumulative_tokens'], dtype=np.float64)])
+            return 'vesting_schedule', cumulative[position]
+
+    genesis = read_json(project_dir / 'genesis.json') if project_data.get('has_premine') else None
+    if genesis is not None and not (project_dir / 'emission-schedule.json').exists():
+        if _date(genesis.get('genesis_date')):
+            start = np.datetime64(genesis['genesis_date'], 'D')
+            day = (dates - start).astype(np.int64)
+            n_days = int(day.max()) + 1 if len(day) else 0
+            if n_days > 0:
+                per_day = daily_cumulative(genesis, n_days).sum(axis=0)
+                return 'genesis_terms', np.where(day >= 0, per_day[np.clip(day, 0, None)], 0.0)
+
+    return None, np.zeros(len(dates))
+
+
+class SupplyProjection:
+    """Daily circulating supply, new liquid tokens and unlock/volume for many projects."""
+
+    def __init__(self, start: date, n_days: int):
+        self.start = start
+        self.n_days = n_days
+        # One extra leading day so the first new_liquid value has a predecessor
+        self.dates = np.datetime64(start, 'D') + np.arange(-1, n_days, dtype=np.int64)
+        self.projects: List[str] = []
+        self.meta: List[Dict[str, Any]] = []
+        self._circulating: List[np.ndarray] = []
+        self._prices: List[Optional[float]] = []
+        self._volumes: List[Optional[float]] = []
+
+    def add(self, name: str, project_data: Dict[str, Any], project_dir: Path):
+        supply = project_data.get('supply') or {}
+        market = project_data.get('market_data') or {}
+        current = _number(supply.get('current_supply'))
+        if current is None:
+            raise ValueError('supply.current_supply is missing')
+        as_of = _date(project_data.get('last_updated')) or self.start
+
+        mined_model, mined = mined_since(project_data, as_of, self.dates)
+        # Look up the as-of date in the same pass as the projection days
+        unlock_source, unlocked = unlocked_by(project_dir, project_data,
+                                              np.append(self.dates, np.datetime64(as_of, 'D')))
+
+        circulating = current + mined + (unlocked[:-1] - unlocked[-1])
+        max_supply = _number(supply.get('max_supply'))
+        if max_supply:
+            circulating = np.minimum(circulating, max(max_supply, current))
+
+        self._circulating.append(circulating)
+        self._prices.append(_number(market.get('current_price_usd')))
+        self._volumes.append(_number(market.get('daily_volume')))
+        self.projects.append(name)
+        self.meta.append({
+            'project': name,
+            'as_of': as_of.isoformat(),
+            'mined_model': mined_model,
+            'unlock_source': unlock_source,
+        })
+
+    def compute(self):
+        """Stack every project and derive the daily series in whole-matrix operations."""
+        full = np.vstack(self._circulating) if self._circulating else np.zeros((0, self.n_days + 1))
+        price = np.array(self._prices, dtype=np.float64)  # None -> NaN
+        volume = np.array(self._volumes, dtype=np.float64)
+
+        self.circulating = full[:, 1:]
+        self.new_liquid = np.diff(full, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            usd_per_volume = np.where(volume > 0, price / volume, np.nan)
+        self.unlock_to_volume = self.new_liquid * usd_per_volume[:, None]
+        return self
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-project horizon values and peaks."""
+        checkpoints = {f'{y}y': int(round(y * 365.25)) - 1 for y in SUMMARY_YEARS
+                       if int(round(y * 365.25)) <= self.n_days}
+        peak_day = self.new_liquid.argmax(axis=1)
+        has_ratio = ~np.isnan(self.unlock_to_volume).all(axis=1)
+        out = []
+        for i, meta in enumerate(self.meta):
+            entry = dict(meta)
+            entry['circulating_supply'] = {'start': int(self.circulating[i, 0])}
+            entry['circulating_supply'].update({k: int(self.circulating[i, d]) for k, d in checkpoints.items()})
+            entry['new_liquid_tokens_per_day'] = {
+                'mean': round(float(self.new_liquid[i].mean()), 2),
+                'peak': round(float(self.new_liquid[i, peak_day[i]]), 2),
+                'peak_date': str(self.dates[1 + peak_day[i]]),
+            }
+            if has_ratio[i]:
+                ratios = self.unlock_to_volume[i]
+                entry['unlock_to_volume'] = {
+                    'mean': round(float(ratios.mean()), 6),
+                    'median': round(float(np.median(ratios)), 6),
+                    'peak': round(float(ratios.max()), 6),
+                }
+            else:
+                entry['unlock_to_volume'] = None
+            out.append(entry)
+        return out
+
+    def series(self) -> Dict[str, Any]:
+        """Full daily arrays, for --output."""
+        return {
+            'start': self.start.isoformat(),
+            'days': self.n_days,
+            'projects': {
+                name: {
+                    **self.meta[i],
+                    'circulating_supply': np.round(self.circulating[i]).astype(np.int64).tolist(),
+                    'new_liquid_tokens': np.round(self.new_liquid[i], 2).tolist(),
+                    'unlock_to_volume': None if np.isnan(self.unlock_to_volume[i]).all()
+                    else np.round(self.unlock_to_volume[i], 6).tolist(),
+                }
+                for i, name in enumerate(self.projects)
+            },
+        }
+
+
+def project_all(repo_root: Path, start: date, years: int, names: List[str] = None):
+    """Build a SupplyProjection over every (or the named) project. Returns (projection, skipped)."""
+    projection = SupplyProjection(start, max(int(round(years * 365.25)), 1))
+    skipped = {}
+    repository = get_repository(repo_root)
+    for slug in repository.project_slugs():
+        project = repository.project(slug)
+        project_data = project.data
+        if project_data is None or (names and slug not in names):
+            continue
+        try:
+            projection.add(slug, project_data, repository.path(project.allocations_path))
+        except ValueError as e:
+            skipped[slug] = str(e)
+    return projection.compute(), skipped
+
+
+def _format_tokens(value) -> str:
+    for unit, size in (('B', 1e9), ('M', 1e6), ('K', 1e3)):
+        if abs(value) >= size:
+            return f'{value / size:.2f}{unit}'
+    return f'{value:.0f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Project circulating supply and sell pressure for every project.')
+    parser.add_argument('--project', action='append', dest='projects', help='Limit to a project (repeatable)')
+    parser.add_argument('--start', default=date.today().isoformat(), help='First day (default: today)')
+    parser.add_argument('--years', type=int, default=10, help='Horizon in years (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    parser.add_argument('--output', help='Write the full daily series as JSON to this path')
+    args = parser.parse_args()
+
+    start = _date(args.start)
+    if start is None:
+        print(f"❌ --start must be YYYY-MM-DD, got {args.start}")
+        sys.exit(1)
+
+    repo_root = Path(__file__).parent.parent
+    projection, skipped = project_all(repo_root, start, args.years, args.projects)
+    summary = projection.summary()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(projection.series(), f)
+
+    if args.json:
+        json.dump({'start': start.isoformat(), 'days': projection.n_days, 'projects': summary,
+                   'skipped': skipped}, sys.stdout, indent=2)
+        print()
+        return
+
+    horizons = [k for k in (f'{y}y' for y in SUMMARY_YEARS) if summary and k in summary[0]['circulating_supply']]
+    print(f"Circulating supply from {start} ({projection.n_days} days)\n")
+    print(f"  {'project':<10} {'start':>9} " + ' '.join(f'{h:>9}' for h in horizons)
+          + f"  {'peak new/day':>12} {'on':>10}  {'unlock/vol':>10}  model")
+    for entry in summary:
+        supply = entry['circulating_supply']
+        liquid = entry['new_liquid_tokens_per_day']
+        ratio = entry['unlock_to_volume']
+        print(f"  {entry['project']:<10} {_format_tokens(supply['start']):>9} "
+              + ' '.join(f"{_format_tokens(supply[h]):>9}" for h in horizons)
+              + f"  {_format_tokens(liquid['peak']):>12} {liquid['peak_date']:>10}"
+              + f"  {'-' if ratio is None else format(ratio['peak'], '.4f'):>10}"
+              + f"  {entry['mined_model']}{' + ' + entry['unlock_source'] if entry['unlock_source'] else ''}")
+    for name, reason in skipped.items():
+        print(f"  ⚠️  {name}: skipped ({reason})")
+    if args.output:
+        print(f"\n✓ Daily series: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Sparse day / block-height timelines for allocation schedules.
+
+monthly_schedule keys every row by an integer month with one date per
+month, which hides exactly when inside a month a cliff releases. The CSV
+converters therefore also emit a `timeline` section that keeps only the
+change points of the cumulative totals, each at day resolution (days since
+genesis, from the optional CSV `day` column or the row date) or, for
+emission schedules with a `block_height` column, at block resolution:
+
+    "timeline": {
+      "resolution": "day" | "block",
+      "interpolation": "step" | "linear",
+      "day": [...], "date": [...], ["block_height": [...]],
+      "cumulative_tokens": [...], "cumulative_pct": [...],
+      "tiers": {"<tier>": [cumulative tokens, ...]}
+    }
+
+Vesting releases tokens at discrete events, so lookups between change
+points hold the last value ("step"). Emission accrues continuously between
+the listed points, so lookups interpolate linearly ("linear"); a linear
+section therefore also keeps the last point of each plateau, where accrual
+resumes. Either way a lookup is one bisect over the change points, never a
+scan of dense rows.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from schedule_csv import ScheduleRow
+
+
+class Timeline:
+    """Monotone cumulative values at sorted change points."""
+
+    def __init__(self, xs: List[float], ys: List[float], interpolation: str = 'step'):
+        if interpolation not in ('step', 'linear'):
+            raise ValueError(f"Unknown interpolation: {interpolation}")
+        self.xs = xs
+        self.ys = ys
+        self.interpolation = interpolation
+
+    @classmethod
+    def from_section(cls, section: Dict[str, Any], axis: str = 'day', value: str = 'cumulative_pct') -> 'Timeline':
+        """Timeline over one axis ('day' or 'block_height') of a schedule's timeline section."""
+        return cls(section[axis], section[value], section.get('interpolation', 'step'))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def at(self, x: float) -> float:
+        """Cumulative value at x (0 before the first change point)."""
+        position = bisect_right(self.xs, x)
+        if position == 0:
+            return 0
+        if self.interpolation == 'step' or position == len(self.xs):
+            return self.ys[position - 1]
+
+        x0, x1 = self.xs[position - 1], self.xs[position]
+        y0, y1 = self.ys[position - 1], self.ys[position]
+        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    def first_reaching(self, y: float) -> Optional[float]:
+        """Smallest x whose cumulative value is >= y, or None if never reached."""
+        position = bisect_left(self.ys, y)
+        if position == len(self.ys):
+            return None
+        if self.interpolation == 'step' or position == 0:
+            return self.xs[position]
+
+        x0, x1 = self.xs[position - 1], self.xs[position]
+        y0, y1 = self.ys[position - 1], self.ys[position]
+        return x0 + (x1 - x0) * (y - y0) / (y1 - y0)
+
+    def largest_step(self, start: int = 0):
+        """(x, increase) of the biggest change point from index start on, or None."""
+        if len(self.xs) <= start:
+            return None
+        best = (self.xs[start], self.ys[start] - (self.ys[start - 1] if start else 0))
+        for i in range(start + 1, len(self.xs)):
+            step = self.ys[i] - self.ys[i - 1]
+            if step > best[1]:
+                best = (self.xs[i], step)
+        return best
+
+
+class TimelineBuilder:
+    """Incremental timeline section: rows go in (day, block_height, line) order.
+
+    Running state is one cumulative per bucket and per tier plus the points
+    emitted so far. has_blocks must be known up front (it decides whether
+    the section has a block_height column); the converters learn it in their
+    first pass.
+    """
+
+    def __init__(self, genesis_date: str, total_tokens: float, interpolation: str, has_blocks: bool):
+        self.genesis = date.fromisoformat(genesis_date) if genesis_date and genesis_date != 'unknown' else None
+        self.total_tokens = total_tokens
+        self.has_blocks = has_blocks
+        self._day_of: Dict[str, int] = {}
+        self._bucket_state: Dict[tuple, float] = {}
+        self._tier_state: Dict[str, float] = {}
+        self._total = 0.0
+        self._previous_key = None
+        self._previous_sort_key = None
+        self._emitted_total = None
+        self._plateau_end = None  # (day, block_height) of the last point skipped since the last emitted one
+
+        self.section: Dict[str, Any] = {
+            'resolution': 'block' if has_blocks else 'day',
+            'interpolation': interpolation,
+            'day': [],
+            'date': [],
+        }
+        if has_blocks:
+            self.section['block_height'] = []
+        self.section.update({'cumulative_tokens': [], 'cumulative_pct': [], 'tiers': {}})
+
+    def sort_key(self, row: ScheduleRow) -> tuple:
+        """(day, block_height, line): the order add() expects."""
+        if row.day is not None:
+            day = row.day
+        else:
+            day = self._day_of.get(row.date)
+            if day is None:
+                day = (date.fromisoformat(row.date) - self.genesis).days if self.genesis else 0
+                self._day_of[row.date] = day
+        return day, row.block_height or 0, row.line
+
+    def _emit(self, day: int, block_height: int):
+        section = self.section
+        n_points = len(section['day'])
+        section['day'].append(day)
+        section['date'].append((self.genesis + timedelta(days=day)).isoformat() if self.genesis else None)
+        if self.has_blocks:
+            section['block_height'].append(block_height)
+        section['cumulative_tokens'].append(int(self._total))
+        section['cumulative_pct'].append(
+            round(self._total / self.total_tokens * 100, 2) if self.total_tokens > 0 else 0)
+        for tier, value in self._tier_state.items():
+            section['tiers'].setdefault(tier, [0] * n_points).append(int(value))
+
+    def _emit_plateau_end(self):
+        """Repeat the last emitted values at the end of the plateau after them.
+
+        A step lookup holds the last value anyway, but a linear one would
+        otherwise interpolate straight across the plateau to the next point.
+        """
+        if self._plateau_end is None:
+            return
+        section = self.section
+        day, block_height = self._plateau_end
+        self._plateau_end = None
+        section['day'].append(day)
+        section['date'].append((self.genesis + timedelta(days=day)).isoformat() if self.genesis else None)
+        if self.has_blocks:
+            section['block_height'].append(block_height)
+        for column in ('cumulative_tokens', 'cumulative_pct'):
+            section[column].append(section[column][-1])
+        for values in section['tiers'].values():
+            values.append(values[-1])
+
+    def add(self, row: ScheduleRow, sort_key: tuple = None):
+        sort_key = sort_key or self.sort_key(row)
+        if self._previous_sort_key is not None and sort_key < self._previous_sort_key:
+            raise ValueError(f"Row {row.line}: timeline rows out of day order (day {sort_key[0]} "
+                             f"after day {self._previous_sort_key[0]})")
+        self._previous_sort_key = sort_key
+        key = sort_key[:2]
+        if self._previous_key is not None and key != self._previous_key:
+            if self._total != self._emitted_total:
+                self._emit_plateau_end()
+                self._emit(*self._previous_key)
+                self._emitted_total = self._total
+            elif self.section['interpolation'] == 'linear':
+                self._plateau_end = self._previous_key
+        self._previous_key = key
+
+        bucket_key = (row.tier, row.bucket_name)
+        delta = row.cumulative_tokens - self._bucket_state.get(bucket_key, 0.0)
+        self._bucket_state[bucket_key] = row.cumulative_tokens
+        self._tier_state[row.tier] = self._tier_state.get(row.tier, 0.0) + delta
+        self._total += delta
+
+    def finish(self) -> Dict[str, Any]:
+        if self._previous_key is not None and self._total != self._emitted_total:
+            self._emit_plateau_end()
+            self._emit(*self._previous_key)
+            self._emitted_total = self._total
+        return self.section
+
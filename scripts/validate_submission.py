@@ -2,13 +2,32 @@
 """
 PoW Tokenomics Tracker - Submission Validator
 Validates project and genesis JSON files before submission
+
+Usage:
+  python scripts/validate_submission.py <project>                 # one project, full report
+  python scripts/validate_submission.py <project> <project> ...   # several, in parallel
+  python scripts/validate_submission.py --all [--jobs N] [--json] # every project in the repo
+  python scripts/validate_submission.py <project> ... --github    # report with GitHub Actions annotations
+  python scripts/validate_submission.py <project> --profile       # stage timings, see instrumentation.py
 """
 
+import argparse
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from instrumentation import run_main, stage
+from repository import get_repository
+from schema_validation import SCHEMAS_AVAILABLE, schema_errors
+
+try:
+    from reconcile_schedule import describe, reconcile
+except ImportError:  # numpy not installed: schedules are not checked against genesis terms
+    reconcile = None
+
 
 class ValidationError(Exception):
     """Custom exception for validation failures"""
@@ -16,59 +35,111 @@ class ValidationError(Exception):
 
 
 class Validator:
-    def __init__(self, project_name):
+    def __init__(self, project_name, documents=None, repository=None):
+        """documents, if given, maps repo-relative paths to already parsed JSON
+        (or the json.JSONDecodeError it raised); files not in it are treated as
+        missing and nothing is read from disk. Otherwise files are read through
+        repository (default: the checkout this script lives in)."""
         self.project_name = project_name
+        self.documents = documents
+        self.repository = repository or get_repository()
         self.errors = []
         self.warnings = []
         self.project_data = None
         self.genesis_data = None
+        self.info = []
+        self.fatal = None
         
-    def validate_all(self):
-        """Run all validation checks"""
-        print(f"🔍 Validating {self.project_name}...\n")
-        
+    def run(self):
+        """Run all validation checks and return a structured result (no printing)"""
         try:
             # Load and validate project file
-            self.load_project_file()
-            self.validate_project_structure()
-            self.validate_supply_math()
-            self.validate_emission_math()
-            self.validate_dates()
-            self.validate_urls()
+            with stage('parse') as timer:
+                self.load_project_file()
+                timer.rows += 1
+            with stage('validate'):
+                self.validate_project_structure()
+                self.validate_supply_math()
+                self.validate_emission_math()
+                self.validate_dates()
+                self.validate_urls()
             
             # Load and validate genesis file if needed
             if self.project_data.get('has_premine'):
-                self.load_genesis_file()
-                self.validate_genesis_structure()
-                self.validate_allocation_math()
-                self.validate_vesting_logic()
-            
-            # Check for comment fields
-            self.check_for_comments()
+                with stage('parse') as timer:
+                    self.load_genesis_file()
+                    timer.rows += 1
+                with stage('validate'):
+                    self.validate_genesis_structure()
+                    self.validate_allocation_math()
+                    self.validate_vesting_logic()
+                    self.validate_schedule_consistency()
             
-            # Print results
-            self.print_results()
-            
-            return len(self.errors) == 0
+            with stage('validate'):
+                self.validate_schedule_structure()
+                
+                # Check for comment fields
+                self.check_for_comments()
             
         except Exception as e:
-            print(f"❌ Fatal error: {str(e)}\n")
+            self.fatal = str(e)
+        
+        return self.result()
+    
+    def _exists(self, path):
+        if self.documents is not None:
+            return str(path) in self.documents
+        return self.repository.exists(path)
+    
+    def _load_json(self, path):
+        if self.documents is not None:
+            data = self.documents[str(path)]
+            if isinstance(data, json.JSONDecodeError):
+                raise data
+            return data
+        return self.repository.read_json(path)
+    
+    def result(self):
+        """Structured outcome of the last run"""
+        return {
+            'project': self.project_name,
+            'passed': self.fatal is None and len(self.errors) == 0,
+            'fatal': self.fatal,
+            'errors': list(self.errors),
+            'warnings': list(self.warnings),
+            'info': list(self.info),
+        }
+    
+    def validate_all(self):
+        """Run all validation checks and print the full report"""
+        print(f"🔍 Validating {self.project_name}...\n")
+        
+        result = self.run()
+        for line in result['info']:
+            print(line)
+        
+        if result['fatal'] is not None:
+            print(f"❌ Fatal error: {result['fatal']}\n")
             return False
+        
+        # Print results
+        self.print_results()
+        
+        return result['passed']
     
     def load_project_file(self):
         """Load and parse project JSON file"""
         project_path = Path(f"data/projects/{self.project_name}.json")
         
-        if not project_path.exists():
+        if not self._exists(project_path):
             raise ValidationError(
                 f"Project file not found: {project_path}\n"
                 f"Expected location: data/projects/{self.project_name}.json"
             )
         
         try:
-            with open(project_path, 'r') as f:
-                self.project_data = json.load(f)
-            print(f"✅ Loaded project file: {project_path}")
+            self.project_data = self._load_json(project_path)
+            self.info.append(f"✅ Loaded project file: {project_path}")
         except json.JSONDecodeError as e:
             raise ValidationError(f"Invalid JSON in project file: {str(e)}")
     
@@ -76,7 +147,7 @@ class Validator:
         """Load and parse genesis JSON file"""
         genesis_path = Path(f"allocations/{self.project_name}/genesis.json")
         
-        if not genesis_path.exists():
+        if not self._exists(genesis_path):
             self.errors.append(
                 f"Genesis file missing: {genesis_path}\n"
                 f"  → Project has has_premine=true but no genesis file found\n"
@@ -85,14 +156,29 @@ class Validator:
             return
         
         try:
-            with open(genesis_path, 'r') as f:
-                self.genesis_data = json.load(f)
-            print(f"✅ Loaded genesis file: {genesis_path}")
+            self.genesis_data = self._load_json(genesis_path)
+            self.info.append(f"✅ Loaded genesis file: {genesis_path}")
         except json.JSONDecodeError as e:
             self.errors.append(f"Invalid JSON in genesis file: {str(e)}")
     
     def validate_project_structure(self):
         """Check required fields in project file"""
+        if SCHEMAS_AVAILABLE:
+            # schemas/project.schema.json: required fields, types, date formats and URLs
+            self.errors.extend(schema_errors('project', self.project_data))
+        else:
+            self.check_project_required_fields()
+        
+        # Check data sources
+        if 'data_sources' in self.project_data:
+            sources = self.project_data['data_sources']
+            if not sources.get('official_docs'):
+                self.warnings.append("No official_docs provided in data_sources")
+            if not sources.get('block_explorer'):
+                self.warnings.append("No block_explorer provided in data_sources")
+    
+    def check_project_required_fields(self):
+        """Required-field checks used when jsonschema is not installed"""
         required_fields = [
             'project', 'ticker', 'consensus', 'launch_date',
             'has_premine', 'supply', 'emission', 'data_sources'
@@ -114,14 +200,6 @@ class Validator:
             for field in emission_required:
                 if field not in self.project_data['emission']:
                     self.errors.append(f"Missing required field: emission.{field}")
-        
-        # Check data sources
-        if 'data_sources' in self.project_data:
-            sources = self.project_data['data_sources']
-            if not sources.get('official_docs'):
-                self.warnings.append("No official_docs provided in data_sources")
-            if not sources.get('block_explorer'):
-                self.warnings.append("No block_explorer provided in data_sources")
     
     def validate_supply_math(self):
         """Validate supply calculations"""
@@ -200,7 +278,8 @@ class Validator:
         if self.genesis_data:
             date_fields.append(('genesis_date', self.genesis_data))
         
-        for field_name, data in date_fields:
+        # With jsonschema, format "date" in the project and genesis schemas covers these
+        for field_name, data in ([] if SCHEMAS_AVAILABLE else date_fields):
             if field_name in data:
                 date_str = data[field_name]
                 try:
@@ -213,7 +292,10 @@ class Validator:
         
         # Warn if data is old
         if 'last_updated' in self.project_data:
-            last_updated = datetime.strptime(self.project_data['last_updated'], '%Y-%m-%d')
+            try:
+                last_updated = datetime.strptime(self.project_data['last_updated'], '%Y-%m-%d')
+            except ValueError:
+                return  # already reported as an invalid date
             days_old = (datetime.now() - last_updated).days
             if days_old > 30:
                 self.warnings.append(
@@ -223,8 +305,8 @@ class Validator:
     
     def validate_urls(self):
         """Check URL formats in data_sources"""
-        if 'data_sources' not in self.project_data:
-            return
+        if SCHEMAS_AVAILABLE or 'data_sources' not in self.project_data:
+            return  # the project schema already checked every URL
         
         sources = self.project_data['data_sources']
         url_fields = ['official_docs', 'block_explorer', 'market_data', 'mining_data']
@@ -248,14 +330,17 @@ class Validator:
         if not self.genesis_data:
             return
         
-        required_fields = [
-            'project', 'has_premine', 'genesis_date',
-            'total_genesis_allocation_pct', 'allocation_tiers'
-        ]
-        
-        for field in required_fields:
-            if field not in self.genesis_data:
-                self.errors.append(f"Genesis file missing required field: {field}")
+        if SCHEMAS_AVAILABLE:
+            self.errors.extend(f"Genesis file: {e}" for e in schema_errors('genesis', self.genesis_data))
+        else:
+            required_fields = [
+                'project', 'has_premine', 'genesis_date',
+                'total_genesis_allocation_pct', 'allocation_tiers'
+            ]
+            
+            for field in required_fields:
+                if field not in self.genesis_data:
+                    self.errors.append(f"Genesis file missing required field: {field}")
         
         # Check project name matches
         if self.genesis_data.get('project') != self.project_name:
@@ -344,6 +429,37 @@ class Validator:
                         f"Bucket '{bucket.get('name')}': cliff ({cliff}mo) exceeds vesting ({vesting}mo)"
                     )
     
+    def validate_schedule_consistency(self):
+        """Check the vesting schedule follows the genesis bucket terms (see reconcile_schedule.py)"""
+        schedule_path = Path(f"allocations/{self.project_name}/vesting-schedule.json")
+        if not self.genesis_data or reconcile is None or not self._exists(schedule_path):
+            return
+        try:
+            schedule = self._load_json(schedule_path)
+        except json.JSONDecodeError:
+            return  # reported by validate_schedule_structure
+        for finding in reconcile(self.genesis_data, schedule):
+            self.warnings.append(describe(finding))
+    
+    def validate_schedule_structure(self):
+        """Check generated vesting / emission schedules against their schemas"""
+        if not SCHEMAS_AVAILABLE:
+            return
+        
+        for name in ('vesting-schedule.json', 'emission-schedule.json'):
+            schedule_path = Path(f"allocations/{self.project_name}/{name}")
+            if not self._exists(schedule_path):
+                continue
+            try:
+                schedule = self._load_json(schedule_path)
+            except json.JSONDecodeError as e:
+                self.errors.append(f"Invalid JSON in {name}: {str(e)}")
+                continue
+            errors = schema_errors(schedule_path.stem, schedule)
+            self.errors.extend(f"{name}: {e}" for e in errors)
+            if not errors:
+                self.info.append(f"✅ Schedule matches schema: {schedule_path}")
+    
     def check_for_comments(self):
         """Check if template comment fields are still present"""
         def has_comment_keys(obj, path=""):
@@ -390,20 +506,107 @@ class Validator:
             print("   Need help? Check CONTRIBUTING.md or open an issue.\n")
 
 
+def validate_project(project_name):
+    """Process-pool entry point: validate one project and return its result"""
+    return Validator(project_name).run()
+
+
+def discover_projects():
+    """Every project slug with a data/projects/<slug>.json or allocations/<slug>/ entry"""
+    return get_repository().project_slugs()
+
+
+def validate_many(project_names, jobs=None):
+    """Validate projects across a process pool; results come back in input order"""
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(project_names)))
+    if workers == 1:
+        return [validate_project(name) for name in project_names]
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(validate_project, project_names))
+
+
+def print_report(results, github=False):
+    """Print one aggregated report for a multi-project run.
+    
+    github wraps each project's details in a collapsible ::group:: and ends
+    with an ::error:: annotation naming the failed projects, for GitHub Actions."""
+    failed = [r for r in results if not r['passed']]
+    
+    for r in results:
+        status = "✅" if r['passed'] else "❌"
+        detail = "fatal error" if r['fatal'] else f"{len(r['errors'])} error(s)"
+        print(f"  {status} {r['project']:<20} {detail}, {len(r['warnings'])} warning(s)")
+    
+    for r in (results if github else failed):
+        print("\n" + "="*60)
+        if github:
+            print(f"::group::Validating {r['project']}")
+        if r['fatal']:
+            print(f"❌ {r['project']}: fatal error\n")
+            print(f"{r['fatal']}\n")
+        elif r['errors']:
+            print(f"❌ {r['project']}: {len(r['errors'])} error(s)\n")
+            for i, error in enumerate(r['errors'], 1):
+                print(f"{i}. {error}\n")
+        else:
+            print(f"✅ {r['project']}: no errors\n")
+        if github:
+            for i, warning in enumerate(r['warnings'], 1):
+                print(f"⚠️  {i}. {warning}\n")
+            print("::endgroup::")
+    
+    print("="*60)
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(results)} project(s) failed: "
+              f"{', '.join(r['project'] for r in failed)}\n")
+        if github:
+            print(f"::error::Validation failed for: {' '.join(r['project'] for r in failed)}")
+    else:
+        print(f"\n🎉 All {len(results)} project(s) passed.\n")
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python validate_submission.py <project-name>")
-        print("\nExample:")
-        print("  python validate_submission.py bitcoin")
-        print("  python validate_submission.py example-coin")
+    parser = argparse.ArgumentParser(
+        description='Validate project and genesis JSON files before submission.',
+        epilog='Examples:\n'
+               '  python validate_submission.py bitcoin\n'
+               '  python validate_submission.py example-coin\n'
+               '  python validate_submission.py --all',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('projects', nargs='*', help='Project slugs')
+    parser.add_argument('--all', action='store_true', help='Every project in the repo')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    parser.add_argument('--github', action='store_true',
+                        help='Aggregated report with GitHub Actions ::group:: and ::error:: annotations')
+    args = parser.parse_args()
+    if not args.projects and not args.all:
+        parser.print_help()
         sys.exit(1)
     
-    project_name = sys.argv[1]
-    validator = Validator(project_name)
+    project_names = discover_projects() if args.all else args.projects
+    
+    # Single project keeps the detailed interactive report
+    if len(project_names) == 1 and not args.all and not args.json and not args.github:
+        validator = Validator(project_names[0])
+        success = validator.validate_all()
+        sys.exit(0 if success else 1)
+    
+    # Stages inside worker processes are not collected; this is their wall time
+    with stage('validate_many') as timer:
+        results = validate_many(project_names, args.jobs)
+        timer.rows += len(results)
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"🔍 Validated {len(results)} project(s)\n")
+        print_report(results, github=args.github)
     
-    success = validator.validate_all()
-    sys.exit(0 if success else 1)
+    sys.exit(0 if all(r['passed'] for r in results) else 1)
 
 
 if __name__ == '__main__':
-    main()
+    run_main(main, Path(__file__).stem)
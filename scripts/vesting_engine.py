@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Generate vesting schedules directly from genesis.json bucket terms.
+
+Every bucket in allocations/<project>/genesis.json already declares
+tge_unlock_pct, cliff_months, vesting_months and absolute_tokens. This engine
+builds the full bucket x month unlock matrix from those terms with NumPy array
+ops and emits the same monthly_schedule / tier_aggregates / total shape as
+csv_to_vesting_json.py, so schedules no longer have to be kept in sync with a
+hand-built CSV.
+
+Vesting model (one convention among several; hand-built schedules differ,
+e.g. kadena's linear unlocks start at month 0 and quai's Seed Round 2
+releases 25% at the cliff, so regenerating those does not reproduce them):
+    month 0                          tge_unlock_pct of the bucket unlocks
+    months 1 .. cliff                nothing unlocks
+    months cliff+1 .. cliff+vesting  the remainder unlocks in equal monthly steps
+    vesting_months = 0               the remainder unlocks at month `cliff`
+
+Buckets with allocation_mechanism = block_reward_emission belong to emission
+schedules and are skipped. Buckets with a null vesting_months have no fixed
+schedule; only their TGE portion is ever counted as unlocked.
+
+The schedule JSON goes to stdout unless --output names a file; it never
+overwrites a committed vesting-schedule.json on its own.
+
+Usage:
+    python vesting_engine.py <genesis_json_path> [--months N] [--output PATH]
+    python vesting_engine.py <genesis_json_path> --daily [--years N]
+
+Example:
+    python vesting_engine.py allocations/quai/genesis.json --output /tmp/quai-vesting.json
+    python vesting_engine.py allocations/examplecoin/genesis.json > allocations/examplecoin/vesting-schedule.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from repository import read_json
+
+
+MILESTONE_MONTHS = [0, 6, 12, 18, 24, 36, 48]
+
+# Phase codes used to pick a per-row note without a Python branch per cell.
+PHASE_TGE, PHASE_LOCKED, PHASE_VESTING, PHASE_VESTED, PHASE_UNSCHEDULED = range(5)
+PHASE_NOTES = ['TGE unlock', 'Cliff', 'Linear vest', 'Fully vested', 'No fixed vesting schedule']
+
+
+def _num(value, default=0.0):
+    """Genesis fields use null and "unknown" for missing terms."""
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+
+
+class BucketTerms:
+    """Column-oriented vesting terms for every scheduled bucket in a genesis file."""
+
+    def __init__(self, genesis_data: Dict[str, Any]):
+        self.tiers: List[str] = []
+        self.names: List[str] = []
+        tokens, tge, cliff, vesting, scheduled = [], [], [], [], []
+
+        for tier_name, tier_data in (genesis_data.get('allocation_tiers') or {}).items():
+            if not isinstance(tier_data, dict):  # e.g. the template's _comment strings
+                continue
+            for bucket in tier_data.get('buckets') or []:
+                if not isinstance(bucket, dict):
+                    continue
+                if bucket.get('allocation_mechanism') == 'block_reward_emission':
+                    continue
+                if _num(bucket.get('absolute_tokens')) <= 0:
+                    continue
+                self.tiers.append(tier_name)
+                self.names.append(bucket.get('name', ''))
+                tokens.append(_num(bucket.get('absolute_tokens')))
+                tge.append(_num(bucket.get('tge_unlock_pct')) / 100)
+                cliff.append(_num(bucket.get('cliff_months')))
+                vesting.append(_num(bucket.get('vesting_months')))
+                scheduled.append(bucket.get('vesting_months') is not None)
+
+        self.tokens = np.array(tokens, dtype=np.float64)
+        self.tge_frac = np.clip(np.array(tge, dtype=np.float64), 0.0, 1.0)
+        self.cliff = np.array(cliff, dtype=np.int64)
+        self.vesting = np.array(vesting, dtype=np.int64)
+        self.scheduled = np.array(scheduled, dtype=bool)
+
+    def __len__(self):
+        return len(self.names)
+
+    def horizon_months(self) -> int:
+        """Last month in which any scheduled bucket still unlocks."""
+        if not len(self):
+            return 0
+        ends = np.where(self.scheduled, self.cliff + self.vesting, 0)
+        return int(ends.max())
+
+
+class UnlockMatrix:
+    """Per-bucket x per-month unlock and cumulative token arrays."""
+
+    def __init__(self, terms: BucketTerms, n_months: int):
+        self.terms = terms
+        self.months = np.arange(n_months + 1, dtype=np.int64)
+
+        m = self.months[None, :]
+        cliff = terms.cliff[:, None]
+        vesting = terms.vesting[:, None]
+        scheduled = terms.scheduled[:, None]
+
+        tge_tokens = terms.tokens * terms.tge_frac
+        remaining = terms.tokens - tge_tokens
+        per_month = np.divide(remaining, terms.vesting, out=np.zeros_like(remaining),
+                              where=terms.vesting > 0)
+
+        # Broadcasted cliff/vesting window: True where the bucket releases a
+        # linear step this month.
+        linear = scheduled & (vesting > 0) & (m > cliff) & (m <= cliff + vesting)
+        instant = scheduled & (vesting == 0) & (m == cliff)
+
+        unlocks = linear * per_month[:, None] + instant * remaining[:, None]
+        unlocks[:, 0] += tge_tokens
+        self.unlocks = unlocks
+        # Pin fully vested cells to the exact allocation so float drift in the
+        # running sum never leaves a bucket at 99.99999%.
+        done = scheduled & (m >= cliff + vesting)
+        self.cumulative = np.where(done, terms.tokens[:, None], np.cumsum(unlocks, axis=1))
+
+        phase = np.full(unlocks.shape, PHASE_LOCKED, dtype=np.int8)
+        phase[linear] = PHASE_VESTING
+        phase[scheduled & (m > cliff + vesting)] = PHASE_VESTED
+        phase[instant] = PHASE_VESTED
+        phase[~terms.scheduled, :] = PHASE_UNSCHEDULED
+        phase[:, 0] = np.where(tge_tokens > 0, PHASE_TGE, phase[:, 0])
+        self.phase = phase
+
+    def cumulative_pct(self) -> np.ndarray:
+        tokens = self.terms.tokens[:, None]
+        return np.divide(self.cumulative * 100, tokens,
+                         out=np.zeros_like(self.cumulative), where=tokens > 0)
+
+
+def month_dates(genesis_date: str, months: np.ndarray) -> np.ndarray:
+    """genesis_date + N months, clamping the day for short months (Jan 31 -> Feb 28)."""
+    start = np.datetime64(genesis_date, 'D')
+    day = int((start - start.astype('datetime64[M]').astype('datetime64[D]')).astype(int)) + 1
+    month_starts = start.astype('datetime64[M]') + months
+    month_len = ((month_starts + 1).astype('datetime64[D]')
+                 - month_starts.astype('datetime64[D]')).astype(np.int64)
+    return month_starts.astype('datetime64[D]') + (np.minimum(day, month_len) - 1)
+
+
+def elapsed_months(genesis_date: str, n_days: int) -> np.ndarray:
+    """Number of whole monthly anniversaries reached on each day since genesis."""
+    start = np.datetime64(genesis_date, 'D')
+    days = start + np.arange(n_days, dtype=np.int64)
+    months = (days.astype('datetime64[M]') - start.astype('datetime64[M]')).astype(np.int64)
+    anniversary = month_dates(genesis_date, months)
+    return months - (days < anniversary)
+
+
+def horizon_days(genesis_date: str, years: int) -> int:
+    """Days from genesis through its `years`-th anniversary, inclusive (leap days counted)."""
+    start = np.datetime64(genesis_date, 'D')
+    return int((month_dates(genesis_date, np.array([12 * years]))[0] - start).astype(np.int64)) + 1
+
+
+def daily_cumulative(genesis_data: Dict[str, Any], n_days: int) -> np.ndarray:
+    """Cumulative unlocked tokens per bucket per day since genesis (buckets x days)."""
+    elapsed = elapsed_months(genesis_data['genesis_date'], n_days)
+    matrix = UnlockMatrix(BucketTerms(genesis_data), int(elapsed[-1]) if n_days else 0)
+    return matrix.cumulative[:, elapsed]
+
+
+def _pct(numerator, denominator):
+    return np.round(np.divide(numerator * 100, denominator, out=np.zeros_like(numerator, dtype=np.float64),
+                              where=denominator > 0), 2)
+
+
+def build_schedule(genesis_data: Dict[str, Any], n_months: Optional[int] = None) -> Dict[str, Any]:
+    """Build the vesting-schedule.json structure for a genesis file."""
+    terms = BucketTerms(genesis_data)
+    if not len(terms):
+        raise ValueError('genesis.json has no buckets with absolute_tokens to schedule')
+    if n_months is None:
+        n_months = max(terms.horizon_months(), MILESTONE_MONTHS[-1])
+
+    matrix = UnlockMatrix(terms, n_months)
+    tier_names = list(dict.fromkeys(terms.tiers))
+    tier_index = np.array([tier_names.index(t) for t in terms.tiers], dtype=np.int64)
+
+    # Integer token columns first, then derive every aggregate from them so
+    # bucket rows, tier rows and totals always add up exactly.
+    cumulative = np.rint(matrix.cumulative).astype(np.int64)
+    unlocks = np.diff(cumulative, axis=1, prepend=0)
+    bucket_tokens = terms.tokens[:, None]
+
+    tier_cumulative = np.zeros((len(tier_names), cumulative.shape[1]), dtype=np.int64)
+    tier_unlocks = np.zeros_like(tier_cumulative)
+    np.add.at(tier_cumulative, tier_index, cumulative)
+    np.add.at(tier_unlocks, tier_index, unlocks)
+    tier_tokens = np.zeros(len(tier_names), dtype=np.float64)
+    np.add.at(tier_tokens, tier_index, terms.tokens)
+
+    total_tokens = float(terms.tokens.sum())
+    total_cumulative = cumulative.sum(axis=0)
+    total_unlocks = unlocks.sum(axis=0)
+
+    columns = {
+        'unlock_tokens': unlocks.tolist(),
+        'unlock_pct_of_bucket': _pct(unlocks, bucket_tokens).tolist(),
+        'cumulative_tokens': cumulative.tolist(),
+        'cumulative_pct_of_bucket': _pct(cumulative, bucket_tokens).tolist(),
+        'notes': matrix.phase.tolist(),
+    }
+    tier_columns = {
+        'unlock_tokens': tier_unlocks.tolist(),
+        'cumulative_tokens': tier_cumulative.tolist(),
+        'cumulative_pct_of_tier': _pct(tier_cumulative, tier_tokens[:, None]).tolist(),
+    }
+    total_pct = _pct(total_cumulative, np.float64(total_tokens)).tolist()
+    dates = [str(d) for d in month_dates(genesis_data['genesis_date'], matrix.months)]
+
+    monthly_schedule = []
+    for m in matrix.months.tolist():
+        monthly_schedule.append({
+            'month': m,
+            'date': dates[m],
+            'buckets': [
+                {
+                    'tier': terms.tiers[b],
+                    'bucket_name': terms.names[b],
+                    'unlock_tokens': columns['unlock_tokens'][b][m],
+                    'unlock_pct_of_bucket': columns['unlock_pct_of_bucket'][b][m],
+                    'cumulative_tokens': columns['cumulative_tokens'][b][m],
+                    'cumulative_pct_of_bucket': columns['cumulative_pct_of_bucket'][b][m],
+                    'notes': PHASE_NOTES[columns['notes'][b][m]]
+                }
+                for b in range(len(terms))
+            ],
+            'tier_aggregates': {
+                tier: {
+                    'unlock_tokens': tier_columns['unlock_tokens'][t][m],
+                    'cumulative_tokens': tier_columns['cumulative_tokens'][t][m],
+                    'cumulative_pct_of_tier': tier_columns['cumulative_pct_of_tier'][t][m]
+                }
+                for t, tier in enumerate(tier_names)
+            },
+            'total': {
+                'unlock_tokens': int(total_unlocks[m]),
+                'cumulative_tokens': int(total_cumulative[m]),
+                'cumulative_pct_of_genesis': total_pct[m]
+            }
+        })
+
+    milestones = {}
+    for milestone_month in MILESTONE_MONTHS:
+        if milestone_month <= n_months:
+            entry = monthly_schedule[milestone_month]
+            key = 'at_tge' if milestone_month == 0 else f'at_month_{milestone_month}'
+            milestones[key] = {
+                'month': milestone_month,
+                'date': entry['date'],
+                'liquid_pct_of_genesis': entry['total']['cumulative_pct_of_genesis'],
+                'liquid_tokens': entry['total']['cumulative_tokens']
+            }
+
+    full = np.flatnonzero(np.asarray(total_pct) >= 99.9)
+    if full.size:
+        entry = monthly_schedule[int(full[0])]
+        milestones['at_full_unlock'] = {
+            'month': entry['month'],
+            'date': entry['date'],
+            'liquid_pct_of_genesis': 100.0,
+            'liquid_tokens': entry['total']['cumulative_tokens']
+        }
+
+    return {
+        'project': genesis_data.get('project', 'unknown'),
+        'genesis_date': genesis_data['genesis_date'],
+        'total_genesis_allocation_tokens': int(round(total_tokens)),
+        'total_genesis_allocation_pct': genesis_data.get('total_genesis_allocation_pct', 0),
+        'tier_totals': {
+            tier: {
+                'tokens': int(round(tier_tokens[t])),
+                'pct_of_genesis': round(tier_tokens[t] / total_tokens * 100, 2)
+            }
+            for t, tier in enumerate(tier_names)
+        },
+        'monthly_schedule': monthly_schedule,
+        'milestone_summary': milestones
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a vesting schedule from genesis.json bucket terms.')
+    parser.add_argument('genesis_path', type=Path)
+    parser.add_argument('--months', type=int, default=None,
+                        help='Months to schedule (default: last unlock month, at least 48)')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Output path (default: print the JSON to stdout)')
+    parser.add_argument('--daily', action='store_true',
+                        help='Print a daily-resolution summary instead of writing JSON')
+    parser.add_argument('--years', type=int, default=10, help='Horizon for --daily (default: 10)')
+    args = parser.parse_args()
+
+    # With the JSON on stdout, progress messages go to stderr
+    log = sys.stderr if args.output is None and not args.daily else sys.stdout
+
+    genesis_data = read_json(args.genesis_path)
+    if genesis_data is None:
+        print(f"Error: genesis.json not found: {args.genesis_path}", file=log)
+        sys.exit(1)
+    print(f"✓ Loaded genesis.json: {args.genesis_path}", file=log)
+
+    terms = BucketTerms(genesis_data)
+    if not len(terms):
+        print("Error: no buckets with absolute_tokens to schedule", file=log)
+        sys.exit(1)
+    print(f"✓ Found {len(terms)} scheduled bucket(s)", file=log)
+
+    if args.daily:
+        n_days = horizon_days(genesis_data['genesis_date'], args.years)
+        cumulative = daily_cumulative(genesis_data, n_days)
+        total = cumulative.sum(axis=0)
+        jumps = np.flatnonzero(np.diff(total, prepend=0) > 0)
+        print(f"✓ Built {cumulative.shape[0]} x {n_days} daily matrix")
+        print(f"\nSummary:")
+        print(f"  Unlock days: {jumps.size}")
+        print(f"  Unlocked after {args.years} years: {int(round(total[-1])):,} of {int(round(terms.tokens.sum())):,} tokens")
+        return
+
+    schedule = build_schedule(genesis_data, args.months)
+    if args.output is None:
+        json.dump(schedule, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(schedule, f, indent=2)
+        print(f"✓ Generated: {args.output}", file=log)
+
+    final_month = schedule['monthly_schedule'][-1]
+    print(f"\nSummary:", file=log)
+    print(f"  Project: {schedule['project']}", file=log)
+    print(f"  Total genesis allocation: {schedule['total_genesis_allocation_tokens']:,} tokens", file=log)
+    print(f"  Vesting period: {final_month['month']} months", file=log)
+    print(f"  Final unlock: {final_month['date']}", file=log)
+
+
+if __name__ == '__main__':
+    main()
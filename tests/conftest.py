@@ -0,0 +1,6 @@
+"""The scripts import each other as top-level modules (they run as `python scripts/x.py`)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
@@ -0,0 +1,95 @@
+"""refresh_all end to end against scripts/fixtures/refresh-responses.json."""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+import refresh
+from fixture_server import FixtureServer
+from repository import get_repository
+
+AS_OF = '2026-10-17'
+BITCOIN_PRICE_URL = refresh.COINGECKO_URL.format(id='bitcoin')
+ERGO_INFO_URL = 'https://api.ergoplatform.com/api/v1/info'
+
+
+@pytest.fixture(scope='module')
+def refreshed():
+    repository = get_repository()
+    sources = repository.read_json(refresh.SOURCES_FILE)['projects']
+    projects = {name: repository.project(name).data for name in sources}
+    with FixtureServer(refresh.FIXTURE_FILE) as server:
+        client = refresh.HttpClient(backoff=0.01, rewrite=server.url_for)
+        results = asyncio.run(refresh.refresh_all(client, sources, projects, AS_OF))
+        requests = list(server.requests)
+    return {r.name: r for r in results}, client, requests, sources
+
+
+def test_results_in_input_order_without_errors(refreshed):
+    results, _, _, sources = refreshed
+    assert list(results) == list(sources)
+    assert {name: r.errors for name, r in results.items()} == {name: [] for name in sources}
+
+
+def test_fetched_values(refreshed):
+    results, _, _, _ = refreshed
+    assert results['bitcoin'].fetched == {
+        'market_data.current_price_usd': 112950,
+        'market_data.daily_volume': 41873120533.2,
+        'supply.current_supply': 19945906,       # 1994590625000000 sat
+        'mining.current_hashrate_th': 471900000,  # 471938204115 GH/s, 4 significant digits
+    }
+    assert results['ergo'].fetched == {
+        'market_data.current_price_usd': 0.7134,
+        'market_data.daily_volume': 352910.4,
+        'supply.current_supply': 82313445,
+        'mining.current_hashrate_th': 4.613,
+    }
+    # kaspa's project file keeps its hashrate in PH/s
+    assert results['kaspa'].fetched['mining.current_hashrate_ph'] == 652.4
+    assert results['quai'].fetched == {'market_data.current_price_usd': 0.02212, 'market_data.daily_volume': 31104.8}
+
+
+def test_fetched_values_are_applied(refreshed):
+    results, _, _, _ = refreshed
+    for result in results.values():
+        updated = result.updated
+        assert updated['last_updated'] == AS_OF
+        assert updated['market_data']['data_date'] == AS_OF
+        for dotted, value in result.fetched.items():
+            assert refresh._get(updated, dotted) == value
+        assert ('last_updated', result.original.get('last_updated'), AS_OF) in result.changes
+    bitcoin = results['bitcoin']
+    old_price = bitcoin.original['market_data']['current_price_usd']
+    assert ('market_data.current_price_usd', old_price, 112950) in bitcoin.changes
+
+
+def test_503_is_retried(refreshed):
+    _, client, requests, _ = refreshed
+    # fail_first: 1 -> one 503, then the retry succeeds
+    assert Counter(requests)[BITCOIN_PRICE_URL] == 2
+    assert client.requests == len(requests)
+
+
+def test_each_url_requested_once_apart_from_retries(refreshed):
+    _, _, requests, sources = refreshed
+    counts = Counter(requests)
+    expected = {refresh.COINGECKO_URL.format(id=spec['id']) if spec['fetcher'] == 'coingecko' else spec['url']
+                for specs in sources.values() for spec in specs}
+    assert set(counts) == expected
+    # ergo's supply and hashrate fetchers share one request to the info endpoint
+    assert counts[ERGO_INFO_URL] == 1
+    assert len(requests) == len(expected) + 1
+
+
+def test_retries_exhausted(tmp_path):
+    fixture = tmp_path / 'responses.json'
+    fixture.write_text('{"responses": {"https://example.test/supply": {"body": "1", "fail_first": 5}}}')
+    with FixtureServer(fixture) as server:
+        client = refresh.HttpClient(retries=2, backoff=0.01, rewrite=server.url_for)
+        spec = {'fetcher': 'supply', 'url': 'https://example.test/supply'}
+        [result] = asyncio.run(refresh.refresh_all(client, {'x': [spec]}, {'x': {}}, AS_OF))
+        assert server.requests == ['https://example.test/supply'] * 3
+    assert result.fetched == {}
+    assert result.errors == ['supply: https://example.test/supply: HTTP 503 after 3 attempt(s)']
@@ -0,0 +1,99 @@
+"""The fast check in schema_validation must agree with jsonschema.
+
+Every repo file is checked as is, then again with one mutation at a time
+(a key removed, a value swapped for one of another type or out of range)
+at every position of a shrunk copy of the file, so both sides of every
+compiled keyword get exercised.
+"""
+
+import pytest
+
+from repository import REPO_ROOT, read_json
+from schema_validation import _dotted, discover_files, get_fast_check, get_validator, kind_for_path, schema_errors
+
+FILES = discover_files(REPO_ROOT)
+REPLACEMENTS = [None, True, 0, -1, 1.5, 1e12, '', 'x', '2024-02-30', [], {}, [None], {'': None}]
+
+
+def _shrink(value, keep=2):
+    """value with every array cut to its first `keep` items (schedules have hundreds)."""
+    if isinstance(value, dict):
+        return {k: _shrink(v, keep) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_shrink(v, keep) for v in value[:keep]]
+    return value
+
+
+def _paths(value, path=()):
+    yield path
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from _paths(child, path + (key,))
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            yield from _paths(child, path + (i,))
+
+
+def _mutations(document):
+    """(description, document) after each single-point change; undone before the next one."""
+    for path in list(_paths(document)):
+        if not path:
+            continue
+        parent = document
+        for part in path[:-1]:
+            parent = parent[part]
+        original = parent[path[-1]]
+        if isinstance(parent, dict):
+            del parent[path[-1]]
+            yield f"remove {_dotted(path)}", document
+            parent[path[-1]] = original
+        for replacement in REPLACEMENTS:
+            if replacement == original and type(replacement) is type(original):
+                continue
+            parent[path[-1]] = replacement
+            yield f"{_dotted(path)} = {replacement!r}", document
+        parent[path[-1]] = original
+        if isinstance(original, dict):
+            parent[path[-1]] = {**original, 'unexpected_key': None}
+            yield f"add {_dotted(path)}.unexpected_key", document
+            parent[path[-1]] = original
+
+
+def _ids(paths):
+    return [path.relative_to(REPO_ROOT).as_posix() for path in paths]
+
+
+@pytest.mark.parametrize('path', FILES, ids=_ids(FILES))
+def test_fast_check_agrees_on_repo_file(path):
+    kind = kind_for_path(path)
+    fast_check = get_fast_check(kind)
+    assert fast_check is not None, f"{kind} schema fell back to jsonschema"
+    data = read_json(path)
+    assert fast_check(data) == get_validator(kind).is_valid(data)
+
+
+@pytest.mark.parametrize('path', FILES, ids=_ids(FILES))
+def test_fast_check_agrees_on_mutations(path):
+    kind = kind_for_path(path)
+    fast_check, validator = get_fast_check(kind), get_validator(kind)
+    disagreements = []
+    rejected = 0
+    for description, mutated in _mutations(_shrink(read_json(path))):
+        valid = validator.is_valid(mutated)
+        rejected += not valid
+        if fast_check(mutated) != valid:
+            disagreements.append(f"{description}: jsonschema says {'valid' if valid else 'invalid'}")
+    assert not disagreements, '\n'.join(disagreements[:20])
+    assert rejected, "no mutation was invalid; the test exercises nothing"
+
+
+def test_errors_sorted_by_path_not_string():
+    monthly = [{'month': i, 'date': '2024-01-01', 'buckets': [], 'tier_aggregates': {},
+                'total': {'cumulative_tokens': 0, 'cumulative_pct_of_total': 0}} for i in range(12)]
+    for i in (2, 10):
+        monthly[i]['date'] = 'not a date'
+    document = {**_shrink(read_json(REPO_ROOT / 'allocations' / 'quai' / 'vesting-schedule.json'), 0),
+                'monthly_schedule': monthly}
+    errors = [e for e in schema_errors('vesting-schedule', document) if 'date' in e]
+    assert [e.split(':')[0] for e in errors] == ['Invalid date format for monthly_schedule[2].date',
+                                                 'Invalid date format for monthly_schedule[10].date']
@@ -0,0 +1,55 @@
+"""serialization must write what the json module writes, with or without orjson."""
+
+import json
+
+import pytest
+
+import serialization
+from repository import REPO_ROOT
+
+REFERENCE = {
+    'pretty': lambda data: json.dumps(data, indent=2),
+    'compact': lambda data: json.dumps(data, separators=(',', ':')),
+    'canonical': lambda data: json.dumps(data, indent=2, sort_keys=True),
+}
+
+VALUES = {
+    'ascii': {'chars': [chr(c) for c in range(128)], 'joined': ''.join(chr(c) for c in range(128))},
+    'del': {'note': 'tab\there, del\x7f here'},
+    'non_ascii': {'name': 'Zürich – ✓', 'emoji': '🚀'},
+    'floats': [0.1, 1e-4, 1.5e-4, 9.99e-5, 1e-7, 1e15, 1e16, 1.2345e17, -0.0, 123456789.123],
+    'ints': [0, -1, 2 ** 63 - 1, 2 ** 64, -(2 ** 70)],
+    'empty': {'list': [], 'dict': {}, 'nested': [[], {}], 'string': ''},
+    'long_array': {'rows': [{'month': i, 'pct': i / 7} for i in range(serialization.STREAM_ITEMS * 2 + 3)]},
+    'unsorted': {'b': 1, 'a': {'d': 2, 'c': 3}},
+}
+
+REPO_FILES = sorted(
+    path for path in list(REPO_ROOT.glob('allocations/**/*.json')) + list(REPO_ROOT.glob('data/**/*.json'))
+)
+
+
+@pytest.mark.parametrize('fmt', serialization.FORMATS)
+@pytest.mark.parametrize('name', VALUES)
+def test_matches_json_module(name, fmt):
+    assert serialization.dumps(VALUES[name], fmt) == REFERENCE[fmt](VALUES[name])
+
+
+@pytest.mark.parametrize('fmt', serialization.FORMATS)
+def test_streamed_object_matches_dict(fmt):
+    def items():
+        yield 'rows', iter(VALUES['long_array']['rows'])
+        yield 'empty', iter([])
+        yield 'note', VALUES['del']['note']
+
+    expected = {'rows': VALUES['long_array']['rows'], 'empty': [], 'note': VALUES['del']['note']}
+    assert serialization.dumps(serialization.StreamedObject(items()), fmt) == REFERENCE[fmt](expected)
+
+
+@pytest.mark.parametrize('path', REPO_FILES, ids=[p.relative_to(REPO_ROOT).as_posix() for p in REPO_FILES])
+def test_repo_files_round_trip(path):
+    text = path.read_text()
+    data = json.loads(text)
+    assert serialization.loads(text) == data
+    for fmt in serialization.FORMATS:
+        assert serialization.dumps(data, fmt) == REFERENCE[fmt](data)
@@ -0,0 +1,48 @@
+"""TimelineBuilder keeps the points a Timeline lookup needs."""
+
+import pytest
+
+from schedule_csv import ScheduleRow
+from timeline import Timeline, TimelineBuilder
+
+PLATEAU = [(0, 0), (10, 100), (20, 100), (30, 200)]  # (day, cumulative tokens)
+
+
+def build(interpolation, points, tiers=('tier_1',)):
+    builder = TimelineBuilder('2020-01-01', 200, interpolation, has_blocks=False)
+    line = 2
+    for day, cumulative in points:
+        for tier in tiers:
+            builder.add(ScheduleRow(line, day // 30, '2020-01-01', tier, 'bucket', 0, 0, cumulative, 0, '', day=day))
+            line += 1
+    return builder.finish()
+
+
+def test_linear_keeps_plateau_end():
+    section = build('linear', PLATEAU)
+    assert section['day'] == [0, 10, 20, 30]
+    assert section['cumulative_tokens'] == [0, 100, 100, 200]
+    assert section['tiers'] == {'tier_1': [0, 100, 100, 200]}
+    assert len(section['date']) == len(section['cumulative_pct']) == 4
+
+    timeline = Timeline.from_section(section, value='cumulative_tokens')
+    assert timeline.at(15) == 100
+    assert timeline.at(25) == pytest.approx(150)
+
+
+def test_linear_keeps_only_the_last_point_of_a_plateau():
+    section = build('linear', [(0, 0), (10, 100), (15, 100), (20, 100), (30, 200), (40, 200)])
+    assert section['day'] == [0, 10, 20, 30]
+    assert section['cumulative_tokens'] == [0, 100, 100, 200]
+
+
+def test_step_keeps_change_points_only():
+    section = build('step', PLATEAU)
+    assert section['day'] == [0, 10, 30]
+    assert Timeline.from_section(section, value='cumulative_tokens').at(15) == 100
+
+
+def test_plateau_end_pads_every_tier():
+    section = build('linear', PLATEAU, tiers=('tier_1', 'tier_2'))
+    assert section['tiers'] == {'tier_1': [0, 100, 100, 200], 'tier_2': [0, 100, 100, 200]}
+    assert section['cumulative_tokens'] == [0, 200, 200, 400]
@@ -0,0 +1,58 @@
+"""vesting_engine on genesis files, including the template with its _comment entries."""
+
+import numpy as np
+import pytest
+
+import vesting_engine
+from diff_schedule import genesis_buckets
+from export_sqlite import ProjectRows
+from repository import REPO_ROOT, read_json
+
+TEMPLATE = REPO_ROOT / 'templates' / 'genesis-template.json'
+GENESIS_FILES = sorted(REPO_ROOT.glob('allocations/*/genesis.json'))
+
+
+def scheduled_buckets(genesis):
+    return [
+        bucket
+        for tier_data in genesis['allocation_tiers'].values() if isinstance(tier_data, dict)
+        for bucket in tier_data.get('buckets') or []
+        if bucket.get('allocation_mechanism') != 'block_reward_emission'
+        and vesting_engine._num(bucket.get('absolute_tokens')) > 0
+    ]
+
+
+def test_template_skips_comment_entries():
+    genesis = read_json(TEMPLATE)
+    assert any(not isinstance(value, dict) for value in genesis['allocation_tiers'].values())
+
+    terms = vesting_engine.BucketTerms(genesis)
+    assert len(terms) == len(scheduled_buckets(genesis)) > 0
+    schedule = vesting_engine.build_schedule(genesis)
+    assert schedule['monthly_schedule'][-1]['total']['cumulative_pct_of_genesis'] == 100.0
+
+    assert len(genesis_buckets(genesis)) == sum(
+        len(tier.get('buckets') or []) for tier in genesis['allocation_tiers'].values() if isinstance(tier, dict))
+    rows = ProjectRows('template', {'allocations/template/genesis.json': genesis}, 1).rows
+    assert [tier for _, tier, _ in rows['tiers']] == [
+        name for name, tier in genesis['allocation_tiers'].items() if isinstance(tier, dict)]
+
+
+@pytest.mark.parametrize('path', GENESIS_FILES, ids=lambda path: path.parent.name)
+def test_daily_horizon_reaches_final_month(path):
+    genesis = read_json(path)
+    terms = vesting_engine.BucketTerms(genesis)
+    if not len(terms):
+        pytest.skip('no scheduled buckets')
+    years = -(-terms.horizon_months() // 12)  # whole years covering every unlock
+    n_days = vesting_engine.horizon_days(genesis['genesis_date'], years)
+    total = vesting_engine.daily_cumulative(genesis, n_days).sum(axis=0)
+
+    matrix = vesting_engine.UnlockMatrix(terms, terms.horizon_months())
+    assert total[-1] == pytest.approx(matrix.cumulative[:, -1].sum())
+
+
+def test_horizon_days_counts_leap_days():
+    assert vesting_engine.horizon_days('2020-01-01', 1) == 367
+    assert vesting_engine.horizon_days('2021-01-01', 10) == 10 * 365 + 2 + 1  # 2024, 2028
+    assert vesting_engine.elapsed_months('2019-11-05', vesting_engine.horizon_days('2019-11-05', 10))[-1] == 120